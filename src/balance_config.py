@@ -31,8 +31,12 @@ def create_default_config():
     config.add_section('gpu_priority')
     config.add_section('preferred_order_settings')
     config.add_section('split_sessions_settings')
+    config.add_section('weighted_capacity_settings')
     config.add_section('max_sessions')
+    config.add_section('capacity_weights')
     config.add_section('rate_limiting')
+    config.add_section('tick_rate')
+    config.add_section('switching_policy')
     config.add_section('system')
     
     # Set default values
@@ -40,15 +44,37 @@ def create_default_config():
     
     config.set('preferred_order_settings', 'load_threshold_percentage', '80')
     config.set('preferred_order_settings', 'load_threshold_seconds', '30')
+    config.set('preferred_order_settings', 'forecast_horizon_seconds', '0')
     
     config.set('split_sessions_settings', 'load_limit_percentage', '75')
     config.set('split_sessions_settings', 'load_limit_seconds', '60')
+    config.set('split_sessions_settings', 'forecast_horizon_seconds', '0')
+    
+    config.set('weighted_capacity_settings', 'load_limit_percentage', '85')
+    config.set('weighted_capacity_settings', 'load_limit_seconds', '30')
+    config.set('weighted_capacity_settings', 'forecast_horizon_seconds', '0')
+    config.set('weighted_capacity_settings', 'encoder_weight', '1.0')
+    config.set('weighted_capacity_settings', 'decoder_weight', '1.0')
+    config.set('weighted_capacity_settings', 'render_weight', '0.5')
+    config.set('weighted_capacity_settings', 'score_margin_percentage', '10')
     
     config.set('rate_limiting', 'min_switch_interval_seconds', '10')
     config.set('rate_limiting', 'enabled', 'true')
     
+    config.set('tick_rate', 'min_interval_seconds', '0.5')
+    config.set('tick_rate', 'normal_interval_seconds', '5')
+    config.set('tick_rate', 'max_interval_seconds', '30')
+    config.set('tick_rate', 'threshold_margin_percentage', '10')
+    config.set('tick_rate', 'fast_hold_seconds', '15')
+    
+    config.set('switching_policy', 'exit_hysteresis_percentage', '10')
+    config.set('switching_policy', 'min_dwell_seconds', '60')
+    config.set('switching_policy', 'switch_budget', '6')
+    config.set('switching_policy', 'switch_budget_window_seconds', '600')
+    
     config.set('system', 'auto_restart_service', 'true')
     config.set('system', 'auto_balancing_enabled', 'true')
+    config.set('system', 'plex_notifications_enabled', 'true')
     config.set('system', 'config_version', '1.0')
     
     # Try to auto-populate GPU devices
@@ -62,6 +88,9 @@ def create_default_config():
                 # Set default max sessions
                 config.set('max_sessions', f'gpu{i}_max_sessions', '5')
                 
+                # Set default capacity weight (all GPUs equal)
+                config.set('capacity_weights', f'gpu{i}_capacity', '1.0')
+                
                 # Initialize global priority settings (empty by default)
                 if i <= 3:  # Only set up to 3 priorities initially
                     config.set('gpu_priority', f'priority_{i}', '')
@@ -161,12 +190,30 @@ def get_current_settings():
             settings['preferred_order'] = {}
             settings['preferred_order']['load_threshold_percentage'] = config.getint('preferred_order_settings', 'load_threshold_percentage', fallback=80)
             settings['preferred_order']['load_threshold_seconds'] = config.getint('preferred_order_settings', 'load_threshold_seconds', fallback=30)
+            settings['preferred_order']['forecast_horizon_seconds'] = config.getint('preferred_order_settings', 'forecast_horizon_seconds', fallback=0)
         
         # Get split sessions settings
         if config.has_section('split_sessions_settings'):
             settings['split_sessions'] = {}
             settings['split_sessions']['load_limit_percentage'] = config.getint('split_sessions_settings', 'load_limit_percentage', fallback=75)
             settings['split_sessions']['load_limit_seconds'] = config.getint('split_sessions_settings', 'load_limit_seconds', fallback=60)
+            settings['split_sessions']['forecast_horizon_seconds'] = config.getint('split_sessions_settings', 'forecast_horizon_seconds', fallback=0)
+        
+        # Get weighted capacity settings (section is optional; older configs use the defaults)
+        settings['weighted_capacity'] = {}
+        settings['weighted_capacity']['load_limit_percentage'] = config.getint('weighted_capacity_settings', 'load_limit_percentage', fallback=85)
+        settings['weighted_capacity']['load_limit_seconds'] = config.getint('weighted_capacity_settings', 'load_limit_seconds', fallback=30)
+        settings['weighted_capacity']['forecast_horizon_seconds'] = config.getint('weighted_capacity_settings', 'forecast_horizon_seconds', fallback=0)
+        settings['weighted_capacity']['encoder_weight'] = config.getfloat('weighted_capacity_settings', 'encoder_weight', fallback=1.0)
+        settings['weighted_capacity']['decoder_weight'] = config.getfloat('weighted_capacity_settings', 'decoder_weight', fallback=1.0)
+        settings['weighted_capacity']['render_weight'] = config.getfloat('weighted_capacity_settings', 'render_weight', fallback=0.5)
+        settings['weighted_capacity']['score_margin_percentage'] = config.getfloat('weighted_capacity_settings', 'score_margin_percentage', fallback=10)
+        
+        # Get per-GPU capacity weights (missing GPUs default to 1.0)
+        settings['capacity_weights'] = {}
+        if config.has_section('capacity_weights'):
+            for key, value in config.items('capacity_weights'):
+                settings['capacity_weights'][key] = config.getfloat('capacity_weights', key, fallback=1.0)
         
         # Get max sessions
         if config.has_section('max_sessions'):
@@ -183,11 +230,27 @@ def get_current_settings():
             settings['rate_limiting']['min_switch_interval_seconds'] = config.getint('rate_limiting', 'min_switch_interval_seconds', fallback=10)
             settings['rate_limiting']['enabled'] = config.getboolean('rate_limiting', 'enabled', fallback=True)
         
+        # Get balancer tick rate bounds (section is optional; older configs use the defaults)
+        settings['tick_rate'] = {}
+        settings['tick_rate']['min_interval_seconds'] = config.getfloat('tick_rate', 'min_interval_seconds', fallback=0.5)
+        settings['tick_rate']['normal_interval_seconds'] = config.getfloat('tick_rate', 'normal_interval_seconds', fallback=5)
+        settings['tick_rate']['max_interval_seconds'] = config.getfloat('tick_rate', 'max_interval_seconds', fallback=30)
+        settings['tick_rate']['threshold_margin_percentage'] = config.getfloat('tick_rate', 'threshold_margin_percentage', fallback=10)
+        settings['tick_rate']['fast_hold_seconds'] = config.getfloat('tick_rate', 'fast_hold_seconds', fallback=15)
+        
+        # Get anti-flapping switching policy (section is optional; older configs use the defaults)
+        settings['switching_policy'] = {}
+        settings['switching_policy']['exit_hysteresis_percentage'] = config.getint('switching_policy', 'exit_hysteresis_percentage', fallback=10)
+        settings['switching_policy']['min_dwell_seconds'] = config.getint('switching_policy', 'min_dwell_seconds', fallback=60)
+        settings['switching_policy']['switch_budget'] = config.getint('switching_policy', 'switch_budget', fallback=6)
+        settings['switching_policy']['switch_budget_window_seconds'] = config.getint('switching_policy', 'switch_budget_window_seconds', fallback=600)
+        
         # Get system settings
         if config.has_section('system'):
             settings['system'] = {}
             settings['system']['auto_balancing_enabled'] = config.getboolean('system', 'auto_balancing_enabled', fallback=True)
             settings['system']['auto_restart_service'] = config.getboolean('system', 'auto_restart_service', fallback=True)
+            settings['system']['plex_notifications_enabled'] = config.getboolean('system', 'plex_notifications_enabled', fallback=True)
         
         return settings
         
@@ -210,6 +273,8 @@ def update_settings(settings_data):
             priorities_to_save = settings_data['preferred_order']['priorities']
         elif 'split_sessions' in settings_data and 'priorities' in settings_data['split_sessions']:
             priorities_to_save = settings_data['split_sessions']['priorities']
+        elif 'weighted_capacity' in settings_data and 'priorities' in settings_data['weighted_capacity']:
+            priorities_to_save = settings_data['weighted_capacity']['priorities']
         
         # Save priorities to global gpu_priority section
         if priorities_to_save:
@@ -227,6 +292,9 @@ def update_settings(settings_data):
             
             if 'load_threshold_seconds' in po_data:
                 config.set('preferred_order_settings', 'load_threshold_seconds', str(po_data['load_threshold_seconds']))
+            
+            if 'forecast_horizon_seconds' in po_data:
+                config.set('preferred_order_settings', 'forecast_horizon_seconds', str(po_data['forecast_horizon_seconds']))
         
         # Update split sessions settings
         if 'split_sessions' in settings_data:
@@ -237,12 +305,32 @@ def update_settings(settings_data):
             
             if 'load_limit_seconds' in ss_data:
                 config.set('split_sessions_settings', 'load_limit_seconds', str(ss_data['load_limit_seconds']))
+            
+            if 'forecast_horizon_seconds' in ss_data:
+                config.set('split_sessions_settings', 'forecast_horizon_seconds', str(ss_data['forecast_horizon_seconds']))
+        
+        # Update weighted capacity settings
+        if 'weighted_capacity' in settings_data:
+            if not config.has_section('weighted_capacity_settings'):
+                config.add_section('weighted_capacity_settings')
+            for key, value in settings_data['weighted_capacity'].items():
+                if key in ('load_limit_percentage', 'load_limit_seconds', 'forecast_horizon_seconds'):
+                    config.set('weighted_capacity_settings', key, str(int(value)))
+                elif key in ('encoder_weight', 'decoder_weight', 'render_weight', 'score_margin_percentage'):
+                    config.set('weighted_capacity_settings', key, str(float(value)))
         
         # Update max sessions
         if 'max_sessions' in settings_data:
             for gpu_key, session_count in settings_data['max_sessions'].items():
                 config.set('max_sessions', gpu_key, str(session_count))
         
+        # Update per-GPU capacity weights
+        if 'capacity_weights' in settings_data:
+            if not config.has_section('capacity_weights'):
+                config.add_section('capacity_weights')
+            for capacity_key, capacity in settings_data['capacity_weights'].items():
+                config.set('capacity_weights', capacity_key, str(float(capacity)))
+        
         # Update rate limiting settings
         if 'rate_limiting' in settings_data:
             rate_data = settings_data['rate_limiting']
@@ -255,11 +343,31 @@ def update_settings(settings_data):
             if 'enabled' in rate_data:
                 config.set('rate_limiting', 'enabled', str(rate_data['enabled']).lower())
         
+        # Update balancer tick rate bounds
+        if 'tick_rate' in settings_data:
+            if not config.has_section('tick_rate'):
+                config.add_section('tick_rate')
+            for key, value in settings_data['tick_rate'].items():
+                if key in ('min_interval_seconds', 'normal_interval_seconds', 'max_interval_seconds',
+                           'threshold_margin_percentage', 'fast_hold_seconds'):
+                    config.set('tick_rate', key, str(float(value)))
+        
+        # Update anti-flapping switching policy
+        if 'switching_policy' in settings_data:
+            if not config.has_section('switching_policy'):
+                config.add_section('switching_policy')
+            for key, value in settings_data['switching_policy'].items():
+                if key in ('exit_hysteresis_percentage', 'min_dwell_seconds', 'switch_budget',
+                           'switch_budget_window_seconds'):
+                    config.set('switching_policy', key, str(int(value)))
+        
         # Update system settings
         if 'system' in settings_data:
             system_data = settings_data['system']
             if 'auto_balancing_enabled' in system_data:
                 config.set('system', 'auto_balancing_enabled', str(system_data['auto_balancing_enabled']).lower())
+            if 'plex_notifications_enabled' in system_data:
+                config.set('system', 'plex_notifications_enabled', str(system_data['plex_notifications_enabled']).lower())
         
         # Save the updated config
         return save_balance_config(config)
@@ -300,6 +408,13 @@ def refresh_gpu_devices():
             gpu_sessions_key = f'gpu{i}_max_sessions'
             if not config.has_option('max_sessions', gpu_sessions_key):
                 config.set('max_sessions', gpu_sessions_key, '5')
+            
+            # Add capacity weight if not exists
+            if not config.has_section('capacity_weights'):
+                config.add_section('capacity_weights')
+            gpu_capacity_key = f'gpu{i}_capacity'
+            if not config.has_option('capacity_weights', gpu_capacity_key):
+                config.set('capacity_weights', gpu_capacity_key, '1.0')
         
         return save_balance_config(config)
         
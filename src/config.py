@@ -3,6 +3,10 @@
 
 import configparser
 import os
+import threading
+
+_gpu_monitoring_settings = None  # parsed [gpu_monitoring] settings, loaded once per process
+_gpu_monitoring_lock = threading.Lock()
 
 def get_project_root():
     """Get the project root directory from config"""
@@ -41,3 +45,31 @@ def load_config():
         'PROJECT_ROOT': project_root,
         'VERSION': 'v1.0.0'
     }
+
+def get_gpu_monitoring_settings():
+    """Get optional [gpu_monitoring] settings from config file (parsed once; restart to apply changes)"""
+    global _gpu_monitoring_settings
+    
+    with _gpu_monitoring_lock:
+        if _gpu_monitoring_settings is None:
+            _gpu_monitoring_settings = _load_gpu_monitoring_settings()
+        return dict(_gpu_monitoring_settings)
+
+def _load_gpu_monitoring_settings():
+    settings = {
+        'intel_backend': 'intel_gpu_top',
+        'sysfs_root': '/sys',
+        'procfs_root': '/proc',
+        'collector_url': 'http://localhost:8081',
+        'shm_path': '/dev/shm/plex-gpu-metrics'
+    }
+    
+    config_file = os.path.join(get_project_root(), 'config.conf')
+    if os.path.exists(config_file):
+        config = configparser.ConfigParser()
+        config.read(config_file)
+        if config.has_section('gpu_monitoring'):
+            for key in settings:
+                settings[key] = config.get('gpu_monitoring', key, fallback=settings[key]).strip()
+                
+    return settings
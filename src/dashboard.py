@@ -1,13 +1,12 @@
 #!/usr/bin/env python3
 """Main dashboard application for Plex GPU Load Balancer"""
 
-from flask import Flask, render_template_string, jsonify
+from flask import Flask, jsonify, request, Response, stream_with_context
 import sys
 import os
+import threading
+import time
 from datetime import datetime
-import requests
-from urllib3.util.retry import Retry
-from requests.adapters import HTTPAdapter
 
 # Add src directory to path for importing modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -27,60 +26,30 @@ from plex_api import (
     switch_to_device, switch_gpu_by_type, available_devices, get_debug_info, get_plex_settings,
     get_current_active_device, get_all_active_sessions
 )
-from gpu_metrics import get_gpu_metrics
-from dashboard_template import get_dashboard_template
+from dashboard_assets import DashboardAssets
 from balance_config import (
     load_balance_config, get_current_settings, update_settings, 
     refresh_gpu_devices, get_gpu_devices_mapping
 )
 
-# Import Intel GPU monitor if available
-try:
-    from intel_gpu_monitor import start_intel_monitor, get_intel_gpu_data, get_intel_process_count
-    INTEL_MONITOR_AVAILABLE = True
-except ImportError as e:
-    print(f"⚠️  Intel GPU Monitor not available: {e}")
-    INTEL_MONITOR_AVAILABLE = False
-    # Create dummy functions to prevent errors
-    def start_intel_monitor():
-        return False
-    def get_intel_gpu_data():
-        return None
-    def get_intel_process_count():
-        return 0
-
-# Import NVIDIA GPU monitor if available
-try:
-    from nvidia_gpu_monitor import start_nvidia_monitor, get_nvidia_gpu_data, get_nvidia_process_count
-    NVIDIA_MONITOR_AVAILABLE = True
-except ImportError as e:
-    print(f"⚠️  NVIDIA GPU Monitor not available: {e}")
-    NVIDIA_MONITOR_AVAILABLE = False
-    # Create dummy functions to prevent errors
-    def start_nvidia_monitor():
-        return False
-    def get_nvidia_gpu_data():
-        return None
-    def get_nvidia_process_count():
-        return 0
-
-# Import standalone GPU collector service
-from gpu_collector_service import (
-    start_gpu_collector_service, stop_gpu_collector_service, is_gpu_collector_running,
-    get_gpu_metrics as get_collector_gpu_metrics
+# GPU data comes from the GPU collector service - the only process that samples GPU hardware
+from gpu_collector_client import (
+    is_gpu_collector_running, get_all_gpu_metrics, get_device_metrics,
+    get_summary_stats, get_gpu_metrics, get_monitor_data,
+    get_historical_matrix, wait_for_collector_snapshot
 )
 
-# Import GPU metrics functions
-from gpu_metrics import (
-    get_all_gpu_metrics, get_device_metrics, get_active_device_metrics,
-    get_summary_stats
-)
+# Live updates are pushed to browsers over one Server-Sent Events stream per tab
+from dashboard_events import DashboardEventHub
 
-# Import historical GPU data functions
-from historical_gpu_data import (
-    get_all_devices_historical_matrix, get_device_historical_matrix,
-    get_data_availability
-)
+# Plex-backed views are served from memory and refreshed by one background poller
+from plex_view_cache import PlexViewCache
+
+# Import Plex notifications listener so session changes are pushed without waiting for a poll
+try:
+    from plex_notifications import PlexNotificationListener, WEBSOCKET_AVAILABLE as NOTIFICATIONS_AVAILABLE
+except ImportError:
+    NOTIFICATIONS_AVAILABLE = False
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -91,40 +60,234 @@ PLEX_SERVER = config['PLEX_SERVER']
 PLEX_TOKEN = config['PLEX_TOKEN']
 VERSION = config['VERSION']
 
-# Connection pooling for reduced API call overhead
-session = requests.Session()
-
-# Configure retry strategy
-retry_strategy = Retry(
-    total=3,
-    backoff_factor=0.1,
-    status_forcelist=[429, 500, 502, 503, 504],
-)
-
-# Configure HTTP adapter with connection pooling
-adapter = HTTPAdapter(
-    max_retries=retry_strategy,
-    pool_connections=20,  # Pool of connections to maintain
-    pool_maxsize=20,      # Maximum number of connections in the pool
-    pool_block=False      # Don't block if pool is full
-)
-
-# Mount the adapter for HTTP and HTTPS
-session.mount("http://", adapter)
-session.mount("https://", adapter)
-
-# Set default timeouts for all requests
-session.timeout = (5, 10)  # (connect timeout, read timeout)
-
-print("✅ HTTP connection pooling configured (20 connections, 3 retries)")
+# Plex requests go through plex_api's shared pooled PlexClient, and dashboard
+# requests read Plex views from the cache below instead of calling Plex themselves
+plex_views = PlexViewCache()
+plex_views.register('plex_status', get_plex_status, 2, default={
+    'sessions': 0, 'transcode_sessions': [], 'status': 'offline',
+    'server_name': 'Unknown', 'version': 'Unknown', 'platform': 'Unknown'
+})
+plex_views.register('plex_sessions', get_all_active_sessions, 2, default=[])
+plex_views.register('active_device', get_current_active_device, 2, default='')
+plex_views.register('gpu_devices', get_parsed_gpu_devices, 60, default=[])
+plex_views.register('plex_settings', get_plex_settings, 30, default={
+    'status': 'error', 'message': 'Plex settings not loaded yet'
+})
+plex_views.register('debug_info', get_debug_info, 10, default={'status': 'loading'})
 
 # Global state
 switch_counter = 0
+_last_manual_switch = (None, 0)  # (device_id, time) of the last switch made from the dashboard
+
+# Event stream configuration - each source is polled once per dashboard process, not per viewer
+STREAM_SNAPSHOT_WAIT = 10  # seconds each collector snapshot long-poll may block
+STREAM_HISTORY_INTERVAL = 1  # seconds
+STREAM_PLEX_INTERVAL = 2  # seconds between reads of the cached Plex views (the cache owns the Plex polling)
+STREAM_ACTIVE_DEVICE_INTERVAL = 2  # seconds
+MANUAL_SWITCH_WINDOW = 10  # seconds a dashboard-initiated switch is reported as manual
+
+event_hub = DashboardEventHub()
+_stream_metrics_version = 0
+_plex_listener = None
+
+def _stream_gpu_metrics():
+    """Block until the collector publishes a new snapshot and return it as a metrics event"""
+    global _stream_metrics_version
+    
+    snapshot = wait_for_collector_snapshot(_stream_metrics_version, STREAM_SNAPSHOT_WAIT)
+    if snapshot is None:
+        raise ConnectionError('GPU collector service not reachable')
+    # A version behind ours means the collector restarted and its counter began again from 0
+    restarted = snapshot['version'] < _stream_metrics_version
+    if not snapshot.get('changed') and not restarted:
+        return None
+    _stream_metrics_version = snapshot['version']
+    
+    return {
+        'version': snapshot['version'],
+        'timestamp': snapshot['timestamp'],
+        'devices': snapshot['devices'],
+        'device_count': len(snapshot['devices'])
+    }
+
+def _stream_historical_data():
+    """Get the load-average matrix for all devices"""
+    return get_historical_matrix() or None
+
+def _stream_plex_state():
+    """Get Plex status and active sessions in the /api/status and /api/plex-sessions shapes"""
+    sessions = plex_views.get('plex_sessions')
+    return {
+        'status': {
+            'plex': plex_views.get('plex_status'),
+            'plex_server': PLEX_SERVER,
+            'version': VERSION
+        },
+        'sessions': {
+            'status': 'success',
+            'sessions': sessions,
+            'count': len(sessions)
+        }
+    }
+
+def _wait_for_plex_change(timeout):
+    """Sleep until the next Plex cache read, waking early on session notifications when available"""
+    global _plex_listener
+    
+    if _plex_listener is None and NOTIFICATIONS_AVAILABLE:
+        _plex_listener = PlexNotificationListener(PLEX_SERVER, PLEX_TOKEN)
+        _plex_listener.start()
+        
+    if _plex_listener is not None and _plex_listener.is_connected():
+        if _plex_listener.wait(timeout):
+            # The cached views predate the event - drop them so the next read waits for fresh data
+            plex_views.invalidate('plex_sessions')
+            plex_views.invalidate('plex_status')
+    else:
+        time.sleep(timeout)
+
+def _stream_active_device():
+    """Get the active Plex device and whether the dashboard or the balancer selected it"""
+    active_device = plex_views.get('active_device')
+    if not active_device:
+        return None
+        
+    device_name = active_device
+    for device in plex_views.get('gpu_devices'):
+        if device.get('id') == active_device:
+            device_name = device.get('name', active_device)
+            break
+            
+    manual_device, manual_time = _last_manual_switch
+    manual = manual_device == active_device and time.time() - manual_time < MANUAL_SWITCH_WINDOW
+    return {
+        'active_device': active_device,
+        'device_name': device_name,
+        'trigger': 'Manual' if manual else 'Auto-Balancer'
+    }
+
+event_hub.add_source('metrics', _stream_gpu_metrics, 0)
+event_hub.add_source('history', _stream_historical_data, STREAM_HISTORY_INTERVAL)
+event_hub.add_source('plex', _stream_plex_state, STREAM_PLEX_INTERVAL, wait=_wait_for_plex_change)
+event_hub.add_source('active-device', _stream_active_device, STREAM_ACTIVE_DEVICE_INTERVAL)
+
+# Aggregated dashboard state - every section carries a version so a client only
+# receives the sections that changed since the versions it last saw
+DASHBOARD_STATE_SECTIONS = ('metrics', 'devices', 'status', 'sessions', 'history')
+_state_epoch = format(int(time.time()), 'x')  # keeps versions from a restarted dashboard distinct
+_state_versions = {}  # section -> (fingerprint, counter)
+_state_lock = threading.Lock()
+
+def _section_version(section, fingerprint):
+    """Get a section's version, bumping it when its fingerprint differs from the last one seen"""
+    with _state_lock:
+        last_fingerprint, counter = _state_versions.get(section, (None, 0))
+        if counter == 0 or fingerprint != last_fingerprint:
+            counter += 1
+            _state_versions[section] = (fingerprint, counter)
+        return f"{_state_epoch}.{counter}"
+
+def _metrics_section():
+    metrics = get_all_gpu_metrics()
+    return metrics, (metrics.get('version'), metrics.get('timestamp'), metrics.get('error'))
+
+def _devices_section():
+    devices, devices_version = plex_views.get_versioned('gpu_devices')
+    active_device, active_version = plex_views.get_versioned('active_device')
+    return {'devices': devices, 'active_device': active_device}, (devices_version, active_version)
+
+def _status_section():
+    plex, plex_version = plex_views.get_versioned('plex_status')
+    return {
+        'plex': plex,
+        'plex_server': PLEX_SERVER,
+        'counter': switch_counter,
+        'next_gpu': "NVIDIA" if switch_counter % 2 == 1 else "INTEL",
+        'version': VERSION
+    }, (plex_version, switch_counter)
+
+def _sessions_section():
+    sessions, sessions_version = plex_views.get_versioned('plex_sessions')
+    return {'status': 'success', 'sessions': sessions, 'count': len(sessions)}, sessions_version
+
+def _history_section():
+    history = get_historical_matrix()
+    return history, history
+
+_state_section_builders = {
+    'metrics': _metrics_section,
+    'devices': _devices_section,
+    'status': _status_section,
+    'sessions': _sessions_section,
+    'history': _history_section
+}
+
+# Page, stylesheet and script are rendered and compressed once, then served from memory
+dashboard_assets = DashboardAssets()
+
+def _asset_response(asset):
+    """Serve a built asset, honouring If-None-Match and Accept-Encoding"""
+    encoding, body, etag = asset.select(lambda encoding: request.accept_encodings[encoding] > 0)
+    
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, content_type=asset.content_type)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+            
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = asset.cache_control
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
 
 @app.route('/')
 def dashboard():
     """Main dashboard route"""
-    return render_template_string(get_dashboard_template())
+    return _asset_response(dashboard_assets.get_page())
+
+@app.route('/assets/<name>')
+def dashboard_asset(name):
+    """Content-hashed dashboard stylesheet and script"""
+    asset = dashboard_assets.get_asset(name)
+    if asset is None:
+        return jsonify({'status': 'error', 'message': 'Asset not found'}), 404
+    return _asset_response(asset)
+
+@app.route('/api/stream')
+def api_stream():
+    """Server-Sent Events stream of metrics, history, Plex and active-device changes"""
+    subscriber = event_hub.subscribe()
+    return Response(
+        stream_with_context(event_hub.stream(subscriber)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/dashboard-state')
+def api_dashboard_state():
+    """Aggregated dashboard state; only sections whose version differs from the client's are returned
+    
+    Query: ?sections=metrics,history (default all) and the last-seen version per
+    section, e.g. ?metrics=<version>&devices=<version>.
+    """
+    requested = request.args.get('sections')
+    sections = [section for section in requested.split(',') if section in _state_section_builders] \
+        if requested else DASHBOARD_STATE_SECTIONS
+        
+    versions = {}
+    changed = {}
+    for section in sections:
+        payload, fingerprint = _state_section_builders[section]()
+        versions[section] = _section_version(section, fingerprint)
+        if request.args.get(section) != versions[section]:
+            changed[section] = payload
+            
+    return jsonify({
+        'versions': versions,
+        'sections': changed,
+        'timestamp': datetime.now().isoformat()
+    })
 
 @app.route('/api/status')
 def api_status():
@@ -132,7 +295,7 @@ def api_status():
     global switch_counter
     next_gpu = "NVIDIA" if switch_counter % 2 == 1 else "INTEL"
     return jsonify({
-        'plex': get_plex_status(),
+        'plex': plex_views.get('plex_status'),
         'plex_server': PLEX_SERVER,
         'counter': switch_counter,
         'next_gpu': next_gpu,
@@ -143,7 +306,7 @@ def api_status():
 @app.route('/switch-device/<device_id>', methods=['POST'])
 def switch_to_device_endpoint(device_id):
     """Switch to a specific device by device ID"""
-    global switch_counter
+    global switch_counter, _last_manual_switch
     
     try:
         # URL decode the device ID
@@ -153,6 +316,9 @@ def switch_to_device_endpoint(device_id):
         result = switch_to_device(decoded_device_id)
         
         if result['status'] == 'success':
+            _last_manual_switch = (decoded_device_id, time.time())
+            plex_views.invalidate('active_device')
+            
             # Update counter based on device type
             if result['gpu_type'] == "NVIDIA":
                 switch_counter = 1
@@ -174,6 +340,7 @@ def switch_gpu(gpu):
     result = switch_gpu_by_type(gpu)
     
     if result['status'] == 'success':
+        plex_views.invalidate('active_device')
         # Update counter based on manual switch
         switch_counter = 1 if gpu == 'nvidia' else 0
         return jsonify(result)
@@ -184,6 +351,7 @@ def switch_gpu(gpu):
 def refresh_devices():
     """Refresh available GPU devices from Plex"""
     devices = load_available_devices()
+    plex_views.invalidate('gpu_devices')
     return jsonify({
         'status': 'success', 
         'devices': devices,
@@ -198,19 +366,22 @@ def api_gpu_metrics():
 @app.route('/api/debug')
 def api_debug():
     """Debug endpoint for troubleshooting"""
-    debug_info = get_debug_info()
+    debug_info = dict(plex_views.get('debug_info'))
     debug_info['version'] = VERSION
+    debug_info['event_stream'] = event_hub.get_stats()
+    debug_info['plex_view_cache'] = plex_views.get_stats()
+    debug_info['dashboard_assets'] = dashboard_assets.get_stats()
     return jsonify(debug_info)
 
 @app.route('/api/plex-settings')
 def api_plex_settings():
     """Get Plex server settings for dashboard display"""
-    return jsonify(get_plex_settings())
+    return jsonify(plex_views.get('plex_settings'))
 
 @app.route('/api/plex-sessions')
 def api_plex_sessions():
     """Get all active Plex sessions for visibility"""
-    sessions = get_all_active_sessions()
+    sessions = plex_views.get('plex_sessions')
     return jsonify({
         'status': 'success',
         'sessions': sessions,
@@ -221,8 +392,8 @@ def api_plex_sessions():
 @app.route('/api/gpu-devices')
 def api_gpu_devices():
     """Get parsed GPU devices for individual containers"""
-    devices = get_parsed_gpu_devices()
-    active_device = get_current_active_device()
+    devices = plex_views.get('gpu_devices')
+    active_device = plex_views.get('active_device')
     
     return jsonify({
         'status': 'success',
@@ -235,31 +406,19 @@ def api_gpu_devices():
 @app.route('/api/all-intel-gpu-data')
 def api_all_intel_gpu_data():
     """Get data from ALL Intel GPU devices"""
-    if not INTEL_MONITOR_AVAILABLE:
-        return jsonify({'status': 'error', 'message': 'Intel GPU monitor not available'})
-    
-    try:
-        from intel_gpu_monitor import get_all_intel_gpu_data
-        all_data = get_all_intel_gpu_data()
-        
-        return jsonify({
-            'status': 'success',
-            'devices': all_data,
-            'timestamp': datetime.now().isoformat()
-        })
-    except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'message': str(e)
-        })
+    return jsonify({
+        'status': 'success',
+        'devices': get_monitor_data('intel'),
+        'timestamp': datetime.now().isoformat()
+    })
 
 @app.route('/api/intel-process-count')
 def api_intel_process_count():
     """Get process count from Intel GPU monitor"""
-    if not INTEL_MONITOR_AVAILABLE:
-        return jsonify({'status': 'error', 'message': 'Intel GPU monitor not available'})
-    
-    count = get_intel_process_count()
+    count = sum(
+        (data.get('processes') or {}).get('total_count', 0)
+        for data in get_monitor_data('intel').values()
+    )
     return jsonify({
         'status': 'success',
         'process_count': count
@@ -267,15 +426,14 @@ def api_intel_process_count():
 
 @app.route('/start-intel-monitor', methods=['POST'])
 def start_intel_monitor_endpoint():
-    """Start Intel GPU monitoring"""
-    if not INTEL_MONITOR_AVAILABLE:
-        return jsonify({'status': 'error', 'message': 'Intel GPU monitor not available'})
+    """Report Intel GPU monitoring status (monitors are owned by the GPU collector service)"""
+    if not is_gpu_collector_running():
+        return jsonify({'status': 'error', 'message': 'GPU collector service not running'})
     
-    success = start_intel_monitor()
-    if success:
-        return jsonify({'status': 'success', 'message': 'Intel GPU monitor started'})
+    if get_monitor_data('intel'):
+        return jsonify({'status': 'success', 'message': 'Intel GPU monitor running in GPU collector service'})
     else:
-        return jsonify({'status': 'error', 'message': 'Intel GPU monitor already running or failed to start'})
+        return jsonify({'status': 'error', 'message': 'GPU collector service has no Intel GPU data'})
 
 # NEW UNIFIED API ENDPOINTS
 
@@ -307,7 +465,8 @@ def api_device_metrics(device_id):
 @app.route('/api/active-device-metrics')
 def api_active_device_metrics():
     """Get metrics for the currently active Plex device"""
-    metrics = get_active_device_metrics()
+    active_device_id = plex_views.get('active_device')
+    metrics = get_device_metrics(active_device_id) if active_device_id else None
     if metrics:
         return jsonify({
             'status': 'success',
@@ -327,10 +486,8 @@ def api_summary_stats():
 @app.route('/api/nvidia-gpu-data')
 def api_nvidia_gpu_data():
     """Get NVIDIA GPU data from the dedicated monitor"""
-    if not NVIDIA_MONITOR_AVAILABLE:
-        return jsonify({'status': 'error', 'message': 'NVIDIA GPU monitor not available'})
-    
-    data = get_nvidia_gpu_data()
+    all_data = get_monitor_data('nvidia')
+    data = next((device for device in all_data.values() if device.get('status') == 'success'), None)
     if data:
         return jsonify({
             'status': 'success',
@@ -346,23 +503,11 @@ def api_nvidia_gpu_data():
 @app.route('/api/all-nvidia-gpu-data')
 def api_all_nvidia_gpu_data():
     """Get data from ALL NVIDIA GPU devices"""
-    if not NVIDIA_MONITOR_AVAILABLE:
-        return jsonify({'status': 'error', 'message': 'NVIDIA GPU monitor not available'})
-    
-    try:
-        from nvidia_gpu_monitor import get_all_nvidia_gpu_data
-        all_data = get_all_nvidia_gpu_data()
-        
-        return jsonify({
-            'status': 'success',
-            'devices': all_data,
-            'timestamp': datetime.now().isoformat()
-        })
-    except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'message': str(e)
-        })
+    return jsonify({
+        'status': 'success',
+        'devices': get_monitor_data('nvidia'),
+        'timestamp': datetime.now().isoformat()
+    })
 
 # BALANCE CONFIGURATION API ENDPOINTS
 
@@ -457,6 +602,7 @@ def api_refresh_balance_devices():
         success = refresh_gpu_devices()
         
         if success:
+            plex_views.invalidate('gpu_devices')
             # Get updated settings to return
             settings = get_current_settings()
             return jsonify({
@@ -486,13 +632,19 @@ if __name__ == '__main__':
     print("🎯 Dashboard optimized for 500ms responsive updates")
     print("")
     
-    # Start standalone GPU collector service
-    print("⚡ Starting GPU Collector Service...")
-    collector_started = start_gpu_collector_service()
-    if collector_started:
-        print("   ✅ GPU Collector Service started successfully")
+    # GPU monitors run only in the GPU collector service; the dashboard reads from it
+    if is_gpu_collector_running():
+        print("   ✅ GPU Collector Service reachable")
     else:
-        print("   ⚠️  GPU Collector Service failed to start")
+        print("   ⚠️  GPU Collector Service not reachable - GPU metrics unavailable until it starts")
+    
+    # Build the page and its assets before the first request
+    dashboard_assets.build()
+    print("   ✅ Dashboard assets built")
+    
+    # Start the Plex view poller
+    plex_views.start()
+    print("   ✅ Plex view cache started")
     
     print("")
     print("🚀 Dashboard initialized!")
@@ -501,10 +653,4 @@ if __name__ == '__main__':
         app.run(host='0.0.0.0', port=8080, debug=False)
     except KeyboardInterrupt:
         print("\n🛑 Shutting down dashboard...")
-        
-        # Stop GPU collector service
-        if collector_started:
-            stop_gpu_collector_service()
-            print("   ✅ GPU Collector Service stopped")
-        
         print("🏁 Shutdown complete")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Dashboard Assets
+Builds the dashboard page, stylesheet and script once into content-hashed, pre-compressed assets
+"""
+
+import gzip
+import hashlib
+import threading
+
+from dashboard_template import get_dashboard_page, get_dashboard_styles, get_dashboard_javascript
+
+# Import brotli for the smallest variants; gzip alone is used if it is not installed
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+ASSET_PREFIX = '/assets/'
+ASSET_CACHE_CONTROL = 'public, max-age=31536000, immutable'  # names change with content, so cache forever
+PAGE_CACHE_CONTROL = 'no-cache'  # revalidate the page by ETag so new asset names are picked up
+MIN_COMPRESS_SIZE = 1024  # bytes; smaller bodies are sent as-is
+ENCODING_PREFERENCE = ('br', 'gzip')
+
+class DashboardAsset:
+    """One built asset: identity body, strong ETag and pre-compressed variants"""
+
+    def __init__(self, name, text, content_type, cache_control):
+        self.name = name
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.body = text.encode('utf-8')
+        self.digest = hashlib.sha256(self.body).hexdigest()[:16]
+        self.variants = {}  # content-encoding -> compressed body
+        
+        if len(self.body) >= MIN_COMPRESS_SIZE:
+            self.variants['gzip'] = gzip.compress(self.body, compresslevel=9, mtime=0)
+            if BROTLI_AVAILABLE:
+                self.variants['br'] = brotli.compress(self.body, quality=11)
+                
+    def select(self, accepts_encoding):
+        """Get (content_encoding or None, body, etag) for the best encoding the client accepts"""
+        for encoding in ENCODING_PREFERENCE:
+            if encoding in self.variants and accepts_encoding(encoding):
+                return encoding, self.variants[encoding], f'{self.digest}-{encoding}'
+        return None, self.body, self.digest
+
+class DashboardAssets:
+    """The dashboard page plus its hashed stylesheet and script, built once per process"""
+
+    def __init__(self):
+        self.page = None
+        self.assets = {}
+        self.lock = threading.Lock()
+        
+    def _hashed_asset(self, stem, extension, text, content_type):
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]
+        return DashboardAsset(f'{stem}.{digest}.{extension}', text, content_type, ASSET_CACHE_CONTROL)
+        
+    def build(self):
+        """Render the templates and compress everything (no template work is left for requests)"""
+        stylesheet = self._hashed_asset('dashboard', 'css', get_dashboard_styles(), 'text/css; charset=utf-8')
+        script = self._hashed_asset('dashboard', 'js', get_dashboard_javascript(),
+                                    'application/javascript; charset=utf-8')
+        page = DashboardAsset('index.html', get_dashboard_page(
+            f'<link rel="stylesheet" href="{ASSET_PREFIX}{stylesheet.name}">',
+            f'<script src="{ASSET_PREFIX}{script.name}"></script>'
+        ), 'text/html; charset=utf-8', PAGE_CACHE_CONTROL)
+        
+        with self.lock:
+            self.assets = {stylesheet.name: stylesheet, script.name: script}
+            self.page = page
+        return page
+        
+    def get_page(self):
+        """Get the built page, building on first use"""
+        with self.lock:
+            page = self.page
+        if page is None:
+            page = self.build()
+        return page
+        
+    def get_asset(self, name):
+        """Get a hashed asset by file name, or None"""
+        self.get_page()
+        return self.assets.get(name)
+        
+    def get_stats(self):
+        """Get asset names and identity/compressed sizes"""
+        page = self.get_page()
+        return {
+            asset.name: {
+                'bytes': len(asset.body),
+                **{f'{encoding}_bytes': len(body) for encoding, body in asset.variants.items()}
+            }
+            for asset in [page] + list(self.assets.values())
+        }
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Dashboard Event Hub
+Polls each data source once per dashboard process and fans changes out to Server-Sent Events subscribers
+"""
+
+import json
+import threading
+from collections import OrderedDict
+
+KEEPALIVE_INTERVAL = 15  # seconds between SSE comments that keep proxies from closing idle streams
+RETRY_MILLISECONDS = 3000  # EventSource reconnect delay sent to browsers
+SOURCE_ERROR_DELAY = 2  # seconds to back off after a source raised
+
+class EventSubscriber:
+    """One SSE connection; keeps only the newest pending event per type, so slow clients never queue up"""
+
+    def __init__(self):
+        self.pending = OrderedDict()  # event type -> encoded event
+        self.condition = threading.Condition()
+        self.closed = False
+        
+    def push(self, event_type, encoded):
+        with self.condition:
+            self.pending.pop(event_type, None)
+            self.pending[event_type] = encoded
+            self.condition.notify()
+            
+    def take(self, timeout):
+        """Wait up to timeout seconds and return all pending encoded events (possibly none)"""
+        with self.condition:
+            if not self.pending and not self.closed:
+                self.condition.wait(timeout)
+            events = list(self.pending.values())
+            self.pending.clear()
+            return events
+            
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+class PolledSource:
+    """A polled data source; publishes only when the payload changes"""
+
+    def __init__(self, event_type, fetch, interval, wait=None):
+        self.event_type = event_type
+        self.fetch = fetch
+        self.interval = interval
+        self.wait = wait  # optional wait(timeout) that returns early when the source has news
+        self.thread = None
+        self.last_payload = None
+        self.polls = 0
+        self.published = 0
+
+class DashboardEventHub:
+    """Shares one set of source pollers between all connected dashboard viewers
+    
+    Source threads run only while at least one viewer is subscribed; new viewers
+    immediately receive the latest event of every type.
+    """
+
+    def __init__(self):
+        self.sources = {}
+        self.subscribers = set()
+        self.latest = OrderedDict()  # event type -> encoded event, replayed to new subscribers
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.event_id = 0
+        
+    def add_source(self, event_type, fetch, interval, wait=None):
+        """Register fetch() -> payload (or None to skip) to be polled every interval seconds"""
+        self.sources[event_type] = PolledSource(event_type, fetch, interval, wait)
+        
+    def _encode(self, event_type, payload):
+        self.event_id += 1
+        data = json.dumps(payload, separators=(',', ':'), default=str)
+        return f"id: {self.event_id}\nevent: {event_type}\ndata: {data}\n\n"
+        
+    def publish(self, event_type, payload):
+        """Send an event to every subscriber (serialized once, whatever the viewer count)"""
+        with self.lock:
+            encoded = self._encode(event_type, payload)
+            self.latest[event_type] = encoded
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber.push(event_type, encoded)
+            
+    def _run_source(self, source):
+        """Poll one source until the last subscriber leaves"""
+        while not self.stop_event.is_set():
+            with self.lock:
+                if not self.subscribers:
+                    source.thread = None
+                    return
+                    
+            try:
+                payload = source.fetch()
+                source.polls += 1
+                if payload is not None:
+                    serialized = json.dumps(payload, sort_keys=True, default=str)
+                    if serialized != source.last_payload:
+                        source.last_payload = serialized
+                        source.published += 1
+                        self.publish(source.event_type, payload)
+            except Exception:
+                self.stop_event.wait(SOURCE_ERROR_DELAY)
+                continue
+                
+            if source.wait is not None:
+                source.wait(source.interval)
+            elif source.interval:
+                self.stop_event.wait(source.interval)
+                
+    def subscribe(self):
+        """Register a viewer, start the source pollers if needed and replay the latest events"""
+        subscriber = EventSubscriber()
+        with self.lock:
+            self.subscribers.add(subscriber)
+            for event_type, encoded in self.latest.items():
+                subscriber.pending[event_type] = encoded
+            for source in self.sources.values():
+                if source.thread is None:
+                    source.thread = threading.Thread(target=self._run_source, args=(source,), daemon=True)
+                    source.thread.start()
+        return subscriber
+        
+    def unsubscribe(self, subscriber):
+        subscriber.close()
+        with self.lock:
+            self.subscribers.discard(subscriber)
+            
+    def stream(self, subscriber):
+        """Yield SSE text for a subscriber until the client disconnects"""
+        try:
+            yield f"retry: {RETRY_MILLISECONDS}\n\n"
+            while not subscriber.closed:
+                events = subscriber.take(KEEPALIVE_INTERVAL)
+                if events:
+                    yield ''.join(events)
+                else:
+                    yield ": keepalive\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+            
+    def get_stats(self):
+        """Get viewer count and per-source poll statistics"""
+        with self.lock:
+            return {
+                'subscribers': len(self.subscribers),
+                'events_sent': self.event_id,
+                'sources': {
+                    event_type: {
+                        'interval': source.interval,
+                        'running': source.thread is not None,
+                        'polls': source.polls,
+                        'published': source.published
+                    }
+                    for event_type, source in self.sources.items()
+                }
+            }
+            
+    def stop(self):
+        self.stop_event.set()
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber.close()
@@ -11,15 +11,9 @@ from templates.intel_gpu_component import get_intel_gpu_styles, get_intel_gpu_ja
 from templates.nvidia_gpu_component import get_nvidia_gpu_styles, get_nvidia_gpu_javascript
 from templates.balancing_settings_component import get_balancing_settings_styles, get_balancing_settings_javascript, get_balancing_settings_html
 
-def get_dashboard_template():
-    """Return the complete HTML template for the dashboard"""
-    return f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Plex GPU Balancer Dashboard</title>
-    <style>
+def get_dashboard_styles():
+    """Return the dashboard stylesheet: all component styles plus the page layout"""
+    return f'''
         {get_base_styles()}
         {get_plex_styles()}
         {get_gpu_styles()}
@@ -281,54 +275,11 @@ def get_dashboard_template():
             left: 15px;
             right: 15px;
         }}
-    </style>
-</head>
-<body>
-    <div class="dashboard-container">
-        <main class="dashboard-content">
-            <!-- Connection Lost Modal -->
-            <div id="connection-lost-modal" class="modal-overlay">
-                <div class="modal-content">
-                    <div class="modal-icon">❌</div>
-                    <h2>Connection Lost</h2>
-                    <p>Unable to connect to the Plex GPU Balancer service.<br>Please check if the service is running.</p>
-                    <div class="modal-actions">
-                        <button onclick="retryConnection()" class="retry-btn">Retry Connection</button>
-                    </div>
-                </div>
-            </div>
-            
-            <!-- Main Title Container -->
-            <div class="status-card main-title-container">
-                <div class="card-title">Plex GPU Balancer</div>
-            </div>
-            
-            <div class="main-layout">
-                <!-- Plex Section (1/3) -->
-                <div class="plex-section">
-                    {get_plex_html()}
-                    {get_balancing_settings_html()}
-                </div>
-                
-                <!-- GPU Section (2/3) -->
-                <div class="gpu-section">
-                    {get_gpu_html()}
-                </div>
-            </div>
-        </main>
-        
-        <!-- Toast Notifications Container -->
-        <div id="toast-container" class="toast-container"></div>
-        
-        <footer class="dashboard-footer">
-            <div class="footer-content">
-                <div class="last-refresh">Last refresh: <span id="last-refresh-time">Never</span></div>
-                <div class="blame-text">blame Kotysoft</div>
-            </div>
-        </footer>
-    </div>
-    
-    <script>
+'''
+
+def get_dashboard_javascript():
+    """Return the dashboard script: all component scripts plus page initialization"""
+    return f'''
         {get_base_javascript()}
         {get_plex_javascript()}
         {get_gpu_javascript()}
@@ -379,6 +330,7 @@ def get_dashboard_template():
                         
                         // Update active device status immediately for better UX
                         updateActiveDeviceStatus(deviceId);
+                        lastActiveDevice = deviceId;
                         
                         // Then refresh all data to confirm the switch
                         setTimeout(() => {{
@@ -400,19 +352,73 @@ def get_dashboard_template():
         // Initialize dashboard
         window.onload = function() {{
             loadInitialData();
-            // Auto-refresh GPU metrics every 1000ms (1 second) - optimized from 500ms
-            setInterval(refreshGPUMetrics, 1000);
-            // Auto-refresh historical data every 1000ms (1 second) - optimized from 500ms
-            setInterval(refreshHistoricalData, 1000);
-            // Auto-refresh Plex sessions every 2000ms (2 seconds)
-            setInterval(refreshPlexSessions, 2000);
-            // Track active device changes for toast notifications every 2000ms (2 seconds)
-            setInterval(trackActiveDeviceChanges, 2000);
-            // Load initial historical data after a short delay
-            setTimeout(refreshHistoricalData, 2000);
-            // Initialize active device tracking after initial load
-            setTimeout(trackActiveDeviceChanges, 3000);
+            // Metrics, history, Plex sessions and active device changes are pushed over
+            // Server-Sent Events; connectEventStream() falls back to adaptive polling,
+            // and both pause while the tab is hidden
+            connectEventStream();
         }};
-    </script>
+'''
+
+def get_dashboard_page(styles_html, scripts_html):
+    """Return the dashboard HTML with the given stylesheet and script markup (inline or linked)"""
+    return f'''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Plex GPU Balancer Dashboard</title>
+    {styles_html}
+</head>
+<body>
+    <div class="dashboard-container">
+        <main class="dashboard-content">
+            <!-- Connection Lost Modal -->
+            <div id="connection-lost-modal" class="modal-overlay">
+                <div class="modal-content">
+                    <div class="modal-icon">❌</div>
+                    <h2>Connection Lost</h2>
+                    <p>Unable to connect to the Plex GPU Balancer service.<br>Please check if the service is running.</p>
+                    <div class="modal-actions">
+                        <button onclick="retryConnection()" class="retry-btn">Retry Connection</button>
+                    </div>
+                </div>
+            </div>
+            
+            <!-- Main Title Container -->
+            <div class="status-card main-title-container">
+                <div class="card-title">Plex GPU Balancer</div>
+            </div>
+            
+            <div class="main-layout">
+                <!-- Plex Section (1/3) -->
+                <div class="plex-section">
+                    {get_plex_html()}
+                    {get_balancing_settings_html()}
+                </div>
+                
+                <!-- GPU Section (2/3) -->
+                <div class="gpu-section">
+                    {get_gpu_html()}
+                </div>
+            </div>
+        </main>
+        
+        <!-- Toast Notifications Container -->
+        <div id="toast-container" class="toast-container"></div>
+        
+        <footer class="dashboard-footer">
+            <div class="footer-content">
+                <div class="last-refresh">Last refresh: <span id="last-refresh-time">Never</span></div>
+                <div class="blame-text">blame Kotysoft</div>
+            </div>
+        </footer>
+    </div>
+    
+    {scripts_html}
 </body>
 </html>'''
+
+def get_dashboard_template():
+    """Return the complete HTML template for the dashboard with inline styles and scripts"""
+    return get_dashboard_page(f'<style>{get_dashboard_styles()}</style>',
+                              f'<script>{get_dashboard_javascript()}</script>')
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+GPU Collector Client
+Lightweight client for the GPU collector service - the only process that samples GPU hardware.
+Reads the collector's shared-memory segment when it is on the same host, otherwise its HTTP API.
+"""
+
+import logging
+import time
+from urllib.parse import quote
+
+try:
+    from gpu_shared_metrics import SharedMetricsReader
+    SHARED_METRICS_AVAILABLE = True
+except ImportError:
+    SHARED_METRICS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COLLECTOR_URL = 'http://localhost:8081'
+CONNECT_TIMEOUT = 2  # seconds
+READ_TIMEOUT = 5  # seconds
+SHARED_MAX_AGE = 5  # seconds; an older shared snapshot means the collector has stopped publishing
+
+# Collector history metric behind each transcoding engine, per GPU vendor (NVIDIA first, then Intel)
+ENGINE_METRICS = (
+    {'encoder': 'encoder_util', 'decoder': 'decoder_util', 'render': 'gpu_util'},
+    {'encoder': 'video_util', 'decoder': 'video_util', 'render': 'render_util'},
+)
+
+_collector_session = None
+_shared_reader = None
+
+def _get_settings():
+    """Get collector_url and shm_path from [gpu_monitoring] in config.conf"""
+    try:
+        from config import get_gpu_monitoring_settings
+        monitoring_settings = get_gpu_monitoring_settings()  # parsed once per process by config
+    except Exception:
+        monitoring_settings = {}
+    return {
+        'collector_url': (monitoring_settings.get('collector_url') or DEFAULT_COLLECTOR_URL).rstrip('/'),
+        'shm_path': monitoring_settings.get('shm_path') or None
+    }
+
+def get_collector_url():
+    """Get the collector service base URL ([gpu_monitoring] collector_url in config.conf)"""
+    return _get_settings()['collector_url']
+
+def read_shared_snapshot():
+    """Get the collector's latest snapshot from shared memory, or None if it is missing or stale"""
+    global _shared_reader
+    
+    if _shared_reader is None:
+        shm_path = _get_settings()['shm_path']
+        _shared_reader = SharedMetricsReader(shm_path) if SHARED_METRICS_AVAILABLE and shm_path else False
+    if not _shared_reader:
+        return None
+        
+    try:
+        snapshot = _shared_reader.read_snapshot()
+    except Exception as e:
+        logger.error(f"❌ Error reading shared GPU metrics: {e}")
+        return None
+    if snapshot is None or time.time() - snapshot['timestamp'] > SHARED_MAX_AGE:
+        return None
+    return snapshot
+
+def _get_collector_session():
+    """Get the pooled session used for calls to the collector API"""
+    global _collector_session
+    
+    if _collector_session is None:
+        import requests
+        from urllib3.util.retry import Retry
+        from requests.adapters import HTTPAdapter
+        
+        session = requests.Session()
+        
+        # Configure retry strategy for internal calls
+        retry_strategy = Retry(
+            total=2,
+            backoff_factor=0.05,
+            status_forcelist=[500, 502, 503, 504],
+        )
+        
+        # Configure HTTP adapter with connection pooling
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=5,
+            pool_maxsize=5,
+            pool_block=False
+        )
+        
+        session.mount("http://", adapter)
+        _collector_session = session
+        
+    return _collector_session
+
+def _collector_get(path, params=None, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)):
+    """GET a collector endpoint and return the decoded JSON, or None if unavailable"""
+    try:
+        import requests
+        
+        try:
+            response = _get_collector_session().get(f'{get_collector_url()}{path}', params=params, timeout=timeout)
+            if response.status_code == 200:
+                return response.json()
+        except requests.RequestException:
+            pass  # Collector service not running
+    except Exception as e:
+        logger.error(f"❌ Error requesting {path} from GPU collector: {e}")
+    return None
+
+def is_gpu_collector_running():
+    """Check if the GPU collector service is publishing (shared memory) or reachable (HTTP)"""
+    if read_shared_snapshot() is not None:
+        return True
+    health = _collector_get('/api/health')
+    return bool(health) and health.get('status') == 'running'
+
+def get_all_gpu_metrics():
+    """Get unified metrics for ALL GPU devices from the collector"""
+    metrics = _collector_get('/api/all-gpu-metrics')
+    if metrics is None:
+        return {
+            'timestamp': None,
+            'version': 0,
+            'devices': {},
+            'device_count': 0,
+            'nvidia_count': 0,
+            'intel_count': 0,
+            'error': 'GPU collector service not available'
+        }
+    return metrics
+
+def get_device_metrics(device_id):
+    """Get unified metrics for a specific device"""
+    return get_all_gpu_metrics().get('devices', {}).get(device_id)
+
+def get_metrics_by_type(device_type):
+    """Get metrics for all devices of a specific type (nvidia/intel)
+    
+    From shared memory only the core numeric fields are present (utilization,
+    temperature, power, memory, fan, process_count, plex_sessions).
+    """
+    snapshot = read_shared_snapshot()
+    devices = snapshot['devices'] if snapshot is not None else get_all_gpu_metrics().get('devices', {})
+    return {
+        device_id: metrics for device_id, metrics in devices.items()
+        if metrics.get('device_type') == device_type.lower()
+    }
+
+def get_summary_stats():
+    """Get summary statistics across all GPU devices"""
+    snapshot = read_shared_snapshot()
+    if snapshot is not None and snapshot['devices']:
+        devices = list(snapshot['devices'].values())
+        return {
+            'total_devices': len(devices),
+            'nvidia_devices': len([d for d in devices if d.get('device_type') == 'nvidia']),
+            'intel_devices': len([d for d in devices if d.get('device_type') == 'intel']),
+            'active_devices': len([d for d in devices if d.get('status') == 'success']),
+            'avg_utilization': round(sum(d.get('utilization_percent', 0) for d in devices) / len(devices), 1),
+            'total_processes': sum(d.get('process_count', 0) for d in devices),
+            'total_power_watts': round(sum(d.get('power_watts', 0) for d in devices), 1)
+        }
+        
+    return _collector_get('/api/summary-stats') or {
+        'total_devices': 0,
+        'nvidia_devices': 0,
+        'intel_devices': 0,
+        'active_devices': 0,
+        'avg_utilization': 0,
+        'total_processes': 0,
+        'total_power_watts': 0
+    }
+
+def get_gpu_metrics():
+    """Get GPU metrics in the legacy nvidia/intel format"""
+    metrics = _collector_get('/api/gpu-metrics')
+    if metrics is None:
+        return {'error': 'GPU collector service not available'}
+    return metrics
+
+def get_historical_matrix():
+    """Get the 10s/30s/1m/5m load-average matrix for all devices"""
+    return _collector_get('/api/historical-data') or {}
+
+def get_monitor_data(device_type):
+    """Get raw per-device data from the collector's NVIDIA or Intel monitors"""
+    data = _collector_get(f'/api/monitor-data/{quote(device_type, safe="")}')
+    return data.get('devices', {}) if data else {}
+
+def _get_shared_device_loads(device_ids, windows):
+    """Windowed loads from shared memory, or None when the segment is stale or too short for a window"""
+    if read_shared_snapshot() is None:
+        return None
+    try:
+        return _shared_reader.get_device_loads(device_ids, windows)
+    except Exception as e:
+        logger.error(f"❌ Error reading shared GPU history: {e}")
+        return None
+
+def get_device_load_data(device_id, timeframe_seconds=30):
+    """Get device HISTORICAL AVERAGE load over timeframe (client API for balancer)"""
+    shared_loads = _get_shared_device_loads([device_id], [timeframe_seconds])
+    if shared_loads is not None:
+        return shared_loads[device_id][int(timeframe_seconds)]
+        
+    encoded_device_id = quote(device_id, safe='')
+    data = _collector_get(f'/api/device-load/{encoded_device_id}/{timeframe_seconds}')
+    return data.get('load_percent') if data else None
+
+def get_device_loads(device_ids, windows):
+    """Get load percentages for many devices and windows in one request (client API for balancer)
+    
+    Returns {device_id: {window_seconds: load_percent or None}}
+    """
+    device_ids = list(device_ids)
+    windows = sorted(set(int(window) for window in windows))
+    loads = {device_id: {window: None for window in windows} for device_id in device_ids}
+    
+    if not device_ids or not windows:
+        return loads
+        
+    shared_loads = _get_shared_device_loads(device_ids, windows)
+    if shared_loads is not None:
+        return shared_loads
+        
+    data = _collector_get('/api/device-loads', params={'device': device_ids, 'window': windows})
+    if data:
+        for device_id, device_windows in data.get('devices', {}).items():
+            if device_id in loads and device_windows:
+                for window, stats in device_windows.items():
+                    if stats and int(window) in loads[device_id]:
+                        loads[device_id][int(window)] = stats.get('load_percent')
+                        
+    return loads
+
+def get_device_engine_loads(device_ids, window_seconds):
+    """Get per-engine average utilization for many devices over one window (client API for balancer)
+    
+    Returns {device_id: {'encoder', 'decoder', 'render': percent} or None}. Intel exposes a
+    single video engine, so its encoder and decoder loads are both the video engine load.
+    """
+    device_ids = list(device_ids)
+    engine_loads = {device_id: None for device_id in device_ids}
+    if not device_ids:
+        return engine_loads
+        
+    # Per-metric averages are only served over HTTP; shared memory carries the combined load only
+    window = int(window_seconds)
+    data = _collector_get('/api/device-loads', params={'device': device_ids, 'window': [window]})
+    if data:
+        for device_id, device_windows in data.get('devices', {}).items():
+            stats = (device_windows or {}).get(str(window))
+            if device_id not in engine_loads or not stats:
+                continue
+            averages = stats.get('average', {})
+            for metrics in ENGINE_METRICS:
+                if all(metric in averages for metric in metrics.values()):
+                    engine_loads[device_id] = {engine: averages[metric] for engine, metric in metrics.items()}
+                    break
+                    
+    return engine_loads
+
+def get_load_forecasts(device_ids, horizon_seconds, threshold_percentage=None):
+    """Get Holt-trend load forecasts per device from the collector (client API for balancer)
+    
+    Returns {device_id: forecast or None}; each forecast has projected_load_percent and,
+    with a threshold, headroom_percent and seconds_to_threshold (None if not rising).
+    """
+    device_ids = list(device_ids)
+    forecasts = {device_id: None for device_id in device_ids}
+    if not device_ids:
+        return forecasts
+        
+    params = {'device': device_ids, 'horizon': horizon_seconds}
+    if threshold_percentage is not None:
+        params['threshold'] = threshold_percentage
+    data = _collector_get('/api/load-forecast', params=params)
+    if data:
+        for device_id, forecast in data.get('devices', {}).items():
+            if device_id in forecasts:
+                forecasts[device_id] = forecast
+                
+    return forecasts
+
+def wait_for_collector_snapshot(after_version=0, timeout=10):
+    """Long-poll the collector until a metrics snapshot newer than after_version exists (client API)
+    
+    Returns {'version', 'timestamp', 'changed', 'devices'} or None if the collector is unreachable.
+    """
+    return _collector_get('/api/snapshot', params={'after': after_version, 'timeout': timeout},
+                          timeout=(CONNECT_TIMEOUT, timeout + READ_TIMEOUT))
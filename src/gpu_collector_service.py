@@ -16,13 +16,22 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from gpu_metrics import (
     start_gpu_metrics_collector, stop_gpu_metrics_collector,
     get_all_gpu_metrics, get_device_metrics, get_active_device_metrics,
-    get_summary_stats, start_background_workers, stop_background_workers
+    get_summary_stats, start_background_workers, stop_background_workers,
+    get_snapshot, wait_for_snapshot, get_gpu_metrics as get_legacy_gpu_metrics
 )
 
 from historical_gpu_data import (
     start_historical_data_collector, stop_historical_data_collector,
     get_all_devices_historical_matrix, get_device_historical_matrix,
-    get_data_availability
+    get_data_availability, get_history_memory_usage,
+    get_persisted_history, get_journal_stats, get_shared_metrics_stats,
+    get_load_forecasts
+)
+
+# Client API lives in gpu_collector_client; re-exported here for existing importers
+from gpu_collector_client import (
+    get_device_load_data, get_device_loads, wait_for_collector_snapshot,
+    is_gpu_collector_running as is_collector_service_reachable
 )
 
 # Import individual GPU monitors
@@ -107,9 +116,21 @@ class GPUCollectorService:
         
         # Start historical data collector LAST
         logger.info("📊 Starting Historical GPU Data Collector...")
-        self.historical_started = start_historical_data_collector()
+        from config import get_gpu_monitoring_settings
+        shm_path = get_gpu_monitoring_settings().get('shm_path') or None
+        self.historical_started = start_historical_data_collector(persist=True, shared_memory_path=shm_path)
         if self.historical_started:
             logger.info("   ✅ Historical data collector started successfully")
+            journal_stats = get_journal_stats()
+            if journal_stats:
+                logger.info(f"   💾 History journal: {journal_stats['directory']} ({journal_stats['devices']} devices restored)")
+            else:
+                logger.warning("   ⚠️  History journal unavailable - history will not survive restarts")
+            shared_stats = get_shared_metrics_stats()
+            if shared_stats:
+                logger.info(f"   🧠 Shared metrics segment: {shared_stats['path']} ({shared_stats['bytes']} bytes)")
+            elif shm_path:
+                logger.warning("   ⚠️  Shared metrics segment unavailable - clients will use the HTTP API")
             time.sleep(1)
         else:
             logger.warning("   ⚠️  Historical data collector failed to start")
@@ -226,18 +247,10 @@ def stop_gpu_collector_service():
         _gpu_service = None
 
 def is_gpu_collector_running():
-    """Check if the GPU collector service is running (cross-process compatible)"""
-    try:
-        # Test if the monitoring components are actually working
-        metrics = get_all_gpu_metrics()
-        historical_data = get_all_devices_historical_matrix()
-        
-        # If we can get metrics and historical data, the service is running
-        return (isinstance(metrics, dict) and 
-                isinstance(historical_data, (dict, list)) and
-                metrics.get('timestamp') is not None)
-    except Exception:
-        return False
+    """Check if the GPU collector service is running (in this process or as the standalone service)"""
+    if _gpu_service is not None and _gpu_service.running:
+        return True
+    return is_collector_service_reachable()
 
 # API functions for clients to use
 def get_gpu_metrics():
@@ -248,76 +261,6 @@ def get_gpu_metrics():
         logger.error(f"❌ Error getting GPU metrics: {e}")
         return {'error': str(e)}
 
-def get_device_load_data(device_id, timeframe_seconds=30):
-    """Get device HISTORICAL AVERAGE load over timeframe (client API for balancer)"""
-    try:
-        # Use collector service API directly - centralized historical data!
-        import requests
-        from urllib.parse import quote
-        from urllib3.util.retry import Retry
-        from requests.adapters import HTTPAdapter
-        
-        try:
-            # Create optimized session for internal API calls
-            if not hasattr(get_device_load_data, 'session'):
-                get_device_load_data.session = requests.Session()
-                
-                # Configure retry strategy for internal calls
-                retry_strategy = Retry(
-                    total=2,
-                    backoff_factor=0.05,
-                    status_forcelist=[500, 502, 503, 504],
-                )
-                
-                # Configure HTTP adapter with connection pooling
-                adapter = HTTPAdapter(
-                    max_retries=retry_strategy,
-                    pool_connections=5,
-                    pool_maxsize=5,
-                    pool_block=False
-                )
-                
-                get_device_load_data.session.mount("http://", adapter)
-                get_device_load_data.session.timeout = (2, 5)  # Faster internal timeouts
-            
-            # URL encode the device ID for the API call
-            encoded_device_id = quote(device_id, safe='')
-            collector_url = f'http://localhost:8081/api/device-load/{encoded_device_id}/{timeframe_seconds}'
-            
-            response = get_device_load_data.session.get(collector_url)
-            if response.status_code == 200:
-                data = response.json()
-                load_percent = data.get('load_percent')
-                
-                if load_percent is not None:
-                    return load_percent  # Already rounded by collector service
-        
-        except requests.RequestException:
-            # Collector service not available, try local historical data (fallback)
-            pass
-        
-        # Fallback: try local historical data directly
-        try:
-            from historical_gpu_data import get_historical_averages
-            averages = get_historical_averages(device_id, timeframe_seconds)
-            
-            if averages and isinstance(averages, dict):
-                highest_util = averages.get('highest', 0)
-                if highest_util >= 0:  # Include zero values!
-                    return round(highest_util, 2)
-                
-                main_load = averages.get('main_load', 0)
-                if main_load >= 0:  # Include zero values!
-                    return round(main_load, 2)
-        except Exception:
-            pass
-        
-        return None
-        
-    except Exception as e:
-        logger.error(f"❌ Error getting device load data for {device_id}: {e}")
-        return None
-
 def get_device_historical_data(device_id):
     """Get historical data for device (client API)"""
     try:
@@ -330,6 +273,8 @@ def get_device_historical_data(device_id):
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+SNAPSHOT_MAX_WAIT = 30  # seconds a /api/snapshot long-poll may block
+
 @app.route('/api/historical-data')
 def api_historical_data():
     """Get historical data matrix for ALL devices (dashboard bulk request)"""
@@ -340,6 +285,66 @@ def api_historical_data():
         logger.error(f"❌ Error getting historical data matrix: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/health')
+def api_health():
+    """Cheap liveness check for dashboard and balancer clients"""
+    snapshot = get_snapshot()
+    return jsonify({
+        'status': 'running',
+        'version': snapshot.version,
+        'device_count': len(snapshot.devices),
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/api/all-gpu-metrics')
+def api_all_gpu_metrics():
+    """Get unified metrics for ALL GPU devices (dashboard and balancer clients)"""
+    try:
+        return jsonify(get_all_gpu_metrics())
+    except Exception as e:
+        logger.error(f"❌ Error getting GPU metrics: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/summary-stats')
+def api_summary_stats():
+    """Get summary statistics across all GPU devices"""
+    try:
+        return jsonify(get_summary_stats())
+    except Exception as e:
+        logger.error(f"❌ Error getting summary stats: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/gpu-metrics')
+def api_gpu_metrics():
+    """Get GPU metrics in the legacy nvidia/intel format"""
+    try:
+        return jsonify(get_legacy_gpu_metrics())
+    except Exception as e:
+        logger.error(f"❌ Error getting legacy GPU metrics: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/monitor-data/<device_type>')
+def api_monitor_data(device_type):
+    """Get raw per-device data from the NVIDIA or Intel monitors"""
+    try:
+        if device_type == 'nvidia' and NVIDIA_MONITOR_AVAILABLE:
+            from nvidia_gpu_monitor import get_all_nvidia_gpu_data
+            devices = get_all_nvidia_gpu_data()
+        elif device_type == 'intel' and INTEL_MONITOR_AVAILABLE:
+            from intel_gpu_monitor import get_all_intel_gpu_data
+            devices = get_all_intel_gpu_data()
+        else:
+            return jsonify({'error': f'{device_type} GPU monitor not available'}), 404
+        
+        return jsonify({
+            'device_type': device_type,
+            'devices': devices,
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        logger.error(f"❌ Error getting {device_type} monitor data: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/device-load/<device_id>/<int:timeframe_seconds>')
 def api_device_load(device_id, timeframe_seconds):
     """Get specific device load for specific timeframe (balancer request)"""
@@ -384,6 +389,146 @@ def api_device_load(device_id, timeframe_seconds):
         logger.error(f"❌ Error getting device load for {device_id}: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/device-loads', methods=['GET', 'POST'])
+def api_device_loads():
+    """Get average/max/highest load for many devices and windows in one response (balancer bulk request)"""
+    try:
+        from flask import request
+        from historical_gpu_data import get_bulk_historical_stats
+        
+        if request.method == 'POST':
+            payload = request.get_json(silent=True) or {}
+            device_ids = payload.get('device_ids', [])
+            windows = payload.get('windows', [])
+        else:
+            device_ids = request.args.getlist('device')
+            windows = request.args.getlist('window')
+        
+        try:
+            windows = sorted(set(int(window) for window in windows))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'windows must be integers (seconds)'}), 400
+        
+        if not device_ids or not windows:
+            return jsonify({'error': 'at least one device and one window are required'}), 400
+        
+        bulk_stats = get_bulk_historical_stats(device_ids, windows)
+        
+        devices = {}
+        for device_id, device_windows in bulk_stats.items():
+            if device_windows is None:
+                devices[device_id] = None
+                continue
+            devices[device_id] = {}
+            for window, stats in device_windows.items():
+                if stats is None:
+                    devices[device_id][str(window)] = None
+                    continue
+                devices[device_id][str(window)] = {
+                    'load_percent': round(stats['highest'], 2),
+                    'average': {key: round(value, 2) for key, value in stats['average'].items()},
+                    'max': stats['max'],
+                    'highest': round(stats['highest'], 2),
+                    'samples': stats['samples']
+                }
+        
+        return jsonify({
+            'devices': devices,
+            'windows': windows,
+            'timestamp': datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        logger.error(f"❌ Error getting bulk device loads: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/load-forecast')
+def api_load_forecast():
+    """Get projected load, headroom and time to threshold per device (balancer predictive overload check)
+    
+    Query: ?device=<id> (repeatable, default all), ?horizon=<seconds> (default 30)
+    and optional ?threshold=<percent> for headroom_percent and seconds_to_threshold.
+    """
+    try:
+        from flask import request
+        
+        device_ids = request.args.getlist('device') or None
+        try:
+            horizon = float(request.args.get('horizon', 30))
+            threshold = request.args.get('threshold')
+            threshold = float(threshold) if threshold is not None else None
+        except ValueError:
+            return jsonify({'error': 'horizon and threshold must be numbers'}), 400
+            
+        return jsonify({
+            'devices': get_load_forecasts(device_ids, horizon, threshold),
+            'horizon_seconds': horizon,
+            'threshold_percentage': threshold,
+            'timestamp': datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        logger.error(f"❌ Error getting load forecasts: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/history/<device_id>')
+def api_device_history(device_id):
+    """Get persisted multi-day history for a device from the on-disk journal (?tier=1s|10s|1m&since=&until=&limit=)"""
+    try:
+        from flask import request
+        
+        tier = request.args.get('tier', '10s')
+        try:
+            since = float(request.args.get('since', time.time() - 3600))
+            until = float(request.args['until']) if 'until' in request.args else None
+            limit = int(request.args['limit']) if 'limit' in request.args else None
+        except ValueError:
+            return jsonify({'error': 'since/until must be epoch seconds and limit an integer'}), 400
+        
+        try:
+            history = get_persisted_history(device_id, tier, since, until, limit)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if history is None:
+            return jsonify({'error': 'History journal is not enabled'}), 503
+        
+        history['timestamp'] = datetime.now().isoformat()
+        return jsonify(history)
+        
+    except Exception as e:
+        logger.error(f"❌ Error getting persisted history for {device_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/snapshot')
+def api_snapshot():
+    """Long-poll for the next metrics snapshot (?after=<version>&timeout=<seconds>)"""
+    try:
+        from flask import request
+        
+        try:
+            after_version = int(request.args.get('after', 0))
+            timeout = min(max(float(request.args.get('timeout', 10)), 0), SNAPSHOT_MAX_WAIT)
+        except ValueError:
+            return jsonify({'error': 'after must be an integer and timeout a number of seconds'}), 400
+        
+        snapshot = wait_for_snapshot(after_version, timeout) if timeout else None
+        changed = snapshot is not None
+        if snapshot is None:
+            snapshot = get_snapshot()
+            changed = snapshot.version > after_version
+        
+        return jsonify({
+            'version': snapshot.version,
+            'timestamp': snapshot.timestamp,
+            'changed': changed,
+            'devices': dict(snapshot.devices)
+        })
+        
+    except Exception as e:
+        logger.error(f"❌ Error serving metrics snapshot: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/status')
 def api_status():
     """Service status endpoint"""
@@ -396,6 +541,9 @@ def api_status():
             'service': 'GPU Collector Service',
             'device_count': metrics.get('device_count', 0),
             'historical_data_available': historical_available,
+            'history_memory_bytes': get_history_memory_usage(),
+            'history_journal': get_journal_stats(),
+            'shared_metrics': get_shared_metrics_stats(),
             'timestamp': datetime.now().isoformat()
         })
     except Exception as e:
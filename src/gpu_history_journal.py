@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+GPU History Journal
+Memory-mapped on-disk journal of GPU history samples with 1s -> 10s -> 1m rollups
+"""
+
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Journal tiers: label -> (bucket seconds, record capacity)
+# Each tier file is a fixed-size ring, so disk usage is bounded up front
+JOURNAL_TIERS = {
+    '1s': (1, 86400),    # 1 day of raw samples
+    '10s': (10, 60480),  # 7 days of 10 second rollups
+    '1m': (60, 43200)    # 30 days of 1 minute rollups
+}
+JOURNAL_FLUSH_INTERVAL = 60  # seconds between msync calls; the page cache survives process restarts anyway
+
+JOURNAL_MAGIC = b'GPUHIST1'
+JOURNAL_VERSION = 1
+# magic, version, metric count, capacity, tier seconds, device type, device id, next sequence
+HEADER_FORMAT = '<8sHHII16s64sQ'
+HEADER_SIZE = 128
+NEXT_SEQUENCE_OFFSET = struct.calcsize(HEADER_FORMAT) - 8
+
+def get_default_journal_dir() -> str:
+    """Default journal location: <project root>/data/history"""
+    try:
+        from config import get_project_root
+        project_root = get_project_root()
+    except ImportError:
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, 'data', 'history')
+
+class JournalFile:
+    """One tier of one device: a header followed by a ring of fixed-size records
+    
+    A record is a float64 timestamp followed by per-metric averages and maxima
+    as uint16 hundredths of a percent. The record is written before the header's
+    sequence counter is bumped, so a crash never exposes a half-written record.
+    """
+
+    def __init__(self, path: str, device_id: str, device_type: str, metric_count: int,
+                 tier_seconds: int, capacity: int):
+        self.path = path
+        self.metric_count = metric_count
+        self.capacity = capacity
+        self.record = struct.Struct(f'<d{metric_count * 2}H')
+        size = HEADER_SIZE + self.record.size * capacity
+        
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            existing_size = os.fstat(fd).st_size
+            if existing_size != size:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+            self.map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+            
+        header = struct.unpack_from(HEADER_FORMAT, self.map, 0)
+        if header[:5] != (JOURNAL_MAGIC, JOURNAL_VERSION, metric_count, capacity, tier_seconds):
+            # New file or incompatible layout - start over
+            self.map[:HEADER_SIZE] = bytes(HEADER_SIZE)
+            struct.pack_into(HEADER_FORMAT, self.map, 0, JOURNAL_MAGIC, JOURNAL_VERSION, metric_count,
+                             capacity, tier_seconds, device_type.encode()[:16], device_id.encode()[:64], 0)
+            self.next_sequence = 0
+        else:
+            self.next_sequence = header[7]
+            
+    def _offset(self, sequence: int) -> int:
+        return HEADER_SIZE + (sequence % self.capacity) * self.record.size
+        
+    def last_timestamp(self) -> Optional[float]:
+        if not self.next_sequence:
+            return None
+        return self.record.unpack_from(self.map, self._offset(self.next_sequence - 1))[0]
+        
+    def append(self, timestamp: float, averages, maxima):
+        """Write one record and publish it by bumping the sequence counter"""
+        last_timestamp = self.last_timestamp()
+        if last_timestamp is not None and timestamp < last_timestamp:
+            timestamp = last_timestamp  # Keep timestamps monotonic for binary-searchable reads
+            
+        self.record.pack_into(self.map, self._offset(self.next_sequence), timestamp, *averages, *maxima)
+        self.next_sequence += 1
+        struct.pack_into('<Q', self.map, NEXT_SEQUENCE_OFFSET, self.next_sequence)
+        
+    def read(self, since: float = 0, until: Optional[float] = None, limit: Optional[int] = None) -> List[tuple]:
+        """Get (timestamp, averages, maxima) records in [since, until], oldest first"""
+        records = []
+        first_sequence = max(0, self.next_sequence - self.capacity)
+        metric_count = self.metric_count
+        
+        # Walk backwards from the newest record so recent reads stay cheap
+        for sequence in range(self.next_sequence - 1, first_sequence - 1, -1):
+            values = self.record.unpack_from(self.map, self._offset(sequence))
+            timestamp = values[0]
+            if timestamp < since:
+                break
+            if until is not None and timestamp > until:
+                continue
+            records.append((timestamp, values[1:1 + metric_count], values[1 + metric_count:]))
+            if limit is not None and len(records) >= limit:
+                break
+                
+        records.reverse()
+        return records
+        
+    def flush(self):
+        self.map.flush()
+        
+    def close(self):
+        self.map.flush()
+        self.map.close()
+
+class _RollupBucket:
+    """Accumulates averages and maxima for one rollup interval"""
+
+    def __init__(self, metric_count: int):
+        self.start = None
+        self.count = 0
+        self.sums = [0] * metric_count
+        self.maxima = [0] * metric_count
+        
+    def add(self, bucket_start: float, values) -> Optional[tuple]:
+        """Add a sample; returns the finished (start, averages, maxima) when a new bucket begins"""
+        finished = None
+        if self.start is not None and bucket_start != self.start:
+            finished = self.take()
+            
+        self.start = bucket_start
+        self.count += 1
+        for index, value in enumerate(values):
+            self.sums[index] += value
+            if value > self.maxima[index]:
+                self.maxima[index] = value
+        return finished
+        
+    def take(self) -> Optional[tuple]:
+        """Get the (start, averages, maxima) collected so far, or None if empty, and reset the bucket"""
+        if not self.count:
+            return None
+        finished = (self.start, [round(total / self.count) for total in self.sums], list(self.maxima))
+        self.count = 0
+        self.sums = [0] * len(self.sums)
+        self.maxima = [0] * len(self.maxima)
+        return finished
+
+class DeviceJournal:
+    """All journal tiers for one device plus the in-progress rollup buckets"""
+
+    def __init__(self, directory: str, device_id: str, device_type: str, metric_count: int):
+        self.device_type = device_type
+        self.metric_count = metric_count
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', device_id)
+        self.tiers = {
+            label: JournalFile(os.path.join(directory, f'{safe_name}.{label}.bin'), device_id, device_type,
+                               metric_count, tier_seconds, capacity)
+            for label, (tier_seconds, capacity) in JOURNAL_TIERS.items()
+        }
+        self.rollups = {
+            label: _RollupBucket(metric_count)
+            for label, (tier_seconds, _) in JOURNAL_TIERS.items() if tier_seconds > 1
+        }
+        
+    def append(self, timestamp: float, scaled_values: tuple):
+        self.tiers['1s'].append(timestamp, scaled_values, scaled_values)
+        
+        for label, bucket in self.rollups.items():
+            tier_seconds = JOURNAL_TIERS[label][0]
+            finished = bucket.add(timestamp - timestamp % tier_seconds, scaled_values)
+            if finished:
+                self.tiers[label].append(*finished)
+                
+    def flush(self):
+        for journal_file in self.tiers.values():
+            journal_file.flush()
+            
+    def close(self):
+        # Keep the partial rollups (e.g. the last 40s of a minute) instead of dropping them on shutdown
+        for label, bucket in self.rollups.items():
+            partial = bucket.take()
+            if partial:
+                self.tiers[label].append(*partial)
+        for journal_file in self.tiers.values():
+            journal_file.close()
+
+class HistoryJournal:
+    """Directory of per-device journals; appends come from the history collector thread"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or get_default_journal_dir()
+        os.makedirs(self.directory, exist_ok=True)
+        self.devices: Dict[str, DeviceJournal] = {}
+        self.lock = threading.Lock()
+        self.closed = False
+        self.last_flush = time.time()
+        self.records_written = 0
+        
+    def _get_device(self, device_id: str, device_type: str, metric_count: int) -> DeviceJournal:
+        journal = self.devices.get(device_id)
+        if journal is None or journal.metric_count != metric_count:
+            if journal is not None:
+                journal.close()  # Release its maps before the tier files are reopened with the new layout
+            journal = DeviceJournal(self.directory, device_id, device_type, metric_count)
+            self.devices[device_id] = journal
+        return journal
+        
+    def append(self, device_id: str, device_type: str, timestamp: float, scaled_values: tuple):
+        """Append one sample of scaled (hundredths of a percent) metric values"""
+        with self.lock:
+            if self.closed:
+                return
+            self._get_device(device_id, device_type, len(scaled_values)).append(timestamp, scaled_values)
+            self.records_written += 1
+            
+            if timestamp - self.last_flush >= JOURNAL_FLUSH_INTERVAL:
+                self.last_flush = timestamp
+                for journal in self.devices.values():
+                    journal.flush()
+                    
+    def list_devices(self) -> Dict[str, tuple]:
+        """Get device_id -> (device_type, metric_count) for every journal on disk"""
+        devices = {}
+        for filename in sorted(os.listdir(self.directory)):
+            if not filename.endswith('.1s.bin'):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename), 'rb') as journal_file:
+                    header = struct.unpack(HEADER_FORMAT, journal_file.read(struct.calcsize(HEADER_FORMAT)))
+            except (OSError, struct.error):
+                continue
+            if header[0] != JOURNAL_MAGIC or header[1] != JOURNAL_VERSION:
+                continue
+            device_id = header[6].rstrip(b'\x00').decode(errors='replace')
+            devices[device_id] = (header[5].rstrip(b'\x00').decode(errors='replace'), header[2])
+        return devices
+        
+    def read(self, device_id: str, tier: str = '1s', since: float = 0,
+             until: Optional[float] = None, limit: Optional[int] = None) -> List[tuple]:
+        """Read (timestamp, averages, maxima) records for a device tier"""
+        if tier not in JOURNAL_TIERS:
+            raise ValueError(f"Unknown journal tier: {tier}")
+            
+        with self.lock:
+            if self.closed:
+                return []
+            journal = self.devices.get(device_id)
+            if journal is None:
+                device_info = self.list_devices().get(device_id)
+                if device_info is None:
+                    return []
+                journal = self._get_device(device_id, *device_info)
+            return journal.tiers[tier].read(since, until, limit)
+            
+    def get_stats(self) -> dict:
+        """Get journal location, size and write statistics"""
+        with self.lock:
+            size = 0
+            for journal in self.devices.values():
+                size += sum(len(journal_file.map) for journal_file in journal.tiers.values())
+            return {
+                'directory': self.directory,
+                'devices': len(self.devices),
+                'bytes': size,
+                'records_written': self.records_written,
+                'tiers': {label: {'seconds': seconds, 'capacity': capacity}
+                          for label, (seconds, capacity) in JOURNAL_TIERS.items()}
+            }
+            
+    def close(self):
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            for journal in self.devices.values():
+                journal.close()
+            self.devices.clear()
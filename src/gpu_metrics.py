@@ -7,13 +7,28 @@ Collects data from all individual GPU workers and provides unified dashboard API
 import threading
 import time
 from datetime import datetime
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
+
+class MetricsSnapshot(NamedTuple):
+    """Immutable unified metrics published by the collector; version increases by one per publish"""
+    version: int
+    timestamp: float
+    devices: Mapping[str, dict]
 
 # Global unified cache
 _unified_device_cache = {}
 _cache_lock = threading.Lock()
+_snapshot_condition = threading.Condition(_cache_lock)  # notified on every publish
+_latest_snapshot = MetricsSnapshot(0, 0.0, MappingProxyType({}))
+_device_update_event = threading.Event()  # set by monitors when they store a new sample
 _collector_running = False
 _collector_thread = None
 
+# Publishing configuration
+PUBLISH_MAX_INTERVAL = 1.0  # seconds; publish at least this often even without monitor pushes
+PUBLISH_COALESCE_DELAY = 0.05  # seconds to let the other monitors of the same sampling cycle land
+
 def start_gpu_metrics_collector():
     """Start the central GPU metrics collector"""
     global _collector_running, _collector_thread
@@ -31,11 +46,49 @@ def stop_gpu_metrics_collector():
     global _collector_running
     _collector_running = False
 
+def notify_device_update():
+    """Wake the collector after a device monitor stored a new sample"""
+    _device_update_event.set()
+
+def _publish_snapshot(unified_data):
+    """Publish unified data as the next immutable snapshot and wake all waiters"""
+    global _unified_device_cache, _latest_snapshot
+    
+    with _snapshot_condition:
+        _unified_device_cache = unified_data
+        _latest_snapshot = MetricsSnapshot(
+            version=_latest_snapshot.version + 1,
+            timestamp=time.time(),
+            devices=MappingProxyType(unified_data)
+        )
+        _snapshot_condition.notify_all()
+
+def get_snapshot() -> MetricsSnapshot:
+    """Get the latest published snapshot without waiting"""
+    if not _collector_running:
+        start_gpu_metrics_collector()
+    return _latest_snapshot
+
+def wait_for_snapshot(after_version: int, timeout: Optional[float] = None) -> Optional[MetricsSnapshot]:
+    """Block until a snapshot newer than after_version is published; None on timeout"""
+    if not _collector_running:
+        start_gpu_metrics_collector()
+        
+    with _snapshot_condition:
+        if _snapshot_condition.wait_for(lambda: _latest_snapshot.version > after_version, timeout):
+            return _latest_snapshot
+    return None
+
 def _collector_worker():
-    """Central collector worker that gathers data from all device monitors"""
-    global _unified_device_cache, _collector_running
+    """Central collector worker that publishes a snapshot whenever device monitors push new samples"""
+    global _collector_running
     
     while _collector_running:
+        # Wait for a monitor push (falling back to a periodic publish), then coalesce the burst
+        if _device_update_event.wait(PUBLISH_MAX_INTERVAL):
+            time.sleep(PUBLISH_COALESCE_DELAY)
+        _device_update_event.clear()
+        
         try:
             unified_data = {}
             
@@ -112,7 +165,8 @@ def _collector_worker():
                                     'frequency_mhz': metrics.get('frequency_mhz', 0),
                                     'power_gpu_watts': metrics.get('power_gpu', 0),
                                     'engines': metrics.get('engines', {}),
-                                    'intel_gpu_top_available': True
+                                    'intel_gpu_top_available': metrics.get('backend', 'intel_gpu_top') == 'intel_gpu_top',
+                                    'backend': metrics.get('backend', 'intel_gpu_top')
                                 }
                             }
             except ImportError:
@@ -123,8 +177,23 @@ def _collector_worker():
             # Apply Intel GPU process count fallback logic
             intel_devices = [device_id for device_id, data in unified_data.items() if data.get('device_type') == 'intel']
             
-            # Only apply fallback if there's exactly one Intel GPU
-            if len(intel_devices) == 1:
+            # Exact Plex session counts per device from transcoder processes, when visible
+            # (no /status/sessions join here - only transcoders holding a GPU open are counted)
+            attributed_sessions = None
+            try:
+                from plex_process_attribution import get_sessions_per_device
+                attributed_sessions = get_sessions_per_device(list(unified_data))
+            except Exception:
+                pass
+            
+            if attributed_sessions is not None:
+                for device_id, session_count in attributed_sessions.items():
+                    unified_data[device_id]['plex_sessions'] = session_count
+                for device_id in intel_devices:
+                    unified_data[device_id]['process_count'] = attributed_sessions[device_id]
+                    
+            # Only apply fallback if there's exactly one Intel GPU without exact process counts
+            elif len(intel_devices) == 1 and not (unified_data[intel_devices[0]]['processes'] or {}).get('exact'):
                 intel_device_id = intel_devices[0]
                 try:
                     # Get Plex transcoding sessions
@@ -149,14 +218,11 @@ def _collector_worker():
                 except Exception:
                     pass  # If fallback fails, keep original process count
             
-            # Update unified cache
-            with _cache_lock:
-                _unified_device_cache = unified_data
+            # Publish the new snapshot
+            _publish_snapshot(unified_data)
                 
         except Exception as e:
             pass  # Continue running even if there's an error
-        
-        time.sleep(1)  # Update every second
 
 def get_all_gpu_metrics():
     """Get unified metrics for ALL GPU devices"""
@@ -169,6 +235,7 @@ def get_all_gpu_metrics():
     with _cache_lock:
         return {
             'timestamp': datetime.now().isoformat(),
+            'version': _latest_snapshot.version,
             'devices': _unified_device_cache.copy(),
             'device_count': len(_unified_device_cache),
             'nvidia_count': len([d for d in _unified_device_cache.values() if d.get('device_type') == 'nvidia']),
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+GPU Shared Metrics
+Fixed-layout shared-memory segment with the collector's latest snapshot and recent history,
+guarded by a seqlock so same-host readers get consistent data without sockets or JSON
+"""
+
+import math
+import mmap
+import os
+import struct
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+DEFAULT_SHM_PATH = '/dev/shm/plex-gpu-metrics'
+MAX_DEVICES = 16
+HISTORY_CAPACITY = 600  # samples per device (10 minutes at 1 second intervals)
+HISTORY_METRICS = 5     # metric columns per sample (NVIDIA tracks 5, Intel 4)
+VALUE_SCALE = 100       # history values are integer hundredths of a percent
+READ_RETRIES = 100      # seqlock retries before a reader gives up on a busy writer
+REOPEN_INTERVAL = 1.0   # seconds between checks for a replaced segment file
+
+SHM_MAGIC = b'GPUSHM01'
+SHM_VERSION = 1
+# Native byte order throughout: the segment never leaves the host, and readers cast history columns directly
+# magic, version, max devices, history capacity, history metrics, reserved,
+# sequence (odd while a write is in progress), snapshot version, snapshot timestamp, device count
+HEADER = struct.Struct('=8sHHIHHQQdI')
+HEADER_SIZE = 64
+SEQUENCE_OFFSET = 20
+
+# Current values published per device; NaN marks a value the collector does not have
+CURRENT_FIELDS = ('utilization_percent', 'temperature_celsius', 'power_watts', 'memory_used_mb',
+                  'memory_total_mb', 'fan_speed_percent', 'process_count', 'plex_sessions')
+INTEGER_FIELDS = ('process_count', 'plex_sessions')
+# device id, device type, device name, status ok, history metric count, highest-metric bitmask,
+# sample timestamp, current values, history next sequence
+SLOT_HEADER = struct.Struct(f'=64s8s64sBBHd{len(CURRENT_FIELDS)}dQ')
+SLOT_HEADER_SIZE = 256
+
+def _slot_size(history_capacity: int, history_metrics: int) -> int:
+    return SLOT_HEADER_SIZE + history_capacity * 8 + history_capacity * history_metrics * 2
+
+def _decode(raw: bytes) -> str:
+    return raw.rstrip(b'\x00').decode(errors='replace')
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+class SharedMetricsWriter:
+    """Single writer for the shared segment; only the collector process creates one
+    
+    Every update happens inside transaction(): the sequence counter is made odd
+    before the first byte changes and even again after the last, so readers can
+    detect and retry torn reads.
+    """
+
+    def __init__(self, path: str = DEFAULT_SHM_PATH, max_devices: int = MAX_DEVICES,
+                 history_capacity: int = HISTORY_CAPACITY, history_metrics: int = HISTORY_METRICS):
+        self.path = path
+        self.max_devices = max_devices
+        self.history_capacity = history_capacity
+        self.history_metrics = history_metrics
+        self.slot_size = _slot_size(history_capacity, history_metrics)
+        self.size = HEADER_SIZE + self.slot_size * max_devices
+        self.slots: Dict[str, int] = {}
+        self.next_sequences: Dict[str, int] = {}
+        
+        # Never resize a file readers may have mapped (SIGBUS) - replace it instead
+        if os.path.exists(path) and os.path.getsize(path) != self.size:
+            os.unlink(path)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != self.size:
+                os.ftruncate(fd, self.size)
+            self.map = mmap.mmap(fd, self.size)
+        finally:
+            os.close(fd)
+            
+        # Keep the sequence counter increasing across collector restarts
+        header = HEADER.unpack_from(self.map, 0)
+        self.sequence = header[6] + (header[6] & 1) if header[0] == SHM_MAGIC else 0
+        with self.transaction():
+            self.map[SEQUENCE_OFFSET + 8:] = bytes(self.size - SEQUENCE_OFFSET - 8)
+            self._write_header(0, 0.0)
+            
+    def _write_header(self, snapshot_version: int, snapshot_timestamp: float):
+        HEADER.pack_into(self.map, 0, SHM_MAGIC, SHM_VERSION, self.max_devices, self.history_capacity,
+                         self.history_metrics, 0, self.sequence, snapshot_version, snapshot_timestamp,
+                         len(self.slots))
+                         
+    def _set_sequence(self, sequence: int):
+        self.sequence = sequence
+        struct.pack_into('=Q', self.map, SEQUENCE_OFFSET, sequence)
+        
+    @contextmanager
+    def transaction(self):
+        """Group updates so readers see all of them or none"""
+        self._set_sequence(self.sequence + 1)
+        try:
+            yield self
+        finally:
+            self._set_sequence(self.sequence + 1)
+            
+    def _slot_offset(self, device_id: str) -> Optional[int]:
+        index = self.slots.get(device_id)
+        if index is None:
+            if len(self.slots) >= self.max_devices:
+                return None
+            index = self.slots[device_id] = len(self.slots)
+            self.next_sequences[device_id] = 0
+        return HEADER_SIZE + index * self.slot_size
+        
+    def _write_slot_header(self, device_id: str, offset: int, device_type: str = None, device_name: str = None,
+                           status_ok: bool = None, metric_count: int = None, highest_mask: int = None,
+                           sample_timestamp: float = None, values: tuple = None):
+        """Rewrite a slot header, keeping any field passed as None"""
+        current = list(SLOT_HEADER.unpack_from(self.map, offset))
+        value_count = len(CURRENT_FIELDS)
+        updates = (device_type, device_name, status_ok, metric_count, highest_mask, sample_timestamp)
+        current[0] = device_id.encode()[:64]
+        for index, update in enumerate(updates, start=1):
+            if update is not None:
+                current[index] = update.encode()[:64] if isinstance(update, str) else update
+        if values is not None:
+            current[7:7 + value_count] = values
+        current[7 + value_count] = self.next_sequences[device_id]
+        SLOT_HEADER.pack_into(self.map, offset, *current)
+        
+    def update_device(self, device_id: str, device_data: dict):
+        """Store the current unified metrics of a device (call inside transaction())"""
+        offset = self._slot_offset(device_id)
+        if offset is None:
+            return
+        values = tuple(_number(device_data.get(field)) for field in CURRENT_FIELDS)
+        self._write_slot_header(device_id, offset,
+                                device_type=device_data.get('device_type', 'unknown'),
+                                device_name=str(device_data.get('device_name', '')),
+                                status_ok=1 if device_data.get('status') == 'success' else 0,
+                                values=values)
+                                
+    def append_sample(self, device_id: str, device_type: str, timestamp: float, scaled_values: tuple,
+                      highest_indices: List[int]):
+        """Append one history sample of scaled metric values (call inside transaction())"""
+        offset = self._slot_offset(device_id)
+        if offset is None:
+            return
+        capacity = self.history_capacity
+        sequence = self.next_sequences[device_id]
+        position = sequence % capacity
+        metric_count = min(len(scaled_values), self.history_metrics)
+        
+        struct.pack_into('=d', self.map, offset + SLOT_HEADER_SIZE + position * 8, timestamp)
+        values_offset = offset + SLOT_HEADER_SIZE + capacity * 8 + position * self.history_metrics * 2
+        struct.pack_into(f'={metric_count}H', self.map, values_offset, *scaled_values[:metric_count])
+        
+        self.next_sequences[device_id] = sequence + 1
+        highest_mask = sum(1 << index for index in highest_indices if index < metric_count)
+        self._write_slot_header(device_id, offset, device_type=device_type, metric_count=metric_count,
+                                highest_mask=highest_mask, sample_timestamp=timestamp)
+                                
+    def set_snapshot(self, snapshot_version: int, snapshot_timestamp: float):
+        """Record which collector snapshot the segment now reflects (call inside transaction())"""
+        self._write_header(snapshot_version, snapshot_timestamp)
+        
+    def get_stats(self) -> dict:
+        return {
+            'path': self.path,
+            'bytes': self.size,
+            'devices': len(self.slots),
+            'max_devices': self.max_devices,
+            'history_capacity': self.history_capacity,
+            'sequence': self.sequence
+        }
+        
+    def close(self):
+        try:
+            self.map.close()
+        except (BufferError, ValueError):
+            pass
+
+class SharedMetricsReader:
+    """Lock-free reader for the shared segment (dashboard, balancer and other same-host clients)"""
+
+    def __init__(self, path: str = DEFAULT_SHM_PATH):
+        self.path = path
+        self.map = None
+        self.inode = None
+        self.last_open_attempt = 0.0
+        
+    def _open(self) -> bool:
+        """Map the segment, or remap it when the collector replaced the file"""
+        now = time.monotonic()
+        if now - self.last_open_attempt < REOPEN_INTERVAL:
+            return self.map is not None
+        self.last_open_attempt = now
+        
+        try:
+            inode = os.stat(self.path).st_ino
+            if self.map is not None and inode == self.inode:
+                return True
+            with open(self.path, 'rb') as segment:
+                new_map = mmap.mmap(segment.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return self.map is not None
+            
+        if self.map is not None:
+            self.map.close()
+        self.map, self.inode = new_map, inode
+        return True
+        
+    def _read_consistent(self) -> Optional[tuple]:
+        """Copy the header and device slots between two equal, even sequence reads"""
+        if self.map is None and not self._open():
+            return None
+            
+        segment = self.map
+        for _ in range(READ_RETRIES):
+            sequence = struct.unpack_from('=Q', segment, SEQUENCE_OFFSET)[0]
+            if sequence & 1:
+                time.sleep(0)  # Writer mid-update - yield and retry
+                continue
+            header = HEADER.unpack_from(segment, 0)
+            if header[0] != SHM_MAGIC or header[1] != SHM_VERSION:
+                return None
+            max_devices, history_capacity, history_metrics = header[2], header[3], header[4]
+            slot_size = _slot_size(history_capacity, history_metrics)
+            device_count = min(header[9], max_devices)
+            data = segment[HEADER_SIZE:HEADER_SIZE + device_count * slot_size]
+            if struct.unpack_from('=Q', segment, SEQUENCE_OFFSET)[0] == sequence:
+                return header, device_count, slot_size, data
+        return None
+        
+    def _read(self) -> Optional[tuple]:
+        result = self._read_consistent()
+        if result is None:
+            # The collector may have restarted with a new segment file
+            if self._open():
+                result = self._read_consistent()
+        return result
+        
+    def read_snapshot(self) -> Optional[dict]:
+        """Get {'version', 'timestamp', 'devices'} with each device's current values"""
+        result = self._read()
+        if result is None:
+            return None
+        header, device_count, slot_size, data = result
+        
+        devices = {}
+        for index in range(device_count):
+            slot = SLOT_HEADER.unpack_from(data, index * slot_size)
+            device_id = _decode(slot[0])
+            device = {
+                'device_id': device_id,
+                'device_type': _decode(slot[1]),
+                'device_name': _decode(slot[2]),
+                'status': 'success' if slot[3] else 'error',
+                'sample_timestamp': slot[6]
+            }
+            for field, value in zip(CURRENT_FIELDS, slot[7:7 + len(CURRENT_FIELDS)]):
+                if not math.isnan(value):
+                    device[field] = int(value) if field in INTEGER_FIELDS else value
+            devices[device_id] = device
+            
+        return {'version': header[7], 'timestamp': header[8], 'devices': devices}
+        
+    def get_device_loads(self, device_ids, windows, now: Optional[float] = None) -> Optional[dict]:
+        """Get {device_id: {window: load_percent or None}} from the shared history
+        
+        load_percent is the highest per-metric average over the window, as served
+        by the collector's /api/device-loads. Returns None when the segment is
+        unavailable or a window is longer than the shared history retains.
+        """
+        result = self._read()
+        if result is None:
+            return None
+        header, device_count, slot_size, data = result
+        history_capacity, history_metrics = header[3], header[4]
+        now = time.time() if now is None else now
+        windows = sorted(set(int(window) for window in windows))
+        
+        slots = {}
+        for index in range(device_count):
+            offset = index * slot_size
+            slots[_decode(data[offset:offset + 64])] = offset
+            
+        loads = {}
+        view = memoryview(data)
+        for device_id in device_ids:
+            offset = slots.get(device_id)
+            loads[device_id] = {window: None for window in windows}
+            if offset is None:
+                continue
+            slot = SLOT_HEADER.unpack_from(data, offset)
+            metric_count, highest_mask, next_sequence = slot[4], slot[5], slot[-1]
+            highest_indices = [index for index in range(metric_count) if highest_mask & (1 << index)]
+            if not next_sequence or not highest_indices:
+                continue
+                
+            timestamps_offset = offset + SLOT_HEADER_SIZE
+            timestamps = view[timestamps_offset:timestamps_offset + history_capacity * 8].cast('d')
+            values_offset = timestamps_offset + history_capacity * 8
+            values = view[values_offset:values_offset + history_capacity * history_metrics * 2].cast('H')
+            first_sequence = max(0, next_sequence - history_capacity)
+            
+            for window in windows:
+                cutoff = now - window
+                if first_sequence and timestamps[first_sequence % history_capacity] >= cutoff:
+                    return None  # Window reaches past the shared history - caller should ask the collector
+                sums = [0] * metric_count
+                count = 0
+                for sequence in range(next_sequence - 1, first_sequence - 1, -1):
+                    position = sequence % history_capacity
+                    if timestamps[position] < cutoff:
+                        break
+                    base = position * history_metrics
+                    for index in highest_indices:
+                        sums[index] += values[base + index]
+                    count += 1
+                if count:
+                    highest = max(sums[index] for index in highest_indices) / count / VALUE_SCALE
+                    loads[device_id][window] = round(highest, 2)
+                    
+        return loads
+        
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
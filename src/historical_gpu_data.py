@@ -6,37 +6,374 @@ Collects and stores historical GPU metrics for trending analysis
 
 import threading
 import time
-from datetime import datetime, timedelta
+from array import array
 from collections import deque
 from typing import Dict, List, Optional
 
 # Import gpu_metrics at module level to avoid circular import issues
 import gpu_metrics
 
+try:
+    from gpu_history_journal import HistoryJournal, JOURNAL_TIERS
+    JOURNAL_AVAILABLE = True
+except ImportError:
+    JOURNAL_AVAILABLE = False
+    JOURNAL_TIERS = {}
+
+try:
+    from gpu_shared_metrics import SharedMetricsWriter
+    SHARED_METRICS_AVAILABLE = True
+except ImportError:
+    SHARED_METRICS_AVAILABLE = False
+
 # Global data storage - in memory circular buffers
-_nvidia_historical_data = {}  # device_id -> deque of metrics
-_intel_historical_data = {}   # device_id -> deque of metrics
+_nvidia_historical_data = {}  # device_id -> DeviceHistory
+_intel_historical_data = {}   # device_id -> DeviceHistory
 _data_lock = threading.Lock()
 _collector_running = False
 _collector_thread = None
+_journal = None  # HistoryJournal when persistence is enabled
+_shared_writer = None  # SharedMetricsWriter when the shared-memory segment is enabled
 
 # Configuration
-MAX_DATA_POINTS = 600  # 10 minutes at 1 second intervals
+MAX_DATA_POINTS = 3600  # 1 hour at 1 second intervals (~65 KB per device)
 COLLECTION_INTERVAL = 1  # seconds
+MATRIX_TIMEFRAMES = {'10s': 10, '30s': 30, '1m': 60, '5m': 300}
+MAX_TRACKED_WINDOWS = 16  # windows kept as running aggregates per device; others are scanned
+VALUE_SCALE = 100  # percentages are stored as integer hundredths
+FORECAST_ALPHA = 0.3  # Holt level smoothing factor per sample
+FORECAST_BETA = 0.1  # Holt trend smoothing factor per sample
+FORECAST_MAX_HORIZON = 600  # seconds; trends are not extrapolated further than this
+FORECAST_MAX_AGE = 10  # seconds; older forecasts mean the device stopped reporting
 
-class GPUDataPoint:
-    """Represents a single GPU data point at a specific time"""
-    def __init__(self, timestamp: datetime, metrics: dict):
-        self.timestamp = timestamp
-        self.metrics = metrics
+# Metrics tracked per vendor, and which of them make up the 'highest' load value
+NVIDIA_METRICS = ('main_load', 'gpu_util', 'memory_util', 'encoder_util', 'decoder_util')
+NVIDIA_HIGHEST_METRICS = ('gpu_util', 'memory_util', 'encoder_util', 'decoder_util')
+INTEL_METRICS = ('main_load', 'render_util', 'video_util', 'video_enhance_util')
+INTEL_HIGHEST_METRICS = ('render_util', 'video_util', 'video_enhance_util')
+HIGHEST_INDICES = {
+    'nvidia': [NVIDIA_METRICS.index(metric) for metric in NVIDIA_HIGHEST_METRICS],
+    'intel': [INTEL_METRICS.index(metric) for metric in INTEL_HIGHEST_METRICS]
+}
 
-def start_historical_data_collector():
-    """Start the historical data collector"""
-    global _collector_running, _collector_thread
+class ColumnarRing:
+    """Fixed-size columnar ring buffer: float64 timestamps plus one uint16 column per metric
+    
+    Percentages are stored as integer hundredths (0.01%), so a sample costs
+    8 bytes + 2 bytes per metric regardless of how large the source device dict was.
+    """
+
+    def __init__(self, capacity: int, metric_count: int):
+        self.capacity = capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.columns = [array('H', bytes(2 * capacity)) for _ in range(metric_count)]
+        self.next_sequence = 0  # sequence number the next sample will get
+        
+    def __len__(self):
+        return min(self.next_sequence, self.capacity)
+        
+    @property
+    def first_sequence(self) -> int:
+        return self.next_sequence - len(self)
+        
+    def append(self, timestamp: float, scaled_values: tuple) -> int:
+        """Append a sample of already-scaled values; returns its sequence number"""
+        sequence = self.next_sequence
+        slot = sequence % self.capacity
+        
+        # Keep timestamps monotonic even if the wall clock steps backwards
+        if sequence and timestamp < self.timestamps[(sequence - 1) % self.capacity]:
+            timestamp = self.timestamps[(sequence - 1) % self.capacity]
+            
+        self.timestamps[slot] = timestamp
+        for column, value in zip(self.columns, scaled_values):
+            column[slot] = value
+        self.next_sequence += 1
+        return sequence
+        
+    def timestamp(self, sequence: int) -> float:
+        return self.timestamps[sequence % self.capacity]
+        
+    def value(self, sequence: int, metric_index: int) -> int:
+        return self.columns[metric_index][sequence % self.capacity]
+        
+    def last_timestamp(self) -> Optional[float]:
+        return self.timestamps[(self.next_sequence - 1) % self.capacity] if self.next_sequence else None
+        
+    def first_sequence_since(self, cutoff: float) -> int:
+        """Binary search for the oldest retained sample with timestamp >= cutoff"""
+        low, high = self.first_sequence, self.next_sequence
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamp(middle) < cutoff:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+        
+    def nbytes(self) -> int:
+        return self.timestamps.itemsize * self.capacity + sum(column.itemsize * self.capacity for column in self.columns)
+
+def _scale_value(value) -> int:
+    """Convert a percentage to integer hundredths clamped to the uint16 range"""
+    try:
+        return min(65535, max(0, int(round(float(value) * VALUE_SCALE))))
+    except (TypeError, ValueError):
+        return 0
+
+def _extract_metric_values(device_data: dict, device_type: str) -> tuple:
+    """Extract the tracked metric values from a unified device metrics dict"""
+    vendor_specific = device_data.get('vendor_specific', {})
+    
+    if device_type == 'nvidia':
+        return (
+            device_data.get('utilization_percent', 0),
+            device_data.get('utilization_percent', 0),
+            device_data.get('memory_utilization_percent', 0),
+            vendor_specific.get('encoder_utilization_percent', 0),
+            vendor_specific.get('decoder_utilization_percent', 0)
+        )
+        
+    engines = vendor_specific.get('engines', {})
+    return (
+        device_data.get('utilization_percent', 0),
+        engines.get('render_3d_percent', 0),
+        engines.get('video_percent', 0),
+        engines.get('video_enhance_percent', 0)
+    )
+
+class SlidingWindowAggregate:
+    """Running integer sums and monotonic-deque maxima over a window of ring sequence numbers"""
+
+    def __init__(self, ring: ColumnarRing, window_seconds: int):
+        self.ring = ring
+        self.window_seconds = window_seconds
+        self.start_sequence = ring.next_sequence  # oldest sample inside the window
+        self.end_sequence = ring.next_sequence    # one past the newest sample
+        self.sums = [0] * len(ring.columns)
+        self.max_queues = [deque() for _ in ring.columns]  # sequences whose values are decreasing
+        
+    def add(self, sequence: int):
+        """Include a sample that was just appended to the ring"""
+        ring = self.ring
+        for index in range(len(self.sums)):
+            value = ring.value(sequence, index)
+            self.sums[index] += value
+            queue = self.max_queues[index]
+            while queue and ring.value(queue[-1], index) <= value:
+                queue.pop()
+            queue.append(sequence)
+        self.end_sequence = sequence + 1
+        self.expire(ring.timestamp(sequence))
+        
+    def drop_oldest(self):
+        """Remove the oldest sample from the window (amortized O(1))"""
+        sequence = self.start_sequence
+        for index in range(len(self.sums)):
+            self.sums[index] -= self.ring.value(sequence, index)
+            queue = self.max_queues[index]
+            if queue and queue[0] == sequence:
+                queue.popleft()
+        self.start_sequence += 1
+        
+    def expire(self, now: float):
+        """Drop samples older than the window"""
+        cutoff = now - self.window_seconds
+        while self.start_sequence < self.end_sequence and self.ring.timestamp(self.start_sequence) < cutoff:
+            self.drop_oldest()
+            
+    def count(self) -> int:
+        return self.end_sequence - self.start_sequence
+        
+    def averages(self) -> list:
+        count = self.count()
+        return [total / count / VALUE_SCALE for total in self.sums] if count else []
+        
+    def maxima(self) -> list:
+        if not self.count():
+            return []
+        return [self.ring.value(queue[0], index) / VALUE_SCALE for index, queue in enumerate(self.max_queues)]
+
+class HoltForecast:
+    """Holt (double exponential) smoothing of every metric of one device
+    
+    Levels are percentages and trends are percent per second, so irregular
+    sample spacing is handled by scaling the trend with the elapsed time.
+    """
+
+    def __init__(self, metric_count: int):
+        self.levels = [0.0] * metric_count
+        self.trends = [0.0] * metric_count
+        self.last_timestamp = None
+        self.samples = 0
+        
+    def update(self, timestamp: float, scaled_values: tuple):
+        if self.last_timestamp is None:
+            self.levels = [value / VALUE_SCALE for value in scaled_values]
+            self.last_timestamp = timestamp
+            self.samples = 1
+            return
+            
+        elapsed = timestamp - self.last_timestamp
+        if elapsed <= 0:
+            return
+            
+        for index, scaled_value in enumerate(scaled_values):
+            previous_level = self.levels[index]
+            predicted = previous_level + self.trends[index] * elapsed
+            level = FORECAST_ALPHA * (scaled_value / VALUE_SCALE) + (1 - FORECAST_ALPHA) * predicted
+            self.trends[index] = FORECAST_BETA * (level - previous_level) / elapsed + (1 - FORECAST_BETA) * self.trends[index]
+            self.levels[index] = level
+        self.last_timestamp = timestamp
+        self.samples += 1
+        
+    def project(self, index: int, horizon_seconds: float) -> float:
+        """Projected value of a metric horizon_seconds after the last sample, clamped to 0-100%"""
+        return min(100.0, max(0.0, self.levels[index] + self.trends[index] * horizon_seconds))
+        
+    def seconds_to_reach(self, index: int, threshold: float) -> Optional[float]:
+        """Seconds until a metric's trend reaches threshold (0 if already there, None if not rising)"""
+        if self.levels[index] >= threshold:
+            return 0.0
+        if self.trends[index] <= 0:
+            return None
+        return (threshold - self.levels[index]) / self.trends[index]
+
+class DeviceHistory:
+    """Columnar retention ring plus constant-time window aggregates for a single device"""
+
+    def __init__(self, device_type: str):
+        self.device_type = device_type
+        if device_type == 'nvidia':
+            self.metrics, highest_metrics = NVIDIA_METRICS, NVIDIA_HIGHEST_METRICS
+        else:
+            self.metrics, highest_metrics = INTEL_METRICS, INTEL_HIGHEST_METRICS
+        self.highest_indices = [self.metrics.index(metric) for metric in highest_metrics]
+        self.ring = ColumnarRing(MAX_DATA_POINTS, len(self.metrics))
+        self.windows = {}
+        self.forecast = HoltForecast(len(self.metrics))
+        
+        for seconds in MATRIX_TIMEFRAMES.values():
+            self.track_window(seconds)
+            
+    def track_window(self, seconds: int) -> Optional[SlidingWindowAggregate]:
+        """Start maintaining a running aggregate for a window, backfilled from the ring"""
+        if seconds in self.windows:
+            return self.windows[seconds]
+        if len(self.windows) >= MAX_TRACKED_WINDOWS or seconds > MAX_DATA_POINTS * COLLECTION_INTERVAL:
+            return None
+            
+        aggregate = SlidingWindowAggregate(self.ring, seconds)
+        last_timestamp = self.ring.last_timestamp()
+        if last_timestamp is not None:
+            aggregate.start_sequence = aggregate.end_sequence = self.ring.first_sequence_since(last_timestamp - seconds)
+            for sequence in range(aggregate.start_sequence, self.ring.next_sequence):
+                aggregate.add(sequence)
+        self.windows[seconds] = aggregate
+        return aggregate
+        
+    def add_sample(self, timestamp: float, values: tuple):
+        self.add_scaled_sample(timestamp, tuple(_scale_value(value) for value in values))
+        
+    def add_scaled_sample(self, timestamp: float, scaled_values: tuple):
+        # The slot about to be overwritten must leave every window first
+        if len(self.ring) == self.ring.capacity:
+            oldest = self.ring.first_sequence
+            for aggregate in self.windows.values():
+                if aggregate.start_sequence == oldest and aggregate.count():
+                    aggregate.drop_oldest()
+                    
+        sequence = self.ring.append(timestamp, scaled_values)
+        for aggregate in self.windows.values():
+            aggregate.add(sequence)
+        self.forecast.update(timestamp, scaled_values)
+            
+    def window_stats(self, seconds: int, now: float) -> Optional[dict]:
+        """Get averages, maxima and highest average for the last `seconds` seconds"""
+        aggregate = self.track_window(seconds)
+        
+        if aggregate is not None:
+            aggregate.expire(now)
+            count = aggregate.count()
+            averages, maxima = aggregate.averages(), aggregate.maxima()
+        else:
+            # Untracked window - scan the ring columns
+            first = self.ring.first_sequence_since(now - seconds)
+            count = self.ring.next_sequence - first
+            columns = [[self.ring.value(sequence, index) for sequence in range(first, self.ring.next_sequence)]
+                       for index in range(len(self.metrics))]
+            averages = [sum(column) / count / VALUE_SCALE for column in columns] if count else []
+            maxima = [max(column) / VALUE_SCALE for column in columns] if count else []
+            
+        if not count:
+            return None
+            
+        average_by_metric = dict(zip(self.metrics, averages))
+        max_by_metric = dict(zip(self.metrics, maxima))
+        average_by_metric['highest'] = max(averages[index] for index in self.highest_indices)
+        max_by_metric['highest'] = max(maxima[index] for index in self.highest_indices)
+        
+        return {
+            'average': average_by_metric,
+            'max': max_by_metric,
+            'highest': average_by_metric['highest'],
+            'samples': count
+        }
+
+    def load_forecast(self, horizon_seconds: float, threshold: Optional[float], now: float) -> Optional[dict]:
+        """Project the balancer load (highest metric) horizon_seconds ahead from the Holt trends"""
+        forecast = self.forecast
+        if forecast.last_timestamp is None or now - forecast.last_timestamp > FORECAST_MAX_AGE:
+            return None
+            
+        horizon_seconds = min(max(0.0, horizon_seconds), FORECAST_MAX_HORIZON)
+        projected = {metric: round(forecast.project(index, horizon_seconds), 2)
+                     for index, metric in enumerate(self.metrics)}
+        projected['highest'] = max(projected[self.metrics[index]] for index in self.highest_indices)
+        current = max(forecast.levels[index] for index in self.highest_indices)
+        rising = max(self.highest_indices, key=lambda index: forecast.trends[index])
+        
+        result = {
+            'current_load_percent': round(current, 2),
+            'trend_percent_per_second': round(forecast.trends[rising], 3),
+            'projected': projected,
+            'projected_load_percent': projected['highest'],
+            'horizon_seconds': horizon_seconds,
+            'samples': forecast.samples
+        }
+        if threshold is not None:
+            # Earliest time any load-defining metric reaches the threshold
+            reach_times = [forecast.seconds_to_reach(index, threshold) for index in self.highest_indices]
+            reach_times = [seconds for seconds in reach_times if seconds is not None]
+            result['threshold_percentage'] = threshold
+            result['headroom_percent'] = round(threshold - projected['highest'], 2)
+            result['seconds_to_threshold'] = round(min(reach_times), 1) if reach_times else None
+        return result
+
+def start_historical_data_collector(persist: bool = False, journal_dir: Optional[str] = None,
+                                    shared_memory_path: Optional[str] = None):
+    """Start the historical data collector, optionally journaling to disk and mirroring to shared memory"""
+    global _collector_running, _collector_thread, _journal, _shared_writer
     
     if _collector_running:
         return True
         
+    if persist and JOURNAL_AVAILABLE and _journal is None:
+        try:
+            _journal = HistoryJournal(journal_dir)
+            restore_from_journal(_journal)
+        except OSError:
+            # Persistence is best effort - keep collecting in memory
+            _journal = None
+            
+    if shared_memory_path and SHARED_METRICS_AVAILABLE and _shared_writer is None:
+        try:
+            _shared_writer = SharedMetricsWriter(shared_memory_path)
+            _backfill_shared_metrics(_shared_writer)
+        except OSError:
+            # Readers fall back to the collector HTTP API
+            _shared_writer = None
+            
     _collector_running = True
     _collector_thread = threading.Thread(target=_historical_collector_worker, daemon=True)
     _collector_thread.start()
@@ -44,167 +381,191 @@ def start_historical_data_collector():
 
 def stop_historical_data_collector():
     """Stop the historical data collector"""
-    global _collector_running
+    global _collector_running, _journal, _shared_writer
     _collector_running = False
+    
+    if _journal is not None:
+        _journal.close()
+        _journal = None
+        
+    if _shared_writer is not None:
+        writer, _shared_writer = _shared_writer, None
+        writer.close()
+
+def restore_from_journal(journal) -> int:
+    """Load the retention window of journaled samples into memory (warm start); returns samples loaded"""
+    since = time.time() - MAX_DATA_POINTS * COLLECTION_INTERVAL
+    restored = 0
+    
+    for device_id, (device_type, metric_count) in journal.list_devices().items():
+        if device_type == 'nvidia':
+            storage, metrics = _nvidia_historical_data, NVIDIA_METRICS
+        elif device_type == 'intel':
+            storage, metrics = _intel_historical_data, INTEL_METRICS
+        else:
+            continue
+        if metric_count != len(metrics):
+            continue
+            
+        records = journal.read(device_id, '1s', since)
+        with _data_lock:
+            if device_id not in storage:
+                storage[device_id] = DeviceHistory(device_type)
+            history = storage[device_id]
+            for timestamp, averages, _ in records:
+                history.add_scaled_sample(timestamp, averages)
+        restored += len(records)
+        
+    return restored
+
+def _get_device_history(device_id: str) -> Optional[DeviceHistory]:
+    """Look up a device's history (caller holds _data_lock)"""
+    return _nvidia_historical_data.get(device_id) or _intel_historical_data.get(device_id)
+
+def record_sample(device_id: str, device_type: str, timestamp: float, values: tuple) -> Optional[tuple]:
+    """Store one sample of tracked metric values for a device; returns the scaled values"""
+    if device_type == 'nvidia':
+        storage = _nvidia_historical_data
+    elif device_type == 'intel':
+        storage = _intel_historical_data
+    else:
+        return None
+        
+    scaled_values = tuple(_scale_value(value) for value in values)
+    with _data_lock:
+        if device_id not in storage:
+            storage[device_id] = DeviceHistory(device_type)
+        storage[device_id].add_scaled_sample(timestamp, scaled_values)
+        
+    journal = _journal
+    if journal is not None:
+        try:
+            journal.append(device_id, device_type, timestamp, scaled_values)
+        except (OSError, ValueError):
+            pass
+            
+    return scaled_values
+
+def _backfill_shared_metrics(writer):
+    """Copy the retained in-memory history (e.g. restored from the journal) into the shared segment"""
+    with _data_lock, writer.transaction():
+        for storage in (_nvidia_historical_data, _intel_historical_data):
+            for device_id, history in storage.items():
+                ring = history.ring
+                metric_indices = range(len(history.metrics))
+                first = max(ring.first_sequence, ring.next_sequence - writer.history_capacity)
+                for sequence in range(first, ring.next_sequence):
+                    writer.append_sample(device_id, history.device_type, ring.timestamp(sequence),
+                                         tuple(ring.value(sequence, index) for index in metric_indices),
+                                         history.highest_indices)
+
+def _publish_shared_metrics(snapshot, samples: list):
+    """Mirror a snapshot and its newly recorded samples into the shared segment in one seqlock write"""
+    writer = _shared_writer
+    if writer is None:
+        return
+        
+    try:
+        with writer.transaction():
+            for device_id, device_data in snapshot.devices.items():
+                writer.update_device(device_id, device_data)
+            for device_id, device_type, scaled_values in samples:
+                writer.append_sample(device_id, device_type, snapshot.timestamp, scaled_values,
+                                     HIGHEST_INDICES[device_type])
+            writer.set_snapshot(snapshot.version, snapshot.timestamp)
+    except ValueError:
+        pass  # Segment closed during shutdown
 
 def _historical_collector_worker():
-    """Worker thread that collects historical data"""
-    global _collector_running, _nvidia_historical_data, _intel_historical_data
+    """Worker thread that records each new device sample as soon as gpu_metrics publishes it"""
+    global _collector_running
+    
+    snapshot_version = 0
+    last_sample_stamps = {}  # device_id -> monitor timestamp of the last recorded sample
     
     while _collector_running:
         try:
-            current_time = datetime.now()
-            
-            # Collect current GPU metrics
-            current_metrics = gpu_metrics.get_all_gpu_metrics()
+            snapshot = gpu_metrics.wait_for_snapshot(snapshot_version, COLLECTION_INTERVAL * 2)
+            if snapshot is None:
+                continue
+            snapshot_version = snapshot.version
+            samples = []
             
-            with _data_lock:
-                for device_id, device_data in current_metrics.get('devices', {}).items():
-                    device_type = device_data.get('device_type', 'unknown')
-                    
-                    # Create data point
-                    data_point = GPUDataPoint(current_time, device_data)
+            for device_id, device_data in snapshot.devices.items():
+                device_type = device_data.get('device_type', 'unknown')
+                if device_type not in ('nvidia', 'intel'):
+                    continue
                     
-                    # Store in appropriate historical buffer
-                    if device_type == 'nvidia':
-                        if device_id not in _nvidia_historical_data:
-                            _nvidia_historical_data[device_id] = deque(maxlen=MAX_DATA_POINTS)
-                        _nvidia_historical_data[device_id].append(data_point)
-                        
-                    elif device_type == 'intel':
-                        if device_id not in _intel_historical_data:
-                            _intel_historical_data[device_id] = deque(maxlen=MAX_DATA_POINTS)
-                        _intel_historical_data[device_id].append(data_point)
-            
-            time.sleep(COLLECTION_INTERVAL)
+                # Several snapshots can carry the same monitor sample - record it once
+                sample_stamp = device_data.get('timestamp')
+                if last_sample_stamps.get(device_id) == sample_stamp:
+                    continue
+                last_sample_stamps[device_id] = sample_stamp
+                
+                scaled_values = record_sample(device_id, device_type, snapshot.timestamp,
+                                              _extract_metric_values(device_data, device_type))
+                samples.append((device_id, device_type, scaled_values))
+                
+            _publish_shared_metrics(snapshot, samples)
             
         except Exception as e:
             # Continue running even if there's an error
             time.sleep(COLLECTION_INTERVAL)
 
-def _calculate_average_metrics(data_points: List[GPUDataPoint], device_type: str) -> dict:
-    """Calculate average metrics for a set of data points"""
-    if not data_points:
-        return {}
+def get_historical_window_stats(device_id: str, timeframe_seconds: int) -> Optional[dict]:
+    """Get averages, maxima and highest average for a device over a timeframe (constant time)"""
+    try:
+        # Critical sections are constant time, so a plain lock never starves readers
+        with _data_lock:
+            history = _get_device_history(device_id)
+            if history is None:
+                return None
+            return history.window_stats(timeframe_seconds, time.time())
+    except Exception as e:
+        return None
+
+def get_bulk_historical_stats(device_ids: List[str], windows: List[int]) -> dict:
+    """Get window stats for many devices and windows from a single locked read"""
+    now = time.time()
+    result = {}
     
-    if device_type == 'nvidia':
-        # NVIDIA metrics to track
-        metrics = {
-            'main_load': [],
-            'gpu_util': [],
-            'memory_util': [],
-            'encoder_util': [],
-            'decoder_util': []
-        }
-        
-        for point in data_points:
-            metrics['main_load'].append(point.metrics.get('utilization_percent', 0))
-            metrics['gpu_util'].append(point.metrics.get('utilization_percent', 0))
-            metrics['memory_util'].append(point.metrics.get('memory_utilization_percent', 0))
-            metrics['encoder_util'].append(point.metrics.get('vendor_specific', {}).get('encoder_utilization_percent', 0))
-            metrics['decoder_util'].append(point.metrics.get('vendor_specific', {}).get('decoder_utilization_percent', 0))
-        
-        # Calculate averages
-        averages = {}
-        for key, values in metrics.items():
-            averages[key] = sum(values) / len(values) if values else 0
-        
-        # Calculate highest value
-        averages['highest'] = max([
-            averages.get('gpu_util', 0),
-            averages.get('memory_util', 0),
-            averages.get('encoder_util', 0),
-            averages.get('decoder_util', 0)
-        ])
-        
-        return averages
-        
-    elif device_type == 'intel':
-        # Intel metrics to track
-        metrics = {
-            'main_load': [],
-            'render_util': [],
-            'video_util': [],
-            'video_enhance_util': []
-        }
-        
-        for point in data_points:
-            main_util = point.metrics.get('utilization_percent', 0)
-            engines = point.metrics.get('vendor_specific', {}).get('engines', {})
+    with _data_lock:
+        for device_id in device_ids:
+            history = _get_device_history(device_id)
+            if history is None:
+                result[device_id] = None
+                continue
+            result[device_id] = {window: history.window_stats(window, now) for window in windows}
             
-            metrics['main_load'].append(main_util)
-            metrics['render_util'].append(engines.get('render_3d_percent', 0))
-            metrics['video_util'].append(engines.get('video_percent', 0))
-            metrics['video_enhance_util'].append(engines.get('video_enhance_percent', 0))
-        
-        # Calculate averages
-        averages = {}
-        for key, values in metrics.items():
-            averages[key] = sum(values) / len(values) if values else 0
-        
-        # Calculate highest value
-        averages['highest'] = max([
-            averages.get('render_util', 0),
-            averages.get('video_util', 0),
-            averages.get('video_enhance_util', 0)
-        ])
-        
-        return averages
+    return result
+
+def get_load_forecasts(device_ids: Optional[List[str]], horizon_seconds: float,
+                       threshold: Optional[float] = None) -> dict:
+    """Get short-horizon load forecasts (headroom, time to threshold) for many devices (all if None)"""
+    now = time.time()
+    result = {}
     
-    return {}
+    with _data_lock:
+        if device_ids is None:
+            device_ids = list(_nvidia_historical_data) + list(_intel_historical_data)
+        for device_id in device_ids:
+            history = _get_device_history(device_id)
+            result[device_id] = history.load_forecast(horizon_seconds, threshold, now) if history is not None else None
+            
+    return result
 
 def get_historical_averages(device_id: str, timeframe_seconds: int) -> dict:
     """Get average metrics for a device over a specific timeframe"""
-    global _nvidia_historical_data, _intel_historical_data
-    
-    cutoff_time = datetime.now() - timedelta(seconds=timeframe_seconds)
-    
-    try:
-        # Use timeout to prevent deadlock
-        if _data_lock.acquire(timeout=0.5):
-            try:
-                # Determine device type and get data
-                device_data = None
-                device_type = None
-                
-                if device_id in _nvidia_historical_data:
-                    device_data = list(_nvidia_historical_data[device_id])  # Create copy
-                    device_type = 'nvidia'
-                elif device_id in _intel_historical_data:
-                    device_data = list(_intel_historical_data[device_id])  # Create copy
-                    device_type = 'intel'
-            finally:
-                _data_lock.release()
-            
-            if not device_data or not device_type:
-                return {}
-            
-            # Filter data points within timeframe (now outside lock)
-            relevant_points = [
-                point for point in device_data 
-                if point.timestamp >= cutoff_time
-            ]
-            
-            return _calculate_average_metrics(relevant_points, device_type)
-        else:
-            return {}  # Return empty if can't acquire lock
-    except Exception as e:
-        return {}
+    stats = get_historical_window_stats(device_id, timeframe_seconds)
+    return stats['average'] if stats else {}
 
 def get_device_historical_matrix(device_id: str) -> dict:
     """Get complete historical matrix for a device (10s, 30s, 1m, 5m averages)"""
-    timeframes = {
-        '10s': 10,
-        '30s': 30,
-        '1m': 60,
-        '5m': 300
-    }
-    
     matrix = {}
-    for label, seconds in timeframes.items():
+    for label, seconds in MATRIX_TIMEFRAMES.items():
         averages = get_historical_averages(device_id, seconds)
         matrix[label] = averages if averages else None
-    
+        
     return matrix
 
 def get_all_devices_historical_matrix() -> dict:
@@ -214,56 +575,83 @@ def get_all_devices_historical_matrix() -> dict:
     result = {}
     
     try:
-        # Use timeout to prevent deadlock
-        if _data_lock.acquire(timeout=1.0):
-            try:
-                # Process NVIDIA devices
-                nvidia_device_ids = list(_nvidia_historical_data.keys())
-                intel_device_ids = list(_intel_historical_data.keys())
-            finally:
-                _data_lock.release()
-            
-            # Process devices outside of lock to avoid deadlock
-            for device_id in nvidia_device_ids:
-                result[device_id] = get_device_historical_matrix(device_id)
-            
-            for device_id in intel_device_ids:
-                result[device_id] = get_device_historical_matrix(device_id)
-        else:
-            # If we can't acquire lock, return empty result
-            result = {"error": "Unable to acquire data lock", "devices": {}}
+        with _data_lock:
+            # Every window of the matrix is a running aggregate - read them all in one pass
+            now = time.time()
+            for storage in (_nvidia_historical_data, _intel_historical_data):
+                for device_id, history in storage.items():
+                    matrix = {}
+                    for label, seconds in MATRIX_TIMEFRAMES.items():
+                        stats = history.window_stats(seconds, now)
+                        matrix[label] = stats['average'] if stats else None
+                    result[device_id] = matrix
     except Exception as e:
         result = {"error": str(e), "devices": {}}
-    
+        
     return result
 
 def cleanup_old_data():
-    """Clean up data older than 10 minutes (handled automatically by deque maxlen)"""
-    # The deque with maxlen automatically handles this, but this function
+    """Clean up data older than the retention period (handled automatically by the ring buffers)"""
+    # The fixed-size rings overwrite their oldest samples, but this function
     # is here for explicit cleanup if needed in the future
     pass
 
-def get_data_availability(device_id: str) -> dict:
-    """Get information about data availability for timeframes"""
-    global _nvidia_historical_data, _intel_historical_data
-    
+def get_history_memory_usage() -> dict:
+    """Get the fixed buffer size in bytes used by each device's history ring"""
     with _data_lock:
-        device_data = None
-        if device_id in _nvidia_historical_data:
-            device_data = _nvidia_historical_data[device_id]
-        elif device_id in _intel_historical_data:
-            device_data = _intel_historical_data[device_id]
-        
-        if not device_data:
-            return {'10s': False, '30s': False, '1m': False, '5m': False}
+        return {
+            device_id: history.ring.nbytes()
+            for storage in (_nvidia_historical_data, _intel_historical_data)
+            for device_id, history in storage.items()
+        }
+
+def get_persisted_history(device_id: str, tier: str = '1s', since: float = 0,
+                          until: Optional[float] = None, limit: Optional[int] = None) -> Optional[dict]:
+    """Get journaled history for a device tier with named metrics (None when persistence is off)"""
+    journal = _journal
+    if journal is None:
+        return None
         
-        # Check if we have enough data for each timeframe
-        now = datetime.now()
-        availability = {}
+    device_info = journal.list_devices().get(device_id)
+    if device_info is None:
+        return {'device_id': device_id, 'tier': tier, 'points': []}
+    metrics = NVIDIA_METRICS if device_info[0] == 'nvidia' else INTEL_METRICS
+    
+    points = []
+    for timestamp, averages, maxima in journal.read(device_id, tier, since, until, limit):
+        points.append({
+            'timestamp': timestamp,
+            'average': {metric: value / VALUE_SCALE for metric, value in zip(metrics, averages)},
+            'max': {metric: value / VALUE_SCALE for metric, value in zip(metrics, maxima)}
+        })
         
-        for label, seconds in [('10s', 10), ('30s', 30), ('1m', 60), ('5m', 300)]:
-            cutoff_time = now - timedelta(seconds=seconds)
-            has_data = any(point.timestamp >= cutoff_time for point in device_data)
-            availability[label] = has_data
+    return {
+        'device_id': device_id,
+        'device_type': device_info[0],
+        'tier': tier,
+        'tier_seconds': JOURNAL_TIERS[tier][0],
+        'points': points
+    }
+
+def get_shared_metrics_stats() -> Optional[dict]:
+    """Get shared-memory segment statistics (None when the segment is off)"""
+    writer = _shared_writer
+    return writer.get_stats() if writer is not None else None
+
+def get_journal_stats() -> Optional[dict]:
+    """Get on-disk journal statistics (None when persistence is off)"""
+    journal = _journal
+    return journal.get_stats() if journal is not None else None
+
+def get_data_availability(device_id: str) -> dict:
+    """Get information about data availability for timeframes"""
+    with _data_lock:
+        history = _get_device_history(device_id)
         
-        return availability
+        if history is None or not len(history.ring):
+            return {label: False for label in MATRIX_TIMEFRAMES}
+            
+        # Check if we have data for each timeframe (newest point is enough)
+        now = time.time()
+        newest_timestamp = history.ring.last_timestamp()
+        return {label: newest_timestamp >= now - seconds for label, seconds in MATRIX_TIMEFRAMES.items()}
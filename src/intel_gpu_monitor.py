@@ -16,6 +16,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Import the new parsers
 from universal_json_parser import UniversalJSONParser
 from import_helper import import_plex_api
+from gpu_metrics import notify_device_update
+from intel_sysfs_monitor import IntelSysfsMonitor
 
 # Import plex_api functions
 get_parsed_gpu_devices, load_available_devices = import_plex_api()
@@ -126,6 +128,7 @@ class OptimizedIntelMonitor:
                 })
                 
                 self.latest_metrics = metrics
+                notify_device_update()
                 
         except Exception as e:
             # Set error status
@@ -177,6 +180,14 @@ class OptimizedIntelMonitor:
             'processes': {'total_count': 0}
         }
 
+def _get_monitoring_settings():
+    """Get [gpu_monitoring] settings, defaulting to the intel_gpu_top backend"""
+    try:
+        from config import get_gpu_monitoring_settings
+        return get_gpu_monitoring_settings()
+    except Exception:
+        return {'intel_backend': 'intel_gpu_top', 'sysfs_root': '/sys', 'procfs_root': '/proc'}
+
 def start_intel_monitor():
     """Start Intel GPU monitors for all Intel devices"""
     global _intel_monitors
@@ -191,13 +202,24 @@ def start_intel_monitor():
             if not intel_devices:
                 return False
             
+            monitoring_settings = _get_monitoring_settings()
+            
             # Start monitors for each Intel device
             for device in intel_devices:
                 device_id = device['id']
                 if device_id not in _intel_monitors:
-                    monitor = OptimizedIntelMonitor(device, update_interval=1000)
-                    if monitor.start_monitoring():
-                        _intel_monitors[device_id] = monitor
+                    monitor = None
+                    if monitoring_settings['intel_backend'] == 'sysfs':
+                        monitor = IntelSysfsMonitor(device, update_interval=1000,
+                                                    sysfs_root=monitoring_settings['sysfs_root'],
+                                                    procfs_root=monitoring_settings['procfs_root'])
+                        if not monitor.start_monitoring():
+                            monitor = None  # Card not found in sysfs - fall back to intel_gpu_top
+                    if monitor is None:
+                        monitor = OptimizedIntelMonitor(device, update_interval=1000)
+                        if not monitor.start_monitoring():
+                            continue
+                    _intel_monitors[device_id] = monitor
             
             return len(_intel_monitors) > 0
             
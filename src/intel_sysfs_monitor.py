@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Intel GPU Monitor - sysfs / DRM fdinfo backend
+Reads engine busy time from DRM fdinfo, frequency from sysfs and power from powercap/hwmon
+without running intel_gpu_top
+"""
+
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+from gpu_metrics import notify_device_update
+
+# fdinfo engine class names (i915 and xe) -> dashboard engine keys
+ENGINE_CLASS_KEYS = {
+    'render': 'render_3d_percent',
+    'rcs': 'render_3d_percent',
+    'copy': 'blitter_percent',
+    'bcs': 'blitter_percent',
+    'video': 'video_percent',
+    'vcs': 'video_percent',
+    'video-enhance': 'video_enhance_percent',
+    'vecs': 'video_enhance_percent',
+    'compute': 'compute_percent',
+    'ccs': 'compute_percent'
+}
+
+# Process names counted as Plex sessions (comm is truncated to 15 characters)
+TRANSCODER_PROCESS_NAMES = ('Plex Transcoder',)
+
+# Frequency files relative to the DRM card directory, in order of preference
+FREQUENCY_FILES = (
+    'gt_act_freq_mhz',
+    'gt/gt0/rps_act_freq_mhz',
+    'device/tile0/gt0/freq0/act_freq'
+)
+
+_PID_DIR = re.compile(r'^\d+$')
+
+def _read_text(path):
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+def _read_int(path):
+    text = _read_text(path)
+    try:
+        return int(text) if text is not None else None
+    except ValueError:
+        return None
+
+def pci_address_from_device_id(device_id):
+    """Get the PCI address from a Plex device id ('8086:...@0000:00:02.0' or 'pci-0000:00:02.0')"""
+    if '@' in device_id:
+        return device_id.split('@', 1)[1].lower()
+    if device_id.startswith('pci-'):
+        return device_id[4:].lower()
+    return None
+
+def parse_fdinfo(text):
+    """Parse a DRM fdinfo file into a dict of its 'key: value' lines"""
+    fields = {}
+    for line in text.splitlines():
+        key, separator, value = line.partition(':')
+        if separator:
+            fields[key.strip()] = value.strip()
+    return fields
+
+class _EnergyCounter:
+    """Converts a cumulative microjoule counter into watts, handling wraparound"""
+
+    def __init__(self, path, max_range_path=None):
+        self.path = path
+        self.max_range = _read_int(max_range_path) if max_range_path else None
+        self.last_value = None
+        self.last_time = None
+        
+    def read_watts(self, now):
+        value = _read_int(self.path)
+        if value is None:
+            return None
+            
+        watts = None
+        if self.last_value is not None and now > self.last_time:
+            delta = value - self.last_value
+            if delta < 0 and self.max_range:
+                delta += self.max_range
+            if delta >= 0:
+                watts = delta / 1_000_000 / (now - self.last_time)
+                
+        self.last_value = value
+        self.last_time = now
+        return watts
+
+class IntelSysfsSampler:
+    """Samples one Intel GPU from sysfs and procfs; roots are configurable for fixture trees"""
+
+    def __init__(self, pci_address=None, sysfs_root='/sys', procfs_root='/proc'):
+        self.sysfs_root = sysfs_root
+        self.procfs_root = procfs_root
+        self.pci_address = pci_address
+        self.card_path = self._find_card()
+        self.gpu_energy, self.package_energy = self._find_energy_counters()
+        self.client_samples = {}  # (pid, drm-client-id) -> {engine class: (busy, capacity, total cycles)}
+        self.last_sample_time = None
+        
+    def _find_card(self):
+        """Locate /sys/class/drm/cardN for the PCI address (or the first Intel card)"""
+        drm_root = os.path.join(self.sysfs_root, 'class', 'drm')
+        try:
+            cards = sorted(name for name in os.listdir(drm_root) if re.match(r'^card\d+$', name))
+        except OSError:
+            return None
+            
+        for card in cards:
+            card_path = os.path.join(drm_root, card)
+            device_path = os.path.join(card_path, 'device')
+            uevent = _read_text(os.path.join(device_path, 'uevent')) or ''
+            slot_match = re.search(r'PCI_SLOT_NAME=(\S+)', uevent)
+            slot_name = slot_match.group(1).lower() if slot_match else None
+            
+            if self.pci_address:
+                if slot_name == self.pci_address:
+                    return card_path
+            elif _read_text(os.path.join(device_path, 'vendor')) == '0x8086':
+                self.pci_address = slot_name
+                return card_path
+        return None
+        
+    def _find_energy_counters(self):
+        """Find GPU and package energy counters (hwmon for discrete cards, RAPL powercap otherwise)"""
+        gpu_energy = None
+        package_energy = None
+        
+        if self.card_path:
+            hwmon_root = os.path.join(self.card_path, 'device', 'hwmon')
+            try:
+                for hwmon in sorted(os.listdir(hwmon_root)):
+                    energy_path = os.path.join(hwmon_root, hwmon, 'energy1_input')
+                    if os.path.exists(energy_path):
+                        gpu_energy = _EnergyCounter(energy_path)
+                        break
+            except OSError:
+                pass
+                
+        powercap_root = os.path.join(self.sysfs_root, 'class', 'powercap')
+        try:
+            zones = sorted(os.listdir(powercap_root))
+        except OSError:
+            zones = []
+        for zone in zones:
+            if not zone.startswith('intel-rapl:'):
+                continue
+            zone_path = os.path.join(powercap_root, zone)
+            name = _read_text(os.path.join(zone_path, 'name'))
+            counter = _EnergyCounter(os.path.join(zone_path, 'energy_uj'),
+                                     os.path.join(zone_path, 'max_energy_range_uj'))
+            if name == 'package-0' and package_energy is None:
+                package_energy = counter
+            elif name == 'uncore' and gpu_energy is None:
+                gpu_energy = counter
+                
+        return gpu_energy, package_energy
+        
+    def is_available(self):
+        """Check if the card was found in sysfs"""
+        return self.card_path is not None
+        
+    def read_frequency(self):
+        if not self.card_path:
+            return 0
+        for relative_path in FREQUENCY_FILES:
+            value = _read_int(os.path.join(self.card_path, relative_path))
+            if value is not None:
+                return value
+        return 0
+        
+    def _iter_drm_fdinfo(self):
+        """Yield (pid, fdinfo fields) for DRM file descriptors belonging to this GPU"""
+        try:
+            pids = [name for name in os.listdir(self.procfs_root) if _PID_DIR.match(name)]
+        except OSError:
+            return
+            
+        for pid in pids:
+            fd_dir = os.path.join(self.procfs_root, pid, 'fd')
+            try:
+                fds = os.listdir(fd_dir)
+            except OSError:
+                continue
+                
+            for fd in fds:
+                try:
+                    # Only DRM device nodes are worth reading fdinfo for
+                    if not os.readlink(os.path.join(fd_dir, fd)).startswith('/dev/dri/'):
+                        continue
+                except OSError:
+                    continue
+                text = _read_text(os.path.join(self.procfs_root, pid, 'fdinfo', fd))
+                if not text:
+                    continue
+                fields = parse_fdinfo(text)
+                if 'drm-client-id' not in fields:
+                    continue
+                if self.pci_address and fields.get('drm-pdev', '').lower() != self.pci_address:
+                    continue
+                yield int(pid), fields
+                
+    @staticmethod
+    def _engine_counters(fields):
+        """Get {engine class: (busy, capacity, total cycles)} from one fdinfo
+        
+        i915 reports busy nanoseconds (total cycles is None); xe reports busy
+        cycles alongside the GPU's total cycles.
+        """
+        counters = {}
+        for key, value in fields.items():
+            if key.startswith('drm-engine-') and not key.startswith('drm-engine-capacity-'):
+                engine_class = key[len('drm-engine-'):]
+                capacity = int(fields.get(f'drm-engine-capacity-{engine_class}', '1') or 1)
+                counters[engine_class] = (int(value.split()[0]), capacity, None)
+            elif key.startswith('drm-cycles-'):
+                engine_class = key[len('drm-cycles-'):]
+                total = fields.get(f'drm-total-cycles-{engine_class}')
+                if total is not None:
+                    counters[engine_class] = (int(value.split()[0]), 1, int(total.split()[0]))
+        return counters
+        
+    def sample(self):
+        """Take one sample; returns metrics in the same shape as the intel_gpu_top monitor"""
+        now = time.monotonic()
+        elapsed = now - self.last_sample_time if self.last_sample_time is not None else None
+        
+        clients = []
+        engine_totals = {}
+        current_samples = {}
+        seen_clients = set()
+        
+        for pid, fields in self._iter_drm_fdinfo():
+            client_key = (pid, fields['drm-client-id'])
+            if client_key in seen_clients:
+                continue  # Same client through a dup'd fd
+            seen_clients.add(client_key)
+            
+            counters = self._engine_counters(fields)
+            current_samples[client_key] = counters
+            previous = self.client_samples.get(client_key, {})
+            
+            client_engines = {}
+            for engine_class, (busy, capacity, total_cycles) in counters.items():
+                if engine_class not in previous or not elapsed:
+                    continue
+                previous_busy, _, previous_total_cycles = previous[engine_class]
+                delta = busy - previous_busy
+                if total_cycles is not None:
+                    # xe: busy cycles over total GPU cycles
+                    total_delta = total_cycles - (previous_total_cycles or 0)
+                    percent = delta / total_delta * 100 if total_delta > 0 else 0
+                else:
+                    # i915: busy nanoseconds over wall time times engine instances
+                    percent = delta / (elapsed * 1e9 * capacity) * 100
+                percent = min(100.0, max(0.0, percent))
+                engine_key = ENGINE_CLASS_KEYS.get(engine_class, f'{engine_class}_percent')
+                client_engines[engine_key] = client_engines.get(engine_key, 0) + percent
+                engine_totals[engine_key] = engine_totals.get(engine_key, 0) + percent
+                
+            clients.append({
+                'pid': pid,
+                'name': _read_text(os.path.join(self.procfs_root, str(pid), 'comm')) or '',
+                'client_id': fields['drm-client-id'],
+                'engines': {key: round(value, 2) for key, value in client_engines.items()}
+            })
+            
+        self.client_samples = current_samples
+        self.last_sample_time = now
+        
+        gpu_watts = self.gpu_energy.read_watts(now) if self.gpu_energy else None
+        package_watts = self.package_energy.read_watts(now) if self.package_energy else None
+        transcoders = [client for client in clients if client['name'] in TRANSCODER_PROCESS_NAMES]
+        
+        engines = {
+            'render_3d_percent': 0,
+            'blitter_percent': 0,
+            'video_percent': 0,
+            'video_enhance_percent': 0
+        }
+        engines.update({key: round(min(100.0, value), 2) for key, value in engine_totals.items()})
+        
+        return {
+            'frequency_mhz': self.read_frequency(),
+            'power_gpu': round(gpu_watts, 2) if gpu_watts is not None else 0,
+            'power_package': round(package_watts, 2) if package_watts is not None else 0,
+            'engines': engines,
+            'processes': {
+                'total_count': len(transcoders),
+                'exact': True,  # Counted from fdinfo rather than inferred from Plex sessions
+                'clients': clients
+            }
+        }
+
+class IntelSysfsMonitor:
+    """Drop-in alternative to OptimizedIntelMonitor backed by IntelSysfsSampler"""
+
+    def __init__(self, device_info, update_interval=1000, sysfs_root='/sys', procfs_root='/proc'):
+        self.device_info = device_info
+        self.device_id = device_info['id']
+        self.device_name = device_info['name']
+        self.update_interval = update_interval  # milliseconds, as for intel_gpu_top -s
+        self.running = False
+        self.thread = None
+        self.latest_metrics = {}
+        self.sampler = IntelSysfsSampler(pci_address_from_device_id(self.device_id), sysfs_root, procfs_root)
+        
+    def start_monitoring(self):
+        """Start background sampling thread"""
+        if self.running:
+            return True
+        if not self.sampler.is_available():
+            return False
+            
+        self.running = True
+        self.thread = threading.Thread(target=self._monitor_loop, daemon=True)
+        self.thread.start()
+        return True
+        
+    def _monitor_loop(self):
+        """Background sampling loop"""
+        # Prime the counters so the first published sample has real deltas
+        try:
+            self.sampler.sample()
+        except Exception:
+            pass
+            
+        while self.running:
+            time.sleep(self.update_interval / 1000)
+            try:
+                metrics = self.sampler.sample()
+                metrics.update({
+                    'timestamp': datetime.now().isoformat(),
+                    'device': self.device_name,
+                    'device_id': self.device_id,
+                    'status': 'success',
+                    'backend': 'sysfs'
+                })
+                self.latest_metrics = metrics
+                notify_device_update()
+            except Exception as e:
+                self.latest_metrics = self._empty_metrics('error')
+                self.latest_metrics['error'] = str(e)
+                
+    def _empty_metrics(self, status):
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'device': self.device_name,
+            'device_id': self.device_id,
+            'status': status,
+            'backend': 'sysfs',
+            'frequency_mhz': 0,
+            'power_gpu': 0,
+            'power_package': 0,
+            'engines': {
+                'render_3d_percent': 0,
+                'blitter_percent': 0,
+                'video_percent': 0,
+                'video_enhance_percent': 0
+            },
+            'processes': {'total_count': 0}
+        }
+        
+    def stop_monitoring(self):
+        """Stop monitoring"""
+        self.running = False
+        
+    def get_latest_metrics(self):
+        """Get cached metrics (lightweight)"""
+        return self.latest_metrics.copy() if self.latest_metrics else self._empty_metrics('no_data')
+
+def main():
+    import argparse
+    import json
+    
+    parser = argparse.ArgumentParser(description='Intel GPU sysfs/fdinfo sampler')
+    parser.add_argument('--pci', help='PCI address (e.g. 0000:00:02.0); default is the first Intel card')
+    parser.add_argument('--sysfs-root', default='/sys', help='sysfs root (for fixture trees)')
+    parser.add_argument('--procfs-root', default='/proc', help='procfs root (for fixture trees)')
+    parser.add_argument('--interval', '-s', type=int, default=1000, help='Sampling interval in milliseconds')
+    parser.add_argument('--count', '-n', type=int, default=5, help='Number of samples to print')
+    args = parser.parse_args()
+    
+    sampler = IntelSysfsSampler(args.pci, args.sysfs_root, args.procfs_root)
+    if not sampler.is_available():
+        print("No Intel DRM card found", flush=True)
+        return
+        
+    sampler.sample()
+    for _ in range(args.count):
+        time.sleep(args.interval / 1000)
+        print(json.dumps(sampler.sample()), flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
 """
 NVIDIA GPU Monitor - Individual Device Monitoring
-Uses nvidia-smi for per-device metrics collection with background threads
+Uses one streaming nvidia-smi process for per-device metrics collection across all GPUs
 """
 
 import sys
 import os
 import threading
 import time
+import shutil
 import subprocess
 from datetime import datetime
 
@@ -15,6 +16,7 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from import_helper import import_plex_api
+from gpu_metrics import notify_device_update
 
 # Import plex_api functions
 get_parsed_gpu_devices, load_available_devices = import_plex_api()
@@ -22,168 +24,80 @@ get_parsed_gpu_devices, load_available_devices = import_plex_api()
 # Global monitor instances
 _nvidia_monitors = {}
 _monitor_lock = threading.Lock()
+_sampler = None
+
+# Streaming sampler configuration
+SAMPLE_INTERVAL = 1.0  # seconds between nvidia-smi samples (sub-second values are supported)
+PROCESS_QUERY_MIN_INTERVAL = 1.0  # compute-apps is still a one-shot query, never run more often than this
+RESTART_MIN_DELAY = 1  # seconds
+RESTART_MAX_DELAY = 30  # seconds
+
+GPU_QUERY_FIELDS = (
+    'index', 'pci.bus_id', 'utilization.gpu', 'utilization.memory', 'utilization.encoder',
+    'utilization.decoder', 'temperature.gpu', 'fan.speed', 'power.draw', 'memory.used', 'memory.total'
+)
+
+def _safe_int(value):
+    try:
+        return int(float(value.strip())) if value.strip() != 'N/A' else 0
+    except (ValueError, AttributeError):
+        return 0
+
+def _safe_float(value):
+    try:
+        return float(value.strip()) if value.strip() != 'N/A' else 0.0
+    except (ValueError, AttributeError):
+        return 0.0
+
+def _normalize_bus_id(bus_id):
+    """Normalize a PCI address ('00000000:01:00.0' or '0000:01:00.0') to 'dddd:bb:dd.f'"""
+    if not bus_id:
+        return None
+    parts = bus_id.strip().lower().split(':')
+    if len(parts) == 3:
+        try:
+            return f"{int(parts[0], 16):04x}:{parts[1]}:{parts[2]}"
+        except ValueError:
+            return None
+    if len(parts) == 2:
+        return f"0000:{parts[0]}:{parts[1]}"
+    return None
+
+def _device_bus_id(device_id):
+    """Extract the PCI address from a Plex device id ('10de:...@0000:01:00.0')"""
+    if '@' in device_id:
+        return _normalize_bus_id(device_id.split('@', 1)[1])
+    return None
 
 class OptimizedNvidiaMonitor:
+    """Per-device view of the shared nvidia-smi stream"""
+
     def __init__(self, device_info, gpu_index=0, update_interval=1):
         self.device_info = device_info
         self.device_id = device_info['id']
         self.device_name = device_info['name']
         self.gpu_index = gpu_index  # nvidia-smi GPU index
+        self.bus_id = _device_bus_id(self.device_id)
         self.update_interval = update_interval
         self.running = False
-        self.thread = None
         self.latest_metrics = {}
+        self.processes = []
         
     def start_monitoring(self):
-        """Start background monitoring thread"""
+        """Start receiving samples from the shared streaming sampler"""
         if self.running:
             return True
             
         self.running = True
-        self.thread = threading.Thread(target=self._monitor_loop, daemon=True)
-        self.thread.start()
-        return True
-    
-    def _monitor_loop(self):
-        """Background monitoring loop using nvidia-smi"""
-        while self.running:
-            try:
-                # Get basic GPU metrics
-                metrics = {
-                    'timestamp': datetime.now().isoformat(),
-                    'device': self.device_name,
-                    'device_id': self.device_id,
-                    'gpu_index': self.gpu_index,
-                    'status': 'success'
-                }
-                
-                # Query specific GPU by index - now including encoder/decoder utilization
-                result = subprocess.run([
-                    'nvidia-smi', 
-                    f'--id={self.gpu_index}',
-                    '--query-gpu=utilization.gpu,utilization.memory,utilization.encoder,utilization.decoder,temperature.gpu,fan.speed,power.draw,memory.used,memory.total',
-                    '--format=csv,noheader,nounits'
-                ], capture_output=True, text=True, timeout=5)
-                
-                if result.returncode == 0 and result.stdout.strip():
-                    parts = result.stdout.strip().split(', ')
-                    if len(parts) >= 9:
-                        util_gpu, util_mem, util_enc, util_dec, temp, fan, power, mem_used, mem_total = parts[:9]
-                        
-                        # Clean and parse values safely
-                        def safe_int(value):
-                            try:
-                                return int(float(value.strip())) if value.strip() != 'N/A' else 0
-                            except (ValueError, AttributeError):
-                                return 0
-                        
-                        def safe_float(value):
-                            try:
-                                return float(value.strip()) if value.strip() != 'N/A' else 0.0
-                            except (ValueError, AttributeError):
-                                return 0.0
-                        
-                        mem_used_val = safe_int(mem_used)
-                        mem_total_val = safe_int(mem_total)
-                        mem_free_val = mem_total_val - mem_used_val if mem_total_val > 0 else 0
-                        
-                        metrics.update({
-                            'utilization_percent': safe_int(util_gpu),
-                            'memory_utilization_percent': safe_int(util_mem),
-                            'encoder_utilization_percent': safe_int(util_enc),
-                            'decoder_utilization_percent': safe_int(util_dec),
-                            'temperature_celsius': safe_int(temp),
-                            'fan_speed_percent': safe_int(fan),
-                            'power_watts': safe_float(power),
-                            'memory_used_mb': mem_used_val,
-                            'memory_total_mb': mem_total_val,
-                            'memory_free_mb': mem_free_val,
-                            'memory_used_percent': (mem_used_val / mem_total_val * 100) if mem_total_val > 0 else 0
-                        })
-                else:
-                    # Set error values
-                    metrics.update({
-                        'utilization_percent': 0,
-                        'memory_utilization_percent': 0,
-                        'encoder_utilization_percent': 0,
-                        'decoder_utilization_percent': 0,
-                        'temperature_celsius': 0,
-                        'fan_speed_percent': 0,
-                        'power_watts': 0.0,
-                        'memory_used_mb': 0,
-                        'memory_total_mb': 0,
-                        'memory_free_mb': 0,
-                        'memory_used_percent': 0
-                    })
-                
-                # Get processes for this specific GPU
-                processes = []
-                try:
-                    proc_result = subprocess.run([
-                        'nvidia-smi', 
-                        f'--id={self.gpu_index}',
-                        '--query-compute-apps=pid,name,used_memory', 
-                        '--format=csv,noheader'
-                    ], capture_output=True, text=True, timeout=5)
-                    
-                    if proc_result.returncode == 0 and proc_result.stdout.strip():
-                        for line in proc_result.stdout.strip().split('\n'):
-                            if line.strip():
-                                parts = line.split(', ')
-                                if len(parts) >= 3:
-                                    pid, name, mem = parts[:3]
-                                    if mem.strip() != '0 MiB' and mem.strip() != 'N/A':
-                                        processes.append({
-                                            'pid': pid,
-                                            'name': name,
-                                            'memory': mem
-                                        })
-                except:
-                    pass
-                
-                metrics['processes'] = processes
-                metrics['process_count'] = len(processes)
-                
-                self.latest_metrics = metrics
-                
-            except Exception as e:
-                # Set error status
-                self.latest_metrics = {
-                    'timestamp': datetime.now().isoformat(),
-                    'device': self.device_name,
-                    'device_id': self.device_id,
-                    'gpu_index': self.gpu_index,
-                    'status': 'error',
-                    'error': str(e),
-                    'utilization_percent': 0,
-                    'memory_utilization_percent': 0,
-                    'encoder_utilization_percent': 0,
-                    'decoder_utilization_percent': 0,
-                    'temperature_celsius': 0,
-                    'fan_speed_percent': 0,
-                    'power_watts': 0.0,
-                    'memory_used_mb': 0,
-                    'memory_total_mb': 0,
-                    'memory_free_mb': 0,
-                    'memory_used_percent': 0,
-                    'processes': [],
-                    'process_count': 0
-                }
-            
-            time.sleep(self.update_interval)
-    
-    def stop_monitoring(self):
-        """Stop monitoring"""
-        self.running = False
+        return _get_sampler(self.update_interval).start()
         
-    def get_latest_metrics(self):
-        """Get cached metrics (lightweight)"""
-        return self.latest_metrics.copy() if self.latest_metrics else {
+    def _empty_metrics(self, status, error=None):
+        metrics = {
             'timestamp': datetime.now().isoformat(),
             'device': self.device_name,
             'device_id': self.device_id,
             'gpu_index': self.gpu_index,
-            'status': 'no_data',
+            'status': status,
             'utilization_percent': 0,
             'memory_utilization_percent': 0,
             'encoder_utilization_percent': 0,
@@ -198,19 +112,247 @@ class OptimizedNvidiaMonitor:
             'processes': [],
             'process_count': 0
         }
+        if error:
+            metrics['error'] = error
+        return metrics
+        
+    def update_from_row(self, values):
+        """Update metrics from one parsed nvidia-smi row (fields after index and bus id)"""
+        util_gpu, util_mem, util_enc, util_dec, temp, fan, power, mem_used, mem_total = values[:9]
+        
+        mem_used_val = _safe_int(mem_used)
+        mem_total_val = _safe_int(mem_total)
+        mem_free_val = mem_total_val - mem_used_val if mem_total_val > 0 else 0
+        processes = self.processes
+        
+        self.latest_metrics = {
+            'timestamp': datetime.now().isoformat(),
+            'device': self.device_name,
+            'device_id': self.device_id,
+            'gpu_index': self.gpu_index,
+            'status': 'success',
+            'utilization_percent': _safe_int(util_gpu),
+            'memory_utilization_percent': _safe_int(util_mem),
+            'encoder_utilization_percent': _safe_int(util_enc),
+            'decoder_utilization_percent': _safe_int(util_dec),
+            'temperature_celsius': _safe_int(temp),
+            'fan_speed_percent': _safe_int(fan),
+            'power_watts': _safe_float(power),
+            'memory_used_mb': mem_used_val,
+            'memory_total_mb': mem_total_val,
+            'memory_free_mb': mem_free_val,
+            'memory_used_percent': (mem_used_val / mem_total_val * 100) if mem_total_val > 0 else 0,
+            'processes': processes,
+            'process_count': len(processes)
+        }
+        notify_device_update()
+        
+    def update_processes(self, processes):
+        """Update the compute process list (applied to the cached metrics immediately)"""
+        self.processes = processes
+        if self.latest_metrics.get('status') == 'success':
+            metrics = dict(self.latest_metrics)
+            metrics['processes'] = processes
+            metrics['process_count'] = len(processes)
+            self.latest_metrics = metrics
+            
+    def mark_error(self, error):
+        self.latest_metrics = self._empty_metrics('error', error)
+        
+    def stop_monitoring(self):
+        """Stop monitoring"""
+        self.running = False
+        
+    def get_latest_metrics(self):
+        """Get cached metrics (lightweight)"""
+        return self.latest_metrics.copy() if self.latest_metrics else self._empty_metrics('no_data')
+
+class NvidiaSmiStreamSampler:
+    """One long-running 'nvidia-smi --query-gpu ... -lms' reader fanned out to all device monitors
+    
+    Replaces two nvidia-smi forks per GPU per second with a single persistent
+    stream plus one all-GPU compute-apps query per interval.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.running = False
+        self.process = None
+        self.stream_thread = None
+        self.process_thread = None
+        self.restarts = 0
+        self.rows_parsed = 0
+        self.last_row_time = None
+        
+    def _command(self):
+        command = [
+            'nvidia-smi',
+            f"--query-gpu={','.join(GPU_QUERY_FIELDS)}",
+            '--format=csv,noheader,nounits',
+            f'--loop-ms={max(1, int(self.interval * 1000))}'
+        ]
+        # nvidia-smi block-buffers stdout on a pipe; force line buffering when stdbuf exists
+        if shutil.which('stdbuf'):
+            command = ['stdbuf', '-oL'] + command
+        return command
+        
+    def start(self):
+        """Start the stream reader and process query threads"""
+        if self.running:
+            return True
+            
+        self.running = True
+        self.stream_thread = threading.Thread(target=self._stream_loop, daemon=True)
+        self.stream_thread.start()
+        self.process_thread = threading.Thread(target=self._process_loop, daemon=True)
+        self.process_thread.start()
+        return True
+        
+    def stop(self):
+        """Stop the sampler and terminate the nvidia-smi stream"""
+        self.running = False
+        process = self.process
+        if process and process.poll() is None:
+            try:
+                process.terminate()
+                process.wait(timeout=2)
+            except (OSError, subprocess.TimeoutExpired):
+                process.kill()
+                
+    def _stream_loop(self):
+        """Read rows from nvidia-smi, restarting the stream with backoff if it exits"""
+        delay = RESTART_MIN_DELAY
+        
+        while self.running:
+            started_at = time.time()
+            error = 'nvidia-smi stream exited'
+            try:
+                self.process = subprocess.Popen(
+                    self._command(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                    text=True, bufsize=1
+                )
+                for line in self.process.stdout:
+                    if not self.running:
+                        break
+                    self.handle_line(line)
+            except Exception as e:
+                error = str(e)
+            finally:
+                if self.process and self.process.poll() is None:
+                    self.process.kill()
+                    
+            if not self.running:
+                break
+                
+            self.restarts += 1
+            with _monitor_lock:
+                for monitor in _nvidia_monitors.values():
+                    monitor.mark_error(error)
+                    
+            # Reset backoff after a stream that stayed up for a while
+            if time.time() - started_at > RESTART_MAX_DELAY:
+                delay = RESTART_MIN_DELAY
+            time.sleep(delay)
+            delay = min(delay * 2, RESTART_MAX_DELAY)
+            
+    def handle_line(self, line):
+        """Parse one CSV row and hand it to the matching device monitor"""
+        parts = [part.strip() for part in line.split(',')]
+        if len(parts) < len(GPU_QUERY_FIELDS):
+            return False
+            
+        gpu_index = _safe_int(parts[0])
+        monitor = _find_monitor(gpu_index, _normalize_bus_id(parts[1]))
+        if monitor is None:
+            return False
+            
+        monitor.update_from_row(parts[2:])
+        self.rows_parsed += 1
+        self.last_row_time = time.time()
+        return True
+        
+    def _process_loop(self):
+        """Query compute processes for all GPUs in one call per interval"""
+        interval = max(self.interval, PROCESS_QUERY_MIN_INTERVAL)
+        
+        while self.running:
+            try:
+                result = subprocess.run([
+                    'nvidia-smi',
+                    '--query-compute-apps=gpu_bus_id,pid,process_name,used_memory',
+                    '--format=csv,noheader'
+                ], capture_output=True, text=True, timeout=5)
+                
+                if result.returncode == 0:
+                    processes_by_bus = {}
+                    for line in result.stdout.strip().split('\n'):
+                        parts = [part.strip() for part in line.split(',')]
+                        if len(parts) < 4:
+                            continue
+                        bus_id, pid, name, mem = parts[:4]
+                        if mem != '0 MiB' and mem != 'N/A':
+                            processes_by_bus.setdefault(_normalize_bus_id(bus_id), []).append({
+                                'pid': pid,
+                                'name': name,
+                                'memory': mem
+                            })
+                            
+                    with _monitor_lock:
+                        for monitor in _nvidia_monitors.values():
+                            monitor.update_processes(processes_by_bus.get(monitor.bus_id, []))
+            except Exception:
+                pass
+                
+            time.sleep(interval)
+            
+    def get_stats(self):
+        """Get sampler statistics"""
+        return {
+            'running': self.running,
+            'interval': self.interval,
+            'restarts': self.restarts,
+            'rows_parsed': self.rows_parsed,
+            'last_row_time': self.last_row_time
+        }
 
-def _get_nvidia_gpu_count():
-    """Get the number of NVIDIA GPUs available"""
+def _get_sampler(interval=SAMPLE_INTERVAL):
+    """Get or create the shared streaming sampler"""
+    global _sampler
+    
+    if _sampler is None:
+        _sampler = NvidiaSmiStreamSampler(interval)
+    return _sampler
+
+def _find_monitor(gpu_index, bus_id):
+    """Match a stream row to a monitor by PCI bus id, falling back to the nvidia-smi index"""
+    with _monitor_lock:
+        fallback = None
+        for monitor in _nvidia_monitors.values():
+            if bus_id and monitor.bus_id == bus_id:
+                return monitor
+            if monitor.gpu_index == gpu_index and monitor.bus_id is None:
+                fallback = monitor
+        return fallback
+
+def _get_nvidia_gpus():
+    """Get (index, normalized bus id) for every NVIDIA GPU"""
     try:
-        result = subprocess.run(['nvidia-smi', '-L'], capture_output=True, text=True, timeout=5)
+        result = subprocess.run([
+            'nvidia-smi', '--query-gpu=index,pci.bus_id', '--format=csv,noheader'
+        ], capture_output=True, text=True, timeout=5)
         if result.returncode == 0:
-            return len([line for line in result.stdout.strip().split('\n') if line.startswith('GPU ')])
+            gpus = []
+            for line in result.stdout.strip().split('\n'):
+                parts = [part.strip() for part in line.split(',')]
+                if len(parts) >= 2:
+                    gpus.append((_safe_int(parts[0]), _normalize_bus_id(parts[1])))
+            return gpus
     except:
         pass
-    return 0
+    return []
 
-def start_nvidia_monitor():
-    """Start NVIDIA GPU monitors for all NVIDIA devices"""
+def start_nvidia_monitor(update_interval=SAMPLE_INTERVAL):
+    """Start NVIDIA GPU monitors for all NVIDIA devices (one shared nvidia-smi stream)"""
     global _nvidia_monitors
     
     with _monitor_lock:
@@ -222,26 +364,40 @@ def start_nvidia_monitor():
             
             if not nvidia_devices:
                 return False
-            
-            # Get total NVIDIA GPU count
-            gpu_count = _get_nvidia_gpu_count()
-            if gpu_count == 0:
+                
+            gpus = _get_nvidia_gpus()
+            if not gpus:
                 return False
-            
-            # Start monitors for each NVIDIA device
-            gpu_index = 0
+                
+            # Map Plex devices to nvidia-smi GPUs by PCI bus id, then by order
+            index_by_bus = {bus_id: index for index, bus_id in gpus if bus_id}
+            bus_by_index = dict(gpus)
+            unused_indices = [index for index, _ in gpus]
+            monitors = []
             for device in nvidia_devices:
-                device_id = device['id']
-                if device_id not in _nvidia_monitors and gpu_index < gpu_count:
-                    monitor = OptimizedNvidiaMonitor(device, gpu_index=gpu_index, update_interval=1)
-                    if monitor.start_monitoring():
-                        _nvidia_monitors[device_id] = monitor
-                    gpu_index += 1
-            
-            return len(_nvidia_monitors) > 0
-            
+                if device['id'] in _nvidia_monitors:
+                    continue
+                bus_id = _device_bus_id(device['id'])
+                if bus_id in index_by_bus:
+                    gpu_index = index_by_bus[bus_id]
+                elif unused_indices:
+                    gpu_index = unused_indices[0]
+                else:
+                    continue
+                if gpu_index in unused_indices:
+                    unused_indices.remove(gpu_index)
+                monitor = OptimizedNvidiaMonitor(device, gpu_index=gpu_index, update_interval=update_interval)
+                monitor.bus_id = bus_by_index.get(gpu_index) or bus_id
+                _nvidia_monitors[device['id']] = monitor
+                monitors.append(monitor)
+                
         except Exception as e:
             return False
+            
+    # Start outside the lock - the sampler threads take it when fanning out rows
+    for monitor in monitors:
+        monitor.start_monitoring()
+    return len(_nvidia_monitors) > 0
 
 def get_nvidia_gpu_data():
     """Get NVIDIA GPU data for ALL NVIDIA devices (lightweight)"""
@@ -256,13 +412,13 @@ def get_nvidia_gpu_data():
         if len(_nvidia_monitors) == 1:
             monitor = next(iter(_nvidia_monitors.values()))
             return monitor.get_latest_metrics()
-        
+            
         # Multiple NVIDIA devices - return first available data
         for monitor in _nvidia_monitors.values():
             data = monitor.get_latest_metrics()
             if data.get('status') == 'success':
                 return data
-    
+                
     return None
 
 def get_all_nvidia_gpu_data():
@@ -273,7 +429,7 @@ def get_all_nvidia_gpu_data():
     with _monitor_lock:
         for device_id, monitor in _nvidia_monitors.items():
             all_data[device_id] = monitor.get_latest_metrics()
-    
+            
     return all_data
 
 def get_nvidia_process_count():
@@ -286,14 +442,22 @@ def get_nvidia_process_count():
                 total_processes += data['process_count']
     return total_processes
 
+def get_nvidia_sampler_stats():
+    """Get statistics for the shared nvidia-smi stream"""
+    return _sampler.get_stats() if _sampler is not None else None
+
 def stop_all_monitors():
-    """Stop all NVIDIA monitors"""
-    global _nvidia_monitors
+    """Stop all NVIDIA monitors and the shared nvidia-smi stream"""
+    global _nvidia_monitors, _sampler
     
     with _monitor_lock:
         for monitor in _nvidia_monitors.values():
             monitor.stop_monitoring()
         _nvidia_monitors.clear()
+        
+    if _sampler is not None:
+        _sampler.stop()
+        _sampler = None
 
 # Legacy compatibility functions
 class NvidiaGPUMonitor:
@@ -312,7 +476,7 @@ class NvidiaGPUMonitor:
                 "power_draw": 0,
                 "processes": 0
             }
-        
+            
         return {
             "utilization": data.get('utilization_percent', 0),
             "temperature": data.get('temperature_celsius', 0),
@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 """Plex server API interactions"""
 
-import requests
+import random
 import re
+import threading
+import time
+from types import MappingProxyType
+import requests
+from requests.adapters import HTTPAdapter
 from import_helper import import_config
 
 # Load configuration
@@ -11,40 +16,234 @@ config = load_config()
 PLEX_SERVER = config['PLEX_SERVER']
 PLEX_TOKEN = config['PLEX_TOKEN']
 
+# Per-endpoint (connect, read) timeouts in seconds
+PLEX_ENDPOINT_TIMEOUTS = {
+    'prefs': (3.05, 10),
+    'prefs_update': (3.05, 10),
+    'sessions': (3.05, 5),
+    'server_info': (3.05, 5),
+}
+DEFAULT_TIMEOUT = (3.05, 10)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Prefs snapshot cache
+PREFS_CACHE_TTL = 2.0  # seconds a fetched /:/prefs document is reused
+PREFS_WAIT_TIMEOUT = 15  # seconds a caller waits on another caller's in-flight fetch
+
 # Dynamic device storage
 available_devices = {}
 
+class PlexClient:
+    """Pooled keep-alive HTTP client for the Plex server with retries and per-endpoint latency stats"""
+    
+    def __init__(self, server, token, timeouts=None, max_retries=2, backoff_base=0.1, backoff_max=1.0, pool_size=10):
+        self.server = server
+        self.token = token
+        self.timeouts = dict(PLEX_ENDPOINT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        
+        # One shared session keeps connections to Plex alive between calls
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            pool_block=False,
+            max_retries=0  # Retries are handled here so they can be jittered and counted
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Accept": "application/json"})
+        
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+    
+    def request(self, method, endpoint, path, params=None, raise_for_status=False):
+        """Send a request to Plex, retrying connection errors and retryable status codes with jitter"""
+        url = f"http://{self.server}{path}"
+        query = {"X-Plex-Token": self.token}
+        if params:
+            query.update(params)
+        timeout = self.timeouts.get(endpoint, DEFAULT_TIMEOUT)
+        
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, params=query, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(endpoint, started, error=True, retry=attempt > 0)
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                retryable = response.status_code in RETRYABLE_STATUS_CODES
+                self._record(endpoint, started, error=not response.ok, retry=attempt > 0)
+                if not retryable or attempt >= self.max_retries:
+                    if raise_for_status:
+                        response.raise_for_status()
+                    return response
+            
+            time.sleep(self._backoff_delay(attempt))
+            attempt += 1
+    
+    def get(self, endpoint, path, params=None, raise_for_status=False):
+        """GET a Plex endpoint"""
+        return self.request('GET', endpoint, path, params=params, raise_for_status=raise_for_status)
+    
+    def put(self, endpoint, path, params=None, raise_for_status=False):
+        """PUT a Plex endpoint"""
+        return self.request('PUT', endpoint, path, params=params, raise_for_status=raise_for_status)
+    
+    def _backoff_delay(self, attempt):
+        """Exponential backoff with full jitter so concurrent callers don't retry in lockstep"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+    
+    def _record(self, endpoint, started, error=False, retry=False):
+        """Record latency for a single attempt against an endpoint"""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            stats = self._stats.setdefault(endpoint, {
+                'requests': 0, 'errors': 0, 'retries': 0,
+                'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': 0.0
+            })
+            stats['requests'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['last_ms'] = elapsed_ms
+            if error:
+                stats['errors'] += 1
+            if retry:
+                stats['retries'] += 1
+    
+    def get_stats(self):
+        """Get per-endpoint request counts and latency statistics"""
+        with self._stats_lock:
+            return {
+                endpoint: {
+                    'requests': stats['requests'],
+                    'errors': stats['errors'],
+                    'retries': stats['retries'],
+                    'avg_ms': round(stats['total_ms'] / stats['requests'], 2) if stats['requests'] else 0,
+                    'max_ms': round(stats['max_ms'], 2),
+                    'last_ms': round(stats['last_ms'], 2)
+                }
+                for endpoint, stats in self._stats.items()
+            }
+
+_plex_client = None
+_plex_client_lock = threading.Lock()
+
+def get_plex_client():
+    """Get the shared PlexClient for this process"""
+    global _plex_client
+    with _plex_client_lock:
+        if _plex_client is None:
+            _plex_client = PlexClient(PLEX_SERVER, PLEX_TOKEN)
+        return _plex_client
+
+_prefs_cache = None
+_prefs_inflight = None
+_prefs_cache_lock = threading.Lock()
+
+def _fetch_prefs_snapshot():
+    """Fetch and decode /:/prefs once into a read-only snapshot"""
+    response = get_plex_client().get('prefs', '/:/prefs', raise_for_status=True)
+    
+    try:
+        settings = response.json().get('MediaContainer', {}).get('Setting', [])
+        # Every caller shares the cached snapshot, so expose it only through read-only views
+        settings_by_id = MappingProxyType({
+            setting.get('id'): MappingProxyType(setting) for setting in settings
+        })
+        fallback_text = None
+    except ValueError:
+        # Not JSON - keep the raw text so callers can fall back to XML parsing
+        settings_by_id = None
+        fallback_text = response.text
+    
+    return MappingProxyType({
+        'fetched_at': time.monotonic(),
+        'status_code': response.status_code,
+        'settings': settings_by_id,
+        'text': fallback_text,
+        'raw_head': response.text[:500]
+    })
+
+def get_prefs_snapshot(max_age=PREFS_CACHE_TTL):
+    """Get the cached /:/prefs snapshot, sharing one in-flight request between concurrent callers"""
+    global _prefs_cache, _prefs_inflight
+    
+    with _prefs_cache_lock:
+        if _prefs_cache is not None and time.monotonic() - _prefs_cache['fetched_at'] < max_age:
+            return _prefs_cache
+        
+        inflight = _prefs_inflight
+        is_leader = inflight is None
+        if is_leader:
+            inflight = {'done': threading.Event(), 'snapshot': None, 'error': None}
+            _prefs_inflight = inflight
+    
+    if not is_leader:
+        # Another caller is already fetching - wait for its result instead of issuing our own
+        if not inflight['done'].wait(PREFS_WAIT_TIMEOUT):
+            raise TimeoutError("Timed out waiting for in-flight Plex prefs request")
+        if inflight['error'] is not None:
+            raise inflight['error']
+        return inflight['snapshot']
+    
+    try:
+        inflight['snapshot'] = _fetch_prefs_snapshot()
+        return inflight['snapshot']
+    except Exception as e:
+        inflight['error'] = e
+        raise
+    finally:
+        with _prefs_cache_lock:
+            # Only publish if the cache wasn't invalidated while we were fetching
+            if _prefs_inflight is inflight:
+                if inflight['snapshot'] is not None:
+                    _prefs_cache = inflight['snapshot']
+                _prefs_inflight = None
+        inflight['done'].set()
+
+def invalidate_prefs_cache():
+    """Drop the cached prefs snapshot so the next read sees fresh values"""
+    global _prefs_cache, _prefs_inflight
+    with _prefs_cache_lock:
+        _prefs_cache = None
+        _prefs_inflight = None  # Detach any in-flight fetch that may predate the write
+
+def get_pref_setting(setting_id, max_age=PREFS_CACHE_TTL):
+    """Get a single setting entry from the cached prefs snapshot"""
+    settings = get_prefs_snapshot(max_age)['settings']
+    if settings is None:
+        raise ValueError("Plex prefs response was not JSON")
+    return settings.get(setting_id)
+
 def load_available_devices():
     """Load available GPU devices from Plex preferences and parse individual device info"""
     global available_devices
     try:
         from urllib.parse import unquote
         
-        response = requests.get(
-            f"http://{PLEX_SERVER}/:/prefs?X-Plex-Token={PLEX_TOKEN}",
-            headers={"Accept": "application/json"},
-            timeout=10
-        )
-        response.raise_for_status()
+        setting = get_pref_setting('HardwareDevicePath')
         
-        prefs_data = response.json()
-        media_container = prefs_data.get('MediaContainer', {})
-        settings = media_container.get('Setting', [])
-        
-        for setting in settings:
-            if setting.get('id') == 'HardwareDevicePath':
-                enum_values = setting.get('enumValues', '')
-                # Parse enumValues: ":Auto|device_id:Device Name|..."
-                devices = {}
-                for item in enum_values.split('|'):
-                    if ':' in item:
-                        device_id, device_name = item.split(':', 1)
-                        if device_id:  # Skip empty (Auto) option
-                            # URL decode the device ID to make it human-readable
-                            decoded_device_id = unquote(device_id)
-                            devices[decoded_device_id] = device_name
-                available_devices = devices
-                return devices
+        if setting:
+            enum_values = setting.get('enumValues', '')
+            # Parse enumValues: ":Auto|device_id:Device Name|..."
+            devices = {}
+            for item in enum_values.split('|'):
+                if ':' in item:
+                    device_id, device_name = item.split(':', 1)
+                    if device_id:  # Skip empty (Auto) option
+                        # URL decode the device ID to make it human-readable
+                        decoded_device_id = unquote(device_id)
+                        devices[decoded_device_id] = device_name
+            available_devices = devices
+            return devices
                 
     except Exception as e:
         return {}
@@ -100,22 +299,12 @@ def get_current_active_device():
     try:
         from urllib.parse import unquote
         
-        response = requests.get(
-            f"http://{PLEX_SERVER}/:/prefs?X-Plex-Token={PLEX_TOKEN}",
-            headers={"Accept": "application/json"},
-            timeout=5
-        )
-        response.raise_for_status()
-        
-        prefs_data = response.json()
-        media_container = prefs_data.get('MediaContainer', {})
-        settings = media_container.get('Setting', [])
+        setting = get_pref_setting('HardwareDevicePath')
         
-        for setting in settings:
-            if setting.get('id') == 'HardwareDevicePath':
-                active_device = setting.get('value', '')
-                # Decode the device ID to match our stored format
-                return unquote(active_device) if active_device else ''
+        if setting:
+            active_device = setting.get('value', '')
+            # Decode the device ID to match our stored format
+            return unquote(active_device) if active_device else ''
                 
     except Exception as e:
         return None
@@ -125,11 +314,7 @@ def get_current_active_device():
 def get_all_active_sessions():
     """Get all active sessions for display purposes"""
     try:
-        sessions_response = requests.get(
-            f"http://{PLEX_SERVER}/status/sessions?X-Plex-Token={PLEX_TOKEN}",
-            headers={"Accept": "application/json"},
-            timeout=5
-        )
+        sessions_response = get_plex_client().get('sessions', '/status/sessions')
         sessions_data = sessions_response.json().get('MediaContainer', {})
         session_items = sessions_data.get('Metadata', [])
         
@@ -182,15 +367,12 @@ def get_plex_status():
     """Get Plex server status and video transcoding session count"""
     try:
         # Get detailed sessions info
-        sessions_response = requests.get(
-            f"http://{PLEX_SERVER}/status/sessions?X-Plex-Token={PLEX_TOKEN}",
-            headers={"Accept": "application/json"},
-            timeout=5
-        )
+        sessions_response = get_plex_client().get('sessions', '/status/sessions')
         sessions_data = sessions_response.json().get('MediaContainer', {})
         
         # Count only video transcoding sessions
         video_transcoding_sessions = 0
+        transcode_session_ids = []  # TranscodeSession ids, for joining with transcoder processes
         session_items = sessions_data.get('Metadata', [])
         
         for session in session_items:
@@ -206,15 +388,14 @@ def get_plex_status():
                         video_decision = transcode_session.get('videoDecision', '')
                         if video_decision == 'transcode':
                             video_transcoding_sessions += 1
+                            transcode_key = transcode_session.get('key', '')
+                            if transcode_key:
+                                transcode_session_ids.append(transcode_key.rstrip('/').rsplit('/', 1)[-1])
                             break  # Count this session once even if multiple media parts
         
         # Get server info
         try:
-            server_response = requests.get(
-                f"http://{PLEX_SERVER}/?X-Plex-Token={PLEX_TOKEN}",
-                headers={"Accept": "application/json"},
-                timeout=5
-            )
+            server_response = get_plex_client().get('server_info', '/')
             server_info = server_response.json().get('MediaContainer', {})
             server_name = server_info.get('friendlyName', 'Unknown')
             server_version = server_info.get('version', 'Unknown')
@@ -222,15 +403,16 @@ def get_plex_status():
             
             return {
                 'sessions': video_transcoding_sessions, 
+                'transcode_sessions': transcode_session_ids,
                 'status': 'online',
                 'server_name': server_name,
                 'version': server_version,
                 'platform': platform
             }
         except:
-            return {'sessions': video_transcoding_sessions, 'status': 'online', 'server_name': 'Unknown', 'version': 'Unknown', 'platform': 'Unknown'}
+            return {'sessions': video_transcoding_sessions, 'transcode_sessions': transcode_session_ids, 'status': 'online', 'server_name': 'Unknown', 'version': 'Unknown', 'platform': 'Unknown'}
     except:
-        return {'sessions': 0, 'status': 'offline', 'server_name': 'Unknown', 'version': 'Unknown', 'platform': 'Unknown'}
+        return {'sessions': 0, 'transcode_sessions': [], 'status': 'offline', 'server_name': 'Unknown', 'version': 'Unknown', 'platform': 'Unknown'}
 
 def get_current_gpu():
     """Get current GPU from Plex preferences using JSON API"""
@@ -241,30 +423,16 @@ def get_current_gpu():
         load_available_devices()
     
     try:
-        response = requests.get(
-            f"http://{PLEX_SERVER}/:/prefs?X-Plex-Token={PLEX_TOKEN}",
-            headers={"Accept": "application/json"},
-            timeout=5
-        )
-        response.raise_for_status()
+        prefs_snapshot = get_prefs_snapshot()
         
-        # Try JSON parsing first
-        try:
-            prefs_data = response.json()
-            
-            # Find HardwareDevicePath in JSON structure
-            media_container = prefs_data.get('MediaContainer', {})
-            settings = media_container.get('Setting', [])
-            
-            current_device = None
-            for setting in settings:
-                if setting.get('id') == 'HardwareDevicePath':
-                    current_device = setting.get('value', '')
-                    break
+        # Try JSON settings first
+        if prefs_snapshot['settings'] is not None:
+            setting = prefs_snapshot['settings'].get('HardwareDevicePath')
+            current_device = setting.get('value', '') if setting else None
                     
-        except (ValueError, KeyError):
+        else:
             # Fallback to XML parsing if JSON fails
-            prefs_text = response.text
+            prefs_text = prefs_snapshot['text']
             hardware_pattern = r'<Setting\s+id="HardwareDevicePath"[^>]*value="([^"]*)"'
             match = re.search(hardware_pattern, prefs_text, re.DOTALL | re.IGNORECASE)
             current_device = match.group(1) if match else None
@@ -301,16 +469,15 @@ def switch_to_device(device_id):
     device_name = available_devices[device_id]
     
     try:
-        response = requests.put(
-            f"http://{PLEX_SERVER}/:/prefs",
-            params={
-                "HardwareDevicePath": device_id,
-                "X-Plex-Token": PLEX_TOKEN
-            },
-            headers={"Accept": "application/json"},
-            timeout=10
-        )
-        response.raise_for_status()
+        try:
+            get_plex_client().put(
+                'prefs_update', '/:/prefs',
+                params={"HardwareDevicePath": device_id},
+                raise_for_status=True
+            )
+        finally:
+            # The write changes HardwareDevicePath - never serve the old value afterwards
+            invalidate_prefs_cache()
         
         # Determine GPU type based on device
         if "nvidia" in device_name.lower() or "10de" in device_id:
@@ -351,16 +518,15 @@ def switch_gpu_by_type(gpu_type):
         return {'status': 'error', 'message': f'No {gpu_type.upper()} device found'}
     
     try:
-        response = requests.put(
-            f"http://{PLEX_SERVER}/:/prefs",
-            params={
-                "HardwareDevicePath": device_id,
-                "X-Plex-Token": PLEX_TOKEN
-            },
-            headers={"Accept": "application/json"},
-            timeout=10
-        )
-        response.raise_for_status()
+        try:
+            get_plex_client().put(
+                'prefs_update', '/:/prefs',
+                params={"HardwareDevicePath": device_id},
+                raise_for_status=True
+            )
+        finally:
+            # The write changes HardwareDevicePath - never serve the old value afterwards
+            invalidate_prefs_cache()
         
         return {'status': 'success', 'gpu': gpu_type.upper()}
     except Exception as e:
@@ -369,21 +535,14 @@ def switch_gpu_by_type(gpu_type):
 def get_plex_settings():
     """Get specific Plex server settings for dashboard display"""
     try:
-        response = requests.get(
-            f"http://{PLEX_SERVER}/:/prefs?X-Plex-Token={PLEX_TOKEN}",
-            headers={"Accept": "application/json"},
-            timeout=10
-        )
-        response.raise_for_status()
-        
-        prefs_data = response.json()
-        media_container = prefs_data.get('MediaContainer', {})
-        settings = media_container.get('Setting', [])
+        settings = get_prefs_snapshot()['settings']
+        if settings is None:
+            raise ValueError("Plex prefs response was not JSON")
         
         # Extract the specific settings we need
         settings_map = {}
-        for setting in settings:
-            settings_map[setting.get('id')] = setting.get('value')
+        for setting_id, setting in settings.items():
+            settings_map[setting_id] = setting.get('value')
         
         # Get the specific values requested
         friendly_name = settings_map.get('FriendlyName', 'Unknown')
@@ -425,22 +584,21 @@ def get_debug_info():
         load_available_devices()
     
     try:
-        # Get current preferences
-        response = requests.get(
-            f"http://{PLEX_SERVER}/:/prefs?X-Plex-Token={PLEX_TOKEN}",
-            headers={"Accept": "application/json"},
-            timeout=5
-        )
-        
-        prefs_data = response.text
+        # Get current preferences; an error response is shown as-is since that is what needs debugging
+        try:
+            prefs_snapshot = get_prefs_snapshot()
+            status_code, raw_prefs = prefs_snapshot['status_code'], prefs_snapshot['raw_head']
+        except requests.HTTPError as e:
+            status_code, raw_prefs = e.response.status_code, e.response.text[:500]
         current_gpu_status = get_current_gpu()
         
         return {
-            'status_code': response.status_code,
+            'status_code': status_code,
             'gpu_detection': current_gpu_status,
-            'raw_prefs': prefs_data[:500] if len(prefs_data) > 500 else prefs_data,
+            'raw_prefs': raw_prefs,
             'available_devices': available_devices,
-            'plex_server': PLEX_SERVER
+            'plex_server': PLEX_SERVER,
+            'plex_client': get_plex_client().get_stats()
         }
         
     except Exception as e:
@@ -449,5 +607,6 @@ def get_debug_info():
             'gpu_detection': f'Error: {str(e)}',
             'raw_prefs': 'Failed to fetch',
             'available_devices': available_devices,
-            'plex_server': PLEX_SERVER
+            'plex_server': PLEX_SERVER,
+            'plex_client': get_plex_client().get_stats()
         }
@@ -5,7 +5,10 @@ import time
 import logging
 import sys
 import os
+from collections import deque
 from datetime import datetime
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional, Tuple
 
 # Add src directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -13,32 +16,46 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # Import balance configuration system
 from balance_config import get_current_settings, get_gpu_devices_mapping
 
-# Import GPU collector service
+# Import GPU collector client (hardware is sampled only by the collector service)
 try:
-    from gpu_collector_service import get_device_load_data, is_gpu_collector_running
+    from gpu_collector_client import (
+        get_device_loads, is_gpu_collector_running, get_metrics_by_type, get_load_forecasts,
+        get_device_engine_loads
+    )
     GPU_MONITORING_AVAILABLE = True
 except ImportError as e:
-    print(f"⚠️  GPU collector service not available: {e}")
+    print(f"⚠️  GPU collector client not available: {e}")
     GPU_MONITORING_AVAILABLE = False
-    def get_device_load_data(device_id, timeframe_seconds):
-        return None
+    def get_device_loads(device_ids, windows):
+        return {}
     def is_gpu_collector_running():
         return False
+    def get_metrics_by_type(device_type):
+        return {}
+    def get_load_forecasts(device_ids, horizon_seconds, threshold_percentage=None):
+        return {}
+    def get_device_engine_loads(device_ids, window_seconds):
+        return {}
 
-# Import NVIDIA monitoring for session counting
+# Import transcoder process attribution for exact per-GPU session counts
 try:
-    from nvidia_gpu_monitor import get_all_nvidia_gpu_data
-    NVIDIA_MONITORING_AVAILABLE = True
+    from plex_process_attribution import get_sessions_per_device
+    PROCESS_ATTRIBUTION_AVAILABLE = True
 except ImportError:
-    NVIDIA_MONITORING_AVAILABLE = False
-    def get_all_nvidia_gpu_data():
-        return {}
+    PROCESS_ATTRIBUTION_AVAILABLE = False
 
 # Import Plex API functions
-from plex_api import get_plex_status, get_current_active_device, switch_to_device, load_available_devices
+from plex_api import get_plex_status, get_current_active_device, switch_to_device, load_available_devices, PLEX_SERVER, PLEX_TOKEN
+
+# Import Plex notifications listener for event-driven evaluation
+try:
+    from plex_notifications import PlexNotificationListener, WEBSOCKET_AVAILABLE as NOTIFICATIONS_AVAILABLE
+except ImportError:
+    NOTIFICATIONS_AVAILABLE = False
 
 # Configuration
-CHECK_INTERVAL = 5  # seconds between evaluations
+CHECK_INTERVAL = 5  # seconds between evaluations while sessions are active (default for [tick_rate])
+EVENT_MIN_INTERVAL = 0.25  # minimum seconds between event-triggered evaluations
 
 # Global state
 total_switches = 0
@@ -46,6 +63,8 @@ service_start_time = datetime.now()
 last_optimal_gpu = None
 split_sessions_rotation_index = 0
 last_switch_time = None
+current_tick_interval = CHECK_INTERVAL
+suppressed_switches = {'rate_limit': 0, 'dwell': 0, 'budget': 0}  # switches held back, by rule that held them
 
 # Session tracking for improved balancing
 last_total_sessions = 0
@@ -67,6 +86,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class ClusterSnapshot(NamedTuple):
+    """Immutable view of sessions, loads and active device taken once per balancer tick"""
+    timestamp: float
+    total_sessions: int
+    session_counts: Mapping[str, int]
+    device_loads: Mapping[str, Optional[float]]
+    load_window_seconds: int
+    device_forecasts: Mapping[str, Optional[dict]]  # empty unless forecast_horizon_seconds is set
+    engine_loads: Mapping[str, Optional[dict]]  # encoder/decoder/render %, empty unless weighted-capacity is active
+    active_device_id: Optional[str]
+    priority_order: Tuple[str, ...]
+
 class IntelligentPlexGPUBalancer:
     """Intelligent GPU balancer using configuration-driven algorithms"""
     
@@ -74,6 +105,17 @@ class IntelligentPlexGPUBalancer:
         self.available_devices = {}
         self.gpu_devices_mapping = {}
         self.balance_settings = {}
+        self.notification_listener = None
+        self.last_evaluation_time = 0
+        self.last_snapshot = None
+        self.last_activity_time = 0  # last session change or switch, keeps ticks fast for a while
+        self.load_overloaded_devices = set()  # GPUs held overloaded until load drops below the exit threshold
+        self.observed_active_device = None
+        self.active_since = 0  # when the active GPU became active (0 = unknown, dwell satisfied)
+        self.recent_switch_times = deque()  # automatic switch times inside the budget window
+        self.last_suppression = None
+        self.pending_rotation = None  # (device_id, next rotation index, new session) chosen by split-sessions
+        self.last_log_times = {}  # periodic log message -> monotonic time it was last written
         self.load_settings()
         
     def should_reload_config(self):
@@ -129,22 +171,38 @@ class IntelligentPlexGPUBalancer:
     
     def get_plex_sessions(self):
         """Get current total Plex sessions"""
+        return self.get_plex_session_info()[0]
+    
+    def get_plex_session_info(self):
+        """Get (total video transcode sessions, transcode session ids) from one Plex request"""
         try:
             plex_status = get_plex_status()
-            return plex_status.get('sessions', 0)
+            return plex_status.get('sessions', 0), plex_status.get('transcode_sessions', [])
         except Exception as e:
             logger.error(f"❌ Failed to get Plex sessions: {e}")
-            return 0
+            return 0, []
+    
+    def get_attributed_sessions_per_gpu(self, transcode_session_ids):
+        """Get exact session counts per device from transcoder processes, or None if unavailable"""
+        if not PROCESS_ATTRIBUTION_AVAILABLE:
+            return None
+        
+        try:
+            # Fast ticks reuse the last /proc scan unless the set of transcode sessions changed
+            return get_sessions_per_device(list(self.available_devices), transcode_session_ids)
+        except Exception as e:
+            logger.error(f"❌ Failed to attribute transcoder processes: {e}")
+            return None
     
     def get_nvidia_sessions_per_gpu(self):
         """Get session count per NVIDIA GPU"""
         sessions_per_gpu = {}
         
-        if not NVIDIA_MONITORING_AVAILABLE:
+        if not GPU_MONITORING_AVAILABLE:
             return sessions_per_gpu
             
         try:
-            nvidia_data = get_all_nvidia_gpu_data()
+            nvidia_data = get_metrics_by_type('nvidia')
             if isinstance(nvidia_data, dict):
                 for device_id, device_data in nvidia_data.items():
                     process_count = device_data.get('process_count', 0)
@@ -161,30 +219,41 @@ class IntelligentPlexGPUBalancer:
         intel_sessions = max(0, total_plex_sessions - total_nvidia_sessions)
         return intel_sessions
     
-    def get_device_load_analysis(self, device_id, timeframe_seconds):
-        """Analyze device load over specified timeframe using GPU collector service"""
-        if not GPU_MONITORING_AVAILABLE:
-            return None
-            
-        # Check if GPU collector service is running
-        if not is_gpu_collector_running():
-            logger.warning("⚠️  GPU collector service not running - load analysis unavailable")
-            return None
-            
-        try:
-            # Use GPU collector service API
-            avg_utilization = get_device_load_data(device_id, timeframe_seconds)
-            return avg_utilization
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to analyze load for {device_id}: {e}")
-            return None
+    def get_method_settings(self):
+        """Get the settings section for the active balancing method"""
+        method = self.balance_settings.get('method', 'preferred-order')
+        if method == 'split-sessions':
+            return self.balance_settings.get('split_sessions', {})
+        if method == 'weighted-capacity':
+            return self.balance_settings.get('weighted_capacity', {})
+        return self.balance_settings.get('preferred_order', {})
     
-    def get_gpu_session_count(self, device_id):
-        """Get current session count for a specific GPU device"""
-        nvidia_sessions = self.get_nvidia_sessions_per_gpu()
-        total_plex_sessions = self.get_plex_sessions()
-        
+    def get_load_threshold(self, method_settings):
+        """Get (percentage, seconds) load threshold for the active balancing method"""
+        method = self.balance_settings.get('method', 'preferred-order')
+        if method == 'preferred-order':
+            threshold_percentage = method_settings.get('load_threshold_percentage', 80)
+            threshold_seconds = method_settings.get('load_threshold_seconds', 30)
+        elif method == 'weighted-capacity':
+            threshold_percentage = method_settings.get('load_limit_percentage', 85)
+            threshold_seconds = method_settings.get('load_limit_seconds', 30)
+        else:  # split-sessions
+            threshold_percentage = method_settings.get('load_limit_percentage', 75)
+            threshold_seconds = method_settings.get('load_limit_seconds', 60)
+        return threshold_percentage, threshold_seconds
+    
+    def get_forecast_horizon(self, method_settings):
+        """Get how many seconds ahead a projected threshold crossing counts as overloaded (0 = off)"""
+        return max(0, method_settings.get('forecast_horizon_seconds', 0))
+    
+    def get_load_thresholds(self):
+        """Get (enter, exit) load percentages; exit = enter - exit_hysteresis_percentage"""
+        threshold_percentage, _ = self.get_load_threshold(self.get_method_settings())
+        hysteresis = self.balance_settings.get('switching_policy', {}).get('exit_hysteresis_percentage', 10)
+        return threshold_percentage, threshold_percentage - max(0, hysteresis)
+    
+    def calculate_gpu_session_count(self, device_id, total_plex_sessions, nvidia_sessions):
+        """Calculate session count for a specific GPU device from already collected data"""
         # Check if this is an NVIDIA device
         if device_id in nvidia_sessions:
             return nvidia_sessions[device_id]
@@ -200,23 +269,87 @@ class IntelligentPlexGPUBalancer:
         # For unknown devices, assume 0 sessions
         return 0
     
-    def get_all_gpu_session_counts(self):
-        """Get session counts for all GPU devices"""
-        session_counts = {}
-        gpu_priority_order = self.get_gpu_priority_order()
+    def build_cluster_snapshot(self):
+        """Collect sessions, loads and active device once so every strategy reads the same tick state"""
+        priority_order = tuple(self.get_gpu_priority_order())
+        
+        # One Plex sessions request and one monitor read per tick, regardless of GPU count
+        total_plex_sessions, transcode_session_ids = self.get_plex_session_info()
+        session_counts = self.get_attributed_sessions_per_gpu(transcode_session_ids)
+        if session_counts is None:
+            # No transcoder processes visible (e.g. Plex on another host) - estimate from NVIDIA processes
+            nvidia_sessions = self.get_nvidia_sessions_per_gpu()
+            session_counts = {
+                device_id: self.calculate_gpu_session_count(device_id, total_plex_sessions, nvidia_sessions)
+                for device_id in self.available_devices
+            }
+        
+        # Windowed loads for the active method's threshold window
+        method_settings = self.get_method_settings()
+        threshold_percentage, threshold_seconds = self.get_load_threshold(method_settings)
+        forecast_horizon = self.get_forecast_horizon(method_settings)
+        device_loads = {}
+        device_forecasts = {}
+        engine_loads = {}
+        if GPU_MONITORING_AVAILABLE and priority_order:
+            if is_gpu_collector_running():
+                # One bulk collector request for every device in the priority order
+                try:
+                    bulk_loads = get_device_loads(priority_order, [threshold_seconds])
+                    for device_id in priority_order:
+                        device_loads[device_id] = bulk_loads.get(device_id, {}).get(threshold_seconds)
+                except Exception as e:
+                    logger.error(f"❌ Failed to analyze device loads: {e}")
+                    
+                # Trend forecasts, so a GPU about to saturate stops receiving new sessions early
+                if forecast_horizon:
+                    try:
+                        device_forecasts = get_load_forecasts(priority_order, forecast_horizon, threshold_percentage)
+                    except Exception as e:
+                        logger.error(f"❌ Failed to get load forecasts: {e}")
+                        
+                # Per-engine utilization, only needed to score headroom for weighted-capacity
+                if self.balance_settings.get('method') == 'weighted-capacity':
+                    try:
+                        engine_loads = get_device_engine_loads(priority_order, threshold_seconds)
+                    except Exception as e:
+                        logger.error(f"❌ Failed to get engine loads: {e}")
+            else:
+                logger.warning("⚠️  GPU collector service not running - load analysis unavailable")
         
-        for device_id in gpu_priority_order:
-            session_counts[device_id] = self.get_gpu_session_count(device_id)
-            
-        return session_counts
+        active_device_id = None
+        try:
+            active_device_id = get_current_active_device()
+        except Exception as e:
+            logger.error(f"❌ Failed to get active device: {e}")
+        
+        return ClusterSnapshot(
+            timestamp=time.time(),
+            total_sessions=total_plex_sessions,
+            session_counts=MappingProxyType(session_counts),
+            device_loads=MappingProxyType(device_loads),
+            load_window_seconds=threshold_seconds,
+            device_forecasts=MappingProxyType(device_forecasts),
+            engine_loads=MappingProxyType(engine_loads),
+            active_device_id=active_device_id,
+            priority_order=priority_order
+        )
+    
+    def get_gpu_session_count(self, snapshot, device_id):
+        """Get session count for a specific GPU device from the tick snapshot"""
+        return snapshot.session_counts.get(device_id, 0)
     
-    def detect_session_changes(self):
+    def get_all_gpu_session_counts(self, snapshot):
+        """Get session counts for all GPU devices in priority order"""
+        return {device_id: self.get_gpu_session_count(snapshot, device_id) for device_id in snapshot.priority_order}
+    
+    def detect_session_changes(self, snapshot):
         """Detect if there have been session changes since last check"""
         global last_total_sessions, last_session_check_time, session_change_detected, last_gpu_session_counts
         
-        current_total_sessions = self.get_plex_sessions()
-        current_time = time.time()
-        current_gpu_sessions = self.get_all_gpu_session_counts()
+        current_total_sessions = snapshot.total_sessions
+        current_time = snapshot.timestamp
+        current_gpu_sessions = self.get_all_gpu_session_counts(snapshot)
         
         # Initialize on first run
         if last_session_check_time is None:
@@ -255,20 +388,17 @@ class IntelligentPlexGPUBalancer:
         
         return session_change_detected
     
-    def find_least_loaded_gpu(self):
+    def find_least_loaded_gpu(self, snapshot):
         """Find the GPU with the least number of sessions for rebalancing"""
-        gpu_priority_order = self.get_gpu_priority_order()
-        method_settings = self.balance_settings.get('split_sessions', {})
-        
-        if not gpu_priority_order:
+        if not snapshot.priority_order:
             return None, "No GPU priority order configured"
         
         # Get session counts and filter out overloaded GPUs
         available_gpus = []
-        for device_id in gpu_priority_order:
-            is_overloaded, reason = self.is_gpu_overloaded(device_id, method_settings)
+        for device_id in snapshot.priority_order:
+            is_overloaded, reason = self.is_gpu_overloaded(snapshot, device_id)
             if not is_overloaded:
-                session_count = self.get_gpu_session_count(device_id)
+                session_count = self.get_gpu_session_count(snapshot, device_id)
                 available_gpus.append((device_id, session_count))
         
         if not available_gpus:
@@ -282,20 +412,17 @@ class IntelligentPlexGPUBalancer:
         device_name = self.available_devices.get(least_loaded_device, least_loaded_device)
         return least_loaded_device, f"Least loaded GPU: {device_name} ({least_loaded_sessions} sessions)"
     
-    def should_rebalance_sessions(self):
+    def should_rebalance_sessions(self, snapshot):
         """Check if session rebalancing is needed based on uneven distribution"""
-        gpu_priority_order = self.get_gpu_priority_order()
-        method_settings = self.balance_settings.get('split_sessions', {})
-        
-        if len(gpu_priority_order) < 2:
+        if len(snapshot.priority_order) < 2:
             return False, None, "Only one GPU available"
         
         # Get session counts for available GPUs
         available_sessions = []
-        for device_id in gpu_priority_order:
-            is_overloaded, reason = self.is_gpu_overloaded(device_id, method_settings)
+        for device_id in snapshot.priority_order:
+            is_overloaded, reason = self.is_gpu_overloaded(snapshot, device_id)
             if not is_overloaded:
-                session_count = self.get_gpu_session_count(device_id)
+                session_count = self.get_gpu_session_count(snapshot, device_id)
                 available_sessions.append((device_id, session_count))
         
         if len(available_sessions) < 2:
@@ -313,7 +440,7 @@ class IntelligentPlexGPUBalancer:
         
         return False, None, f"Sessions balanced (max difference: {max_sessions - min_sessions})"
     
-    def is_gpu_overloaded(self, device_id, method_settings):
+    def is_gpu_overloaded(self, snapshot, device_id):
         """Check if GPU is overloaded based on session limits and load thresholds"""
         try:
             # Get GPU key for this device
@@ -329,7 +456,7 @@ class IntelligentPlexGPUBalancer:
             # Check session limit
             max_sessions_key = f"{gpu_key}_max_sessions"
             max_sessions = self.balance_settings.get('max_sessions', {}).get(max_sessions_key, 5)
-            current_sessions = self.get_gpu_session_count(device_id)
+            current_sessions = self.get_gpu_session_count(snapshot, device_id)
             
             # Handle graceful fallback for Intel session counting
             if current_sessions is None or current_sessions < 0:
@@ -338,18 +465,25 @@ class IntelligentPlexGPUBalancer:
                 if current_sessions >= max_sessions:
                     return True, f"session limit reached ({current_sessions}/{max_sessions})"
             
-            # Check load threshold
-            method = self.balance_settings.get('method', 'preferred-order')
-            if method == 'preferred-order':
-                threshold_percentage = method_settings.get('load_threshold_percentage', 80)
-                threshold_seconds = method_settings.get('load_threshold_seconds', 30)
-            else:  # split-sessions
-                threshold_percentage = method_settings.get('load_limit_percentage', 75)
-                threshold_seconds = method_settings.get('load_limit_seconds', 60)
+            # Check load threshold - a GPU that crossed it stays overloaded until it drops below the exit threshold
+            threshold_percentage, exit_percentage = self.get_load_thresholds()
+            threshold_seconds = snapshot.load_window_seconds
             
-            avg_load = self.get_device_load_analysis(device_id, threshold_seconds)
+            avg_load = snapshot.device_loads.get(device_id)
             if avg_load is not None and avg_load > threshold_percentage:
                 return True, f"load threshold exceeded ({avg_load:.1f}% > {threshold_percentage}% over {threshold_seconds}s)"
+            if avg_load is not None and device_id in self.load_overloaded_devices and avg_load > exit_percentage:
+                return True, f"load above exit threshold ({avg_load:.1f}% > {exit_percentage}% over {threshold_seconds}s)"
+            
+            # Predictive check - the load trend crosses the threshold within the forecast horizon
+            forecast = snapshot.device_forecasts.get(device_id)
+            forecast_horizon = self.get_forecast_horizon(self.get_method_settings())
+            if forecast_horizon and forecast and forecast.get('seconds_to_threshold') is not None:
+                seconds_to_threshold = forecast['seconds_to_threshold']
+                if seconds_to_threshold <= forecast_horizon:
+                    return True, (f"load projected to exceed {threshold_percentage}% in {seconds_to_threshold:.0f}s "
+                                  f"(now {forecast['current_load_percent']:.1f}%, "
+                                  f"{forecast['trend_percent_per_second']:+.2f}%/s)")
             
             return False, "within limits"
             
@@ -374,10 +508,9 @@ class IntelligentPlexGPUBalancer:
         
         return ordered_devices
     
-    def evaluate_preferred_order_method(self):
+    def evaluate_preferred_order_method(self, snapshot):
         """Evaluate optimal GPU using preferred-order method"""
-        method_settings = self.balance_settings.get('preferred_order', {})
-        gpu_priority_order = self.get_gpu_priority_order()
+        gpu_priority_order = snapshot.priority_order
         
         if not gpu_priority_order:
             logger.warning("⚠️  No GPU priority order configured")
@@ -385,7 +518,7 @@ class IntelligentPlexGPUBalancer:
         
         # Check GPUs in priority order
         for device_id in gpu_priority_order:
-            is_overloaded, reason = self.is_gpu_overloaded(device_id, method_settings)
+            is_overloaded, reason = self.is_gpu_overloaded(snapshot, device_id)
             device_name = self.available_devices.get(device_id, device_id)
             
             if not is_overloaded:
@@ -395,28 +528,24 @@ class IntelligentPlexGPUBalancer:
         logger.warning("⚠️  All GPUs are overloaded, selecting highest priority GPU")
         return gpu_priority_order[0], f"All GPUs overloaded, using highest priority: {self.available_devices.get(gpu_priority_order[0], gpu_priority_order[0])}"
     
-    def evaluate_split_sessions_method(self):
+    def evaluate_split_sessions_method(self, snapshot):
         """Evaluate optimal GPU using split-sessions method with session change detection"""
         global split_sessions_rotation_index
         
-        method_settings = self.balance_settings.get('split_sessions', {})
-        gpu_priority_order = self.get_gpu_priority_order()
+        gpu_priority_order = snapshot.priority_order
         
         if not gpu_priority_order:
             logger.warning("⚠️  No GPU priority order configured")
             return None, "No priority order configured"
         
-        # Detect session changes
-        session_changed = self.detect_session_changes()
+        # Detect session changes (remember the previous total to spot new sessions)
+        previous_total_sessions = last_total_sessions
+        session_changed = self.detect_session_changes(snapshot)
         
         # Check if we need to rebalance based on uneven session distribution
-        should_rebalance, rebalance_device, rebalance_reason = self.should_rebalance_sessions()
+        should_rebalance, rebalance_device, rebalance_reason = self.should_rebalance_sessions(snapshot)
         
-        current_device_id = None
-        try:
-            current_device_id = get_current_active_device()
-        except:
-            pass
+        current_device_id = snapshot.active_device_id
         
         # If sessions are unbalanced and current GPU is not the least loaded, rebalance
         if should_rebalance and current_device_id != rebalance_device:
@@ -426,7 +555,7 @@ class IntelligentPlexGPUBalancer:
         # Find available (non-overloaded) GPUs
         available_gpus = []
         for device_id in gpu_priority_order:
-            is_overloaded, reason = self.is_gpu_overloaded(device_id, method_settings)
+            is_overloaded, reason = self.is_gpu_overloaded(snapshot, device_id)
             if not is_overloaded:
                 available_gpus.append(device_id)
         
@@ -440,7 +569,7 @@ class IntelligentPlexGPUBalancer:
         # 2. OR current GPU is overloaded/not available
         current_gpu_available = current_device_id in available_gpus if current_device_id else False
         
-        if session_changed and self.get_plex_sessions() > last_total_sessions:
+        if session_changed and snapshot.total_sessions > previous_total_sessions:
             # New session detected - rotate to next GPU
             if split_sessions_rotation_index >= len(available_gpus):
                 split_sessions_rotation_index = 0
@@ -448,7 +577,9 @@ class IntelligentPlexGPUBalancer:
             selected_device = available_gpus[split_sessions_rotation_index]
             device_name = self.available_devices.get(selected_device, selected_device)
             
-            split_sessions_rotation_index = (split_sessions_rotation_index + 1) % len(available_gpus)
+            # Rotation advances only once the GPU is active (see commit_rotation)
+            next_index = (split_sessions_rotation_index + 1) % len(available_gpus)
+            self.pending_rotation = (selected_device, next_index, True)
             
             logger.info(f"🔄 New session detected - rotating to next GPU")
             return selected_device, f"New session rotation: {device_name} (session change detected)"
@@ -461,7 +592,8 @@ class IntelligentPlexGPUBalancer:
             selected_device = available_gpus[split_sessions_rotation_index]
             device_name = self.available_devices.get(selected_device, selected_device)
             
-            split_sessions_rotation_index = (split_sessions_rotation_index + 1) % len(available_gpus)
+            next_index = (split_sessions_rotation_index + 1) % len(available_gpus)
+            self.pending_rotation = (selected_device, next_index, False)
             
             return selected_device, f"Current GPU unavailable - switching to: {device_name}"
         
@@ -476,24 +608,148 @@ class IntelligentPlexGPUBalancer:
                 device_name = self.available_devices.get(selected_device, selected_device)
                 return selected_device, f"Fallback selection: {device_name}"
     
-    def evaluate_optimal_gpu(self):
+    def get_capacity_score(self, snapshot, device_id, method_settings):
+        """Get a GPU's capacity weight times its weighted mean engine headroom (%), or None without engine data"""
+        engines = snapshot.engine_loads.get(device_id)
+        if not engines:
+            return None
+            
+        weights = {
+            'encoder': max(0.0, method_settings.get('encoder_weight', 1.0)),
+            'decoder': max(0.0, method_settings.get('decoder_weight', 1.0)),
+            'render': max(0.0, method_settings.get('render_weight', 0.5))
+        }
+        # Engines without a reading are left out and the rest renormalized - a missing metric is not free capacity
+        weights = {engine: weight for engine, weight in weights.items() if engines.get(engine) is not None}
+        total_weight = sum(weights.values())
+        if total_weight <= 0:
+            return None
+        headroom = sum(
+            weight * max(0.0, 100.0 - engines[engine])
+            for engine, weight in weights.items()
+        ) / total_weight
+        
+        gpu_key = next((key for key, mapped_device_id in self.gpu_devices_mapping.items()
+                        if mapped_device_id == device_id), None)
+        capacity = self.balance_settings.get('capacity_weights', {}).get(f"{gpu_key}_capacity", 1.0)
+        return max(0.0, capacity) * headroom
+    
+    def evaluate_weighted_capacity_method(self, snapshot):
+        """Evaluate optimal GPU using weighted-capacity method (most capacity-weighted engine headroom)"""
+        gpu_priority_order = snapshot.priority_order
+        
+        if not gpu_priority_order:
+            logger.warning("⚠️  No GPU priority order configured")
+            return None, "No priority order configured"
+        
+        # Session limits and load limits still rule a GPU out entirely
+        available_gpus = []
+        for device_id in gpu_priority_order:
+            is_overloaded, reason = self.is_gpu_overloaded(snapshot, device_id)
+            if not is_overloaded:
+                available_gpus.append(device_id)
+        
+        if not available_gpus:
+            logger.warning("⚠️  All GPUs overloaded in weighted-capacity, using highest priority")
+            return gpu_priority_order[0], f"All GPUs overloaded, using highest priority: {self.available_devices.get(gpu_priority_order[0], gpu_priority_order[0])}"
+        
+        method_settings = self.get_method_settings()
+        scores = {}
+        for device_id in available_gpus:
+            score = self.get_capacity_score(snapshot, device_id, method_settings)
+            if score is not None:
+                scores[device_id] = score
+        
+        if not scores:
+            # No per-engine metrics (collector unreachable) - behave like preferred-order
+            selected_device = available_gpus[0]
+            device_name = self.available_devices.get(selected_device, selected_device)
+            return selected_device, f"Engine metrics unavailable, using first available GPU: {device_name}"
+        
+        # Highest score wins; max() keeps the first of equal scores, so ties go to the higher priority GPU
+        best_device = max(scores, key=lambda device_id: scores[device_id])
+        best_name = self.available_devices.get(best_device, best_device)
+        
+        # Stay on the active GPU unless another has clearly more headroom
+        current_device_id = snapshot.active_device_id
+        margin = max(0, method_settings.get('score_margin_percentage', 10))
+        if (current_device_id in scores and current_device_id != best_device
+                and scores[best_device] <= scores[current_device_id] * (1 + margin / 100)):
+            current_name = self.available_devices.get(current_device_id, current_device_id)
+            return current_device_id, (f"Staying on {current_name} (headroom score {scores[current_device_id]:.1f} "
+                                       f"within {margin:g}% of {best_name} at {scores[best_device]:.1f})")
+        
+        return best_device, f"Selected {best_name} (most engine headroom, score {scores[best_device]:.1f})"
+    
+    def evaluate_optimal_gpu(self, snapshot):
         """Determine the optimal GPU based on current method and conditions"""
         method = self.balance_settings.get('method', 'preferred-order')
+        self.pending_rotation = None
         
         if method == 'preferred-order':
-            return self.evaluate_preferred_order_method()
+            return self.evaluate_preferred_order_method(snapshot)
         elif method == 'split-sessions':
-            return self.evaluate_split_sessions_method()
+            return self.evaluate_split_sessions_method(snapshot)
+        elif method == 'weighted-capacity':
+            return self.evaluate_weighted_capacity_method(snapshot)
         else:
             logger.error(f"❌ Unknown balancing method: {method}")
             return None, f"Unknown method: {method}"
     
-    def switch_gpu_if_needed(self, optimal_device_id, reason):
+    def update_switching_state(self, snapshot):
+        """Track load hysteresis per GPU and how long the active GPU has been active"""
+        threshold_percentage, exit_percentage = self.get_load_thresholds()
+        for device_id, avg_load in snapshot.device_loads.items():
+            if avg_load is None:
+                continue
+            if avg_load > threshold_percentage:
+                self.load_overloaded_devices.add(device_id)
+            elif avg_load <= exit_percentage:
+                self.load_overloaded_devices.discard(device_id)
+                
+        # A switch made outside the balancer (dashboard, Plex UI) also starts a dwell period
+        if snapshot.active_device_id != self.observed_active_device:
+            if self.observed_active_device is not None:
+                self.active_since = snapshot.timestamp
+            self.observed_active_device = snapshot.active_device_id
+    
+    def check_switching_policy(self, snapshot, current_device_id):
+        """Get (rule, reason) if the anti-flapping policy holds back a switch now, else (None, None)"""
+        policy = self.balance_settings.get('switching_policy', {})
+        now = snapshot.timestamp
+        
+        # Dwell time - stay on a newly activated GPU unless it cannot take sessions
+        min_dwell = policy.get('min_dwell_seconds', 60)
+        active_for = now - self.active_since
+        if current_device_id in snapshot.priority_order and active_for < min_dwell:
+            current_overloaded, _ = self.is_gpu_overloaded(snapshot, current_device_id)
+            if not current_overloaded:
+                return 'dwell', f"active GPU kept for minimum dwell ({active_for:.0f}s < {min_dwell}s)"
+                
+        # Switch budget - at most switch_budget automatic switches per window
+        budget = policy.get('switch_budget', 6)
+        window = policy.get('switch_budget_window_seconds', 600)
+        while self.recent_switch_times and now - self.recent_switch_times[0] > window:
+            self.recent_switch_times.popleft()
+        if budget > 0 and len(self.recent_switch_times) >= budget:
+            return 'budget', f"switch budget used ({len(self.recent_switch_times)}/{budget} in {window}s)"
+            
+        return None, None
+    
+    def commit_rotation(self, device_id):
+        """Advance the split-sessions rotation once the GPU it selected is actually active"""
+        global split_sessions_rotation_index
+        
+        if self.pending_rotation and self.pending_rotation[0] == device_id:
+            split_sessions_rotation_index = self.pending_rotation[1]
+        self.pending_rotation = None
+    
+    def switch_gpu_if_needed(self, snapshot, optimal_device_id, reason):
         """Switch GPU if the optimal choice differs from current active GPU"""
         global total_switches, last_optimal_gpu, last_switch_time
         
         try:
-            current_device_id = get_current_active_device()
+            current_device_id = snapshot.active_device_id
             
             if optimal_device_id == current_device_id:
                 # No switch needed
@@ -501,8 +757,25 @@ class IntelligentPlexGPUBalancer:
                     device_name = self.available_devices.get(optimal_device_id, optimal_device_id)
                     logger.info(f"✅ GPU already optimal: {device_name}")
                     last_optimal_gpu = optimal_device_id
+                self.last_suppression = None
+                self.commit_rotation(optimal_device_id)
                 return True
             
+            # Anti-flapping policy: dwell time and switch budget. A split-sessions rotation for a
+            # new session is exempt - that session is detected on this tick only and would be lost
+            rule, policy_reason = None, None
+            new_session_rotation = self.pending_rotation and self.pending_rotation[0] == optimal_device_id and self.pending_rotation[2]
+            if not new_session_rotation:
+                rule, policy_reason = self.check_switching_policy(snapshot, current_device_id)
+            if rule:
+                # Count and log each held-back switch once, not on every tick it stays held back
+                if self.last_suppression != (rule, optimal_device_id):
+                    suppressed_switches[rule] += 1
+                    self.last_suppression = (rule, optimal_device_id)
+                    device_name = self.available_devices.get(optimal_device_id, optimal_device_id)
+                    logger.info(f"🛑 Switch to {device_name} suppressed: {policy_reason}")
+                return False
+            
             # Check rate limiting before switching
             rate_limiting = self.balance_settings.get('rate_limiting', {})
             rate_limiting_enabled = rate_limiting.get('enabled', True)
@@ -512,6 +785,9 @@ class IntelligentPlexGPUBalancer:
                 time_since_last_switch = time.time() - last_switch_time
                 if time_since_last_switch < min_switch_interval:
                     time_remaining = min_switch_interval - time_since_last_switch
+                    if self.last_suppression != ('rate_limit', optimal_device_id):
+                        suppressed_switches['rate_limit'] += 1
+                        self.last_suppression = ('rate_limit', optimal_device_id)
                     device_name = self.available_devices.get(optimal_device_id, optimal_device_id)
                     logger.info(f"⏸️  Rate limited: switch to {device_name} delayed {time_remaining:.1f}s (min interval: {min_switch_interval}s)")
                     return False
@@ -523,6 +799,11 @@ class IntelligentPlexGPUBalancer:
             if result.get('status') == 'success':
                 total_switches += 1
                 last_switch_time = time.time()
+                self.recent_switch_times.append(last_switch_time)
+                self.observed_active_device = optimal_device_id
+                self.active_since = last_switch_time
+                self.last_suppression = None
+                self.commit_rotation(optimal_device_id)
                 trigger_type = "intelligent" if reason else "manual"
                 logger.info(f"🔄 Switched to {device_name} - {reason} (switch #{total_switches}, trigger: {trigger_type})")
                 last_optimal_gpu = optimal_device_id
@@ -535,78 +816,174 @@ class IntelligentPlexGPUBalancer:
             logger.error(f"❌ Error during GPU switch: {e}")
             return False
     
+    def update_notification_listener(self):
+        """Start or stop the Plex notifications listener to match the current settings"""
+        enabled = self.balance_settings.get('system', {}).get('plex_notifications_enabled', True)
+        
+        if enabled and self.notification_listener is None:
+            if not NOTIFICATIONS_AVAILABLE:
+                logger.info("ℹ️  websocket-client not installed - using polling only")
+                return
+            self.notification_listener = PlexNotificationListener(PLEX_SERVER, PLEX_TOKEN)
+            if self.notification_listener.start():
+                logger.info("⚡ Plex notifications listener started - session events trigger immediate evaluation")
+            else:
+                self.notification_listener = None
+        elif not enabled and self.notification_listener is not None:
+            self.notification_listener.stop()
+            self.notification_listener = None
+            logger.info("⏸️  Plex notifications listener stopped - using polling only")
+    
+    def get_tick_rate_settings(self):
+        """Get (min, normal, max) tick intervals with min <= normal <= max"""
+        tick_rate = self.balance_settings.get('tick_rate', {})
+        min_interval = max(0.1, tick_rate.get('min_interval_seconds', 0.5))
+        max_interval = max(min_interval, tick_rate.get('max_interval_seconds', 30))
+        normal_interval = min(max(tick_rate.get('normal_interval_seconds', CHECK_INTERVAL), min_interval), max_interval)
+        return min_interval, normal_interval, max_interval
+    
+    def is_near_limit(self, snapshot):
+        """Check if any GPU's load is within the margin of its load threshold"""
+        margin = self.balance_settings.get('tick_rate', {}).get('threshold_margin_percentage', 10)
+        threshold_percentage, _ = self.get_load_threshold(self.get_method_settings())
+        
+        # Session counts are left to the activity check: a steady count needs no fast ticks
+        for device_id in self.gpu_devices_mapping.values():
+            if device_id not in snapshot.priority_order:
+                continue
+            load = snapshot.device_loads.get(device_id)
+            if load is not None and load >= threshold_percentage - margin:
+                return True
+        return False
+    
+    def get_next_tick_interval(self, snapshot, switched):
+        """Choose the next evaluation interval from this tick's activity
+        
+        Fast while sessions are changing or a GPU is near its load threshold, normal while
+        sessions are active, and doubling towards the maximum while idle.
+        """
+        min_interval, normal_interval, max_interval = self.get_tick_rate_settings()
+        fast_hold = self.balance_settings.get('tick_rate', {}).get('fast_hold_seconds', 15)
+        
+        previous = self.last_snapshot
+        self.last_snapshot = snapshot
+        sessions_changed = previous is not None and (
+            snapshot.total_sessions != previous.total_sessions or snapshot.session_counts != previous.session_counts
+        )
+        if sessions_changed or switched:
+            self.last_activity_time = snapshot.timestamp
+            
+        if snapshot.timestamp - self.last_activity_time < fast_hold or self.is_near_limit(snapshot):
+            return min_interval
+        if snapshot.total_sessions > 0:
+            return normal_interval
+        if current_tick_interval < normal_interval:
+            return normal_interval
+        return min(current_tick_interval * 2, max_interval)
+    
+    def wait_for_next_tick(self, interval):
+        """Sleep until the next evaluation, waking early on Plex session events"""
+        if self.notification_listener is None:
+            time.sleep(interval)
+            return
+        
+        if self.notification_listener.wait(interval):
+            # Coalesce event bursts (start + playing arrive together) into one evaluation
+            since_last = time.time() - self.last_evaluation_time
+            if since_last < EVENT_MIN_INTERVAL:
+                time.sleep(EVENT_MIN_INTERVAL - since_last)
+            logger.debug(f"⚡ Woken by Plex event: {self.notification_listener.last_event_type}")
+    
+    def log_due(self, message_key, interval):
+        """Check whether a periodic log message is due (at most once per interval, whatever the tick rate)"""
+        now = time.monotonic()
+        last_logged = self.last_log_times.get(message_key)
+        if last_logged is not None and now - last_logged < interval:
+            return False
+        self.last_log_times[message_key] = now
+        return True
+    
     def run_balancer(self):
         """Main intelligent balancer loop"""
-        global service_start_time
+        global service_start_time, current_tick_interval
         
         logger.info(f"🚀 Starting Intelligent Plex GPU Load Balancer")
         logger.info(f"🔧 Method: {self.balance_settings.get('method', 'unknown')}")
-        logger.info(f"⏱️  Check interval: {CHECK_INTERVAL} seconds")
+        min_interval, normal_interval, max_interval = self.get_tick_rate_settings()
+        logger.info(f"⏱️  Check interval: {min_interval}-{max_interval} seconds (adaptive, {normal_interval}s with active sessions)")
         logger.info(f"🎯 Auto-balancing: {'enabled' if self.balance_settings.get('system', {}).get('auto_balancing_enabled', True) else 'disabled'}")
         
+        self.update_notification_listener()
+        
         while True:
             try:
                 # Smart config reloading - only reload when config file is actually modified
                 if self.should_reload_config():
                     logger.info("🔄 Config file modified, reloading settings...")
                     self.load_settings()
+                    self.update_notification_listener()
                 
                 # Check if auto-balancing is enabled
                 auto_balancing_enabled = self.balance_settings.get('system', {}).get('auto_balancing_enabled', True)
                 
                 if not auto_balancing_enabled:
-                    if int(time.time()) % 60 == 0:  # Log every minute when disabled
+                    if self.log_due('disabled', 60):  # Log every minute when disabled
                         logger.info("⏸️  Auto-balancing disabled - manual control active")
-                    time.sleep(CHECK_INTERVAL)
+                    time.sleep(self.get_tick_rate_settings()[1])
                     continue
                 
-                # Evaluate optimal GPU with detailed debugging
-                optimal_device_id, reason = self.evaluate_optimal_gpu()
+                # Collect this tick's cluster state once; every decision below reads from it
+                self.last_evaluation_time = time.time()
+                snapshot = self.build_cluster_snapshot()
+                self.update_switching_state(snapshot)
                 
-                # Optimized debug logging - more frequent during activity, less during stable periods
-                current_sessions = self.get_plex_sessions()
+                # Evaluate optimal GPU with detailed debugging
+                optimal_device_id, reason = self.evaluate_optimal_gpu(snapshot)
                 
                 # Debug logging frequency based on activity level
-                if current_sessions > 0:
+                if snapshot.total_sessions > 0:
                     # Active transcoding - log every 15 seconds
-                    log_debug = int(time.time()) % 15 == 0
+                    log_debug = self.log_due('devices', 15)
                 else:
                     # No active sessions - log every 60 seconds to reduce noise
-                    log_debug = int(time.time()) % 60 == 0
+                    log_debug = self.log_due('devices', 60)
                 
                 if log_debug:
-                    intel_device_id = self.gpu_devices_mapping.get('gpu2')
-                    nvidia_device_id = self.gpu_devices_mapping.get('gpu1')
-                    
-                    if intel_device_id:
-                        intel_sessions = self.get_gpu_session_count(intel_device_id)
-                        intel_overloaded, intel_reason = self.is_gpu_overloaded(intel_device_id, self.balance_settings.get('preferred_order', {}))
-                        logger.info(f"📊 Intel: {intel_sessions} sessions, overloaded: {intel_overloaded} ({intel_reason})")
-                    
-                    if nvidia_device_id:
-                        nvidia_sessions = self.get_gpu_session_count(nvidia_device_id)
-                        nvidia_overloaded, nvidia_reason = self.is_gpu_overloaded(nvidia_device_id, self.balance_settings.get('preferred_order', {}))
-                        logger.info(f"📊 NVIDIA: {nvidia_sessions} sessions, overloaded: {nvidia_overloaded} ({nvidia_reason})")
+                    for device_id in snapshot.priority_order:
+                        device_name = self.available_devices.get(device_id, device_id)
+                        device_sessions = self.get_gpu_session_count(snapshot, device_id)
+                        device_overloaded, device_reason = self.is_gpu_overloaded(snapshot, device_id)
+                        logger.info(f"📊 {device_name}: {device_sessions} sessions, overloaded: {device_overloaded} ({device_reason})")
                 
+                switched = False
                 if optimal_device_id:
-                    self.switch_gpu_if_needed(optimal_device_id, reason)
+                    switches_before = total_switches
+                    self.switch_gpu_if_needed(snapshot, optimal_device_id, reason)
+                    switched = total_switches != switches_before
                 else:
                     logger.warning(f"⚠️  No optimal GPU found: {reason}")
                 
                 # Status logging every 30 seconds
-                if int(time.time()) % 30 == 0:
-                    total_sessions = self.get_plex_sessions()
+                if self.log_due('status', 30):
                     uptime = str(datetime.now() - service_start_time).split('.')[0]  # Remove microseconds
-                    logger.info(f"📊 Status: {total_sessions} sessions | {total_switches} switches | uptime: {uptime}")
+                    suppressed = sum(suppressed_switches.values())
+                    logger.info(f"📊 Status: {snapshot.total_sessions} sessions | {total_switches} switches | {suppressed} suppressed | uptime: {uptime}")
                 
-                time.sleep(CHECK_INTERVAL)
+                # Adapt the tick rate to activity: fast near load thresholds, slow when idle
+                next_interval = self.get_next_tick_interval(snapshot, switched)
+                if next_interval != current_tick_interval:
+                    logger.debug(f"⏱️  Tick interval {current_tick_interval}s → {next_interval}s")
+                current_tick_interval = next_interval
+                self.wait_for_next_tick(current_tick_interval)
                 
             except KeyboardInterrupt:
                 logger.info("🛑 Stopping intelligent GPU balancer...")
+                if self.notification_listener:
+                    self.notification_listener.stop()
                 break
             except Exception as e:
                 logger.error(f"❌ Error in balancer loop: {e}")
-                time.sleep(CHECK_INTERVAL)
+                time.sleep(self.get_tick_rate_settings()[1])
 
 def get_stats():
     """Get current statistics for API endpoints"""
@@ -615,8 +992,9 @@ def get_stats():
         'total_switches': total_switches,
         'uptime': uptime,
         'last_check': datetime.now().strftime('%H:%M:%S'),
-        'check_interval': CHECK_INTERVAL,
+        'check_interval': current_tick_interval,
         'last_optimal_gpu': last_optimal_gpu,
+        'suppressed_switches': dict(suppressed_switches),
         'version': 'intelligent-v2.1-session-aware'
     }
 
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Plex Notifications Listener
+Wakes the balancer on Plex session events from the /:/websockets/notifications stream
+"""
+
+import base64
+import hashlib
+import json
+import socketserver
+import struct
+import sys
+import os
+import threading
+import time
+
+# Add src directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import websocket  # websocket-client
+    WEBSOCKET_AVAILABLE = True
+except ImportError:
+    WEBSOCKET_AVAILABLE = False
+
+# Configuration
+NOTIFICATIONS_PATH = '/:/websockets/notifications'
+RECONNECT_MIN_DELAY = 1  # seconds
+RECONNECT_MAX_DELAY = 30  # seconds
+PING_INTERVAL = 30  # seconds
+PING_TIMEOUT = 10  # seconds
+
+# Notification types that always mean a transcode started or stopped
+WAKE_NOTIFICATION_TYPES = {'transcodeSession.start', 'transcodeSession.end'}
+
+class PlexNotificationListener:
+    """Background websocket listener that signals when Plex sessions start, stop or change state"""
+
+    def __init__(self, server, token, url=None):
+        self.url = url or f"ws://{server}{NOTIFICATIONS_PATH}?X-Plex-Token={token}"
+        self.running = False
+        self.connected = False
+        self.thread = None
+        self.ws = None
+        self.wake_condition = threading.Condition()
+        self.last_event_type = None
+        self.last_event_time = None
+        self.events_received = 0
+        self.wakeups = 0
+        self.handled_wakeups = 0  # wakeups already returned by wait(); guarded by wake_condition
+        self._session_states = {}  # sessionKey -> last playback state
+        
+    def start(self):
+        """Start the listener thread"""
+        if not WEBSOCKET_AVAILABLE:
+            return False
+        if self.running:
+            return True
+            
+        self.running = True
+        self.thread = threading.Thread(target=self._listen_loop, daemon=True)
+        self.thread.start()
+        return True
+        
+    def stop(self):
+        """Stop the listener thread"""
+        self.running = False
+        try:
+            if self.ws:
+                self.ws.close()
+        except Exception:
+            pass
+            
+    def is_connected(self):
+        """Check if the websocket is currently connected"""
+        return self.connected
+        
+    def wait(self, timeout):
+        """Wait up to timeout seconds for a session event; returns True if woken by an event"""
+        # Counting wakeups (instead of set/clear on an Event) keeps events that arrive while
+        # the caller is busy evaluating - the next wait() returns immediately for them
+        with self.wake_condition:
+            woken = self.wake_condition.wait_for(lambda: self.wakeups > self.handled_wakeups, timeout)
+            self.handled_wakeups = self.wakeups
+            return woken
+        
+    def _listen_loop(self):
+        """Connect and reconnect with backoff until stopped"""
+        delay = RECONNECT_MIN_DELAY
+        
+        while self.running:
+            self.ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_close=self._on_close,
+                on_error=self._on_error
+            )
+            connected_at = time.time()
+            try:
+                self.ws.run_forever(ping_interval=PING_INTERVAL, ping_timeout=PING_TIMEOUT)
+            except Exception:
+                pass
+            self.connected = False
+            
+            if not self.running:
+                break
+                
+            # Reset backoff after a connection that stayed up for a while
+            if time.time() - connected_at > RECONNECT_MAX_DELAY:
+                delay = RECONNECT_MIN_DELAY
+            time.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+            
+    def _on_open(self, ws):
+        self.connected = True
+        # Sessions may have changed while disconnected
+        self._session_states.clear()
+        self._wake()
+        
+    def _on_close(self, ws, *args):
+        self.connected = False
+        
+    def _on_error(self, ws, error):
+        self.connected = False
+        
+    def _on_message(self, ws, message):
+        if self.handle_message(message):
+            self._wake()
+            
+    def handle_message(self, message):
+        """Process one notification message; returns True if it should wake the balancer"""
+        try:
+            data = json.loads(message)
+        except (ValueError, TypeError):
+            return False
+            
+        container = data.get('NotificationContainer', {})
+        notification_type = container.get('type')
+        self.events_received += 1
+        self.last_event_type = notification_type
+        self.last_event_time = time.time()
+        
+        if notification_type in WAKE_NOTIFICATION_TYPES:
+            return True
+            
+        if notification_type == 'playing':
+            # Progress updates repeat every few seconds - only wake on state changes
+            state_changed = False
+            for notification in container.get('PlaySessionStateNotification', []):
+                session_key = notification.get('sessionKey')
+                state = notification.get('state')
+                if self._session_states.get(session_key) != state:
+                    state_changed = True
+                if state == 'stopped':
+                    self._session_states.pop(session_key, None)
+                else:
+                    self._session_states[session_key] = state
+            return state_changed
+            
+        return False
+        
+    def _wake(self):
+        with self.wake_condition:
+            self.wakeups += 1
+            self.wake_condition.notify_all()
+        
+    def get_stats(self):
+        """Get listener statistics"""
+        return {
+            'connected': self.connected,
+            'events_received': self.events_received,
+            'wakeups': self.wakeups,
+            'last_event_type': self.last_event_type,
+            'last_event_time': self.last_event_time
+        }
+
+# Local stand-in for the Plex notifications websocket (offline testing)
+
+WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+class _StandInHandler(socketserver.BaseRequestHandler):
+    """Minimal RFC 6455 server side: handshake, text frames out, ping/close handling in"""
+
+    def handle(self):
+        if not self._handshake():
+            return
+            
+        self.server.add_client(self.request)
+        try:
+            while True:
+                frame = self._read_frame()
+                if frame is None:
+                    break
+                opcode, payload = frame
+                if opcode == 0x8:  # Close
+                    _send_frame(self.request, 0x8, payload[:2])
+                    break
+                elif opcode == 0x9:  # Ping
+                    _send_frame(self.request, 0xA, payload)
+        except OSError:
+            pass
+        finally:
+            self.server.remove_client(self.request)
+            
+    def _handshake(self):
+        data = b''
+        while b'\r\n\r\n' not in data:
+            chunk = self.request.recv(4096)
+            if not chunk:
+                return False
+            data += chunk
+            
+        headers = {}
+        for line in data.decode('latin-1').split('\r\n')[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+                
+        key = headers.get('sec-websocket-key')
+        if not key:
+            return False
+            
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        self.request.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+        return True
+        
+    def _recv_exact(self, size):
+        data = b''
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+        
+    def _read_frame(self):
+        header = self._recv_exact(2)
+        if header is None:
+            return None
+        opcode = header[0] & 0x0F
+        masked = header[1] & 0x80
+        length = header[1] & 0x7F
+        if length == 126:
+            length = struct.unpack('!H', self._recv_exact(2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', self._recv_exact(8))[0]
+        mask = self._recv_exact(4) if masked else b'\x00\x00\x00\x00'
+        payload = self._recv_exact(length) if length else b''
+        if mask is None or payload is None:
+            return None
+        return opcode, bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+def _send_frame(sock, opcode, payload):
+    """Send a single unmasked (server-to-client) websocket frame"""
+    header = bytes([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header += bytes([length])
+    elif length < 65536:
+        header += bytes([126]) + struct.pack('!H', length)
+    else:
+        header += bytes([127]) + struct.pack('!Q', length)
+    sock.sendall(header + payload)
+
+class StandInNotificationServer(socketserver.ThreadingTCPServer):
+    """Local websocket server that mimics Plex's notification stream for offline testing"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+    
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), _StandInHandler)
+        self.clients = set()
+        self.clients_lock = threading.Lock()
+        self.thread = None
+        
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"ws://{host}:{port}{NOTIFICATIONS_PATH}"
+        
+    def start(self):
+        """Serve in a background thread"""
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+        
+    def stop(self):
+        """Stop serving and close client connections"""
+        self.shutdown()
+        with self.clients_lock:
+            for client in list(self.clients):
+                try:
+                    client.close()
+                except OSError:
+                    pass
+            self.clients.clear()
+        self.server_close()
+        
+    def add_client(self, sock):
+        with self.clients_lock:
+            self.clients.add(sock)
+            
+    def remove_client(self, sock):
+        with self.clients_lock:
+            self.clients.discard(sock)
+            
+    def client_count(self):
+        with self.clients_lock:
+            return len(self.clients)
+            
+    def broadcast(self, notification):
+        """Send a notification dict (or raw string) to every connected client"""
+        message = notification if isinstance(notification, str) else json.dumps(notification)
+        with self.clients_lock:
+            clients = list(self.clients)
+        for client in clients:
+            try:
+                _send_frame(client, 0x1, message.encode('utf-8'))
+            except OSError:
+                self.remove_client(client)
+                
+    def send_transcode_start(self, session_key='1'):
+        self.broadcast({'NotificationContainer': {
+            'type': 'transcodeSession.start', 'size': 1,
+            'TranscodeSession': [{'key': f'/transcode/sessions/standin-{session_key}'}]
+        }})
+        
+    def send_transcode_end(self, session_key='1'):
+        self.broadcast({'NotificationContainer': {
+            'type': 'transcodeSession.end', 'size': 1,
+            'TranscodeSession': [{'key': f'/transcode/sessions/standin-{session_key}'}]
+        }})
+        
+    def send_playing(self, session_key='1', state='playing'):
+        self.broadcast({'NotificationContainer': {
+            'type': 'playing', 'size': 1,
+            'PlaySessionStateNotification': [{'sessionKey': session_key, 'state': state, 'viewOffset': 0}]
+        }})
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Plex notifications listener / offline stand-in server')
+    parser.add_argument('--standin', action='store_true',
+                       help='Run a local stand-in notification server emitting a scripted session cycle')
+    parser.add_argument('--port', '-p', type=int, default=32401, help='Stand-in server port')
+    parser.add_argument('--listen', '-l', nargs='?', const='', metavar='URL',
+                       help='Listen and print wakeups (default: Plex server from config.conf)')
+    args = parser.parse_args()
+    
+    if args.standin:
+        server = StandInNotificationServer(port=args.port).start()
+        print(f"🧪 Stand-in notification server on {server.url}", file=sys.stderr)
+        try:
+            session = 0
+            while True:
+                session += 1
+                key = str(session)
+                for send in (lambda: server.send_transcode_start(key),
+                             lambda: server.send_playing(key, 'playing'),
+                             lambda: server.send_playing(key, 'playing'),
+                             lambda: server.send_playing(key, 'paused'),
+                             lambda: server.send_playing(key, 'stopped'),
+                             lambda: server.send_transcode_end(key)):
+                    send()
+                    time.sleep(2)
+        except KeyboardInterrupt:
+            server.stop()
+        return
+        
+    if args.listen is not None:
+        if not WEBSOCKET_AVAILABLE:
+            print("websocket-client is not installed", file=sys.stderr)
+            sys.exit(1)
+        if args.listen:
+            listener = PlexNotificationListener(None, None, url=args.listen)
+        else:
+            from import_helper import import_config
+            config = import_config()()
+            listener = PlexNotificationListener(config['PLEX_SERVER'], config['PLEX_TOKEN'])
+        listener.start()
+        try:
+            while True:
+                if listener.wait(5):
+                    print(f"⚡ Wake: {listener.last_event_type} {listener.get_stats()}")
+        except KeyboardInterrupt:
+            listener.stop()
+        return
+        
+    parser.print_help()
+
+if __name__ == "__main__":
+    main()
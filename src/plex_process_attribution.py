@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Plex Transcoder Process Attribution
+Maps running Plex Transcoder processes to their transcode sessions and GPU devices via procfs
+"""
+
+import os
+import re
+import threading
+import time
+
+TRANSCODER_EXECUTABLE = 'Plex Transcoder'
+SCAN_MAX_AGE = 1  # seconds a /proc scan is reused (the collector's sampling interval)
+
+_last_scan = None  # (monotonic time, roots, wanted session ids, processes)
+_scan_lock = threading.Lock()
+
+# Transcode session id from the transcoder's progress/manifest URLs
+_SESSION_PATTERN = re.compile(r'/transcode/sessions?/([^/\s?]+)')
+_PID_DIR = re.compile(r'^\d+$')
+_NVIDIA_DEVICE = re.compile(r'^/dev/nvidia(\d+)$')
+
+def _read_text(path):
+    try:
+        with open(path, 'r') as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+def pci_address_from_device_id(device_id):
+    """Get the PCI address from a Plex device id ('10de:...@0000:01:00.0' or 'pci-0000:01:00.0')"""
+    if '@' in device_id:
+        return device_id.split('@', 1)[1].lower()
+    if device_id.startswith('pci-'):
+        return device_id[4:].lower()
+    return None
+
+class DeviceNodeResolver:
+    """Resolves /dev/dri and /dev/nvidia device nodes to PCI addresses (cached per scan)"""
+
+    def __init__(self, procfs_root='/proc', sysfs_root='/sys'):
+        self.procfs_root = procfs_root
+        self.sysfs_root = sysfs_root
+        self.cache = {}
+        self._nvidia_minors = None
+        
+    def _nvidia_minor_map(self):
+        """Map NVIDIA device minor numbers to PCI addresses from /proc/driver/nvidia/gpus"""
+        if self._nvidia_minors is None:
+            self._nvidia_minors = {}
+            gpus_root = os.path.join(self.procfs_root, 'driver', 'nvidia', 'gpus')
+            try:
+                pci_addresses = os.listdir(gpus_root)
+            except OSError:
+                pci_addresses = []
+            for pci_address in pci_addresses:
+                information = _read_text(os.path.join(gpus_root, pci_address, 'information')) or ''
+                match = re.search(r'Device Minor:\s*(\d+)', information)
+                if match:
+                    self._nvidia_minors[int(match.group(1))] = pci_address.lower()
+        return self._nvidia_minors
+        
+    def resolve(self, device_node):
+        """Get the PCI address for a device node path, or None"""
+        if device_node in self.cache:
+            return self.cache[device_node]
+            
+        pci_address = None
+        if device_node.startswith('/dev/dri/'):
+            uevent = _read_text(os.path.join(self.sysfs_root, 'class', 'drm',
+                                             os.path.basename(device_node), 'device', 'uevent')) or ''
+            match = re.search(r'PCI_SLOT_NAME=(\S+)', uevent)
+            pci_address = match.group(1).lower() if match else None
+        else:
+            match = _NVIDIA_DEVICE.match(device_node)
+            if match:
+                pci_address = self._nvidia_minor_map().get(int(match.group(1)))
+                
+        self.cache[device_node] = pci_address
+        return pci_address
+
+def find_transcoder_processes(procfs_root='/proc', sysfs_root='/sys'):
+    """Find Plex Transcoder processes with their session id and the GPUs they have open
+    
+    Returns a list of dicts: pid, session_id, devices (PCI addresses) and device
+    (the GPU the transcode is attributed to, or None for software transcodes).
+    """
+    try:
+        pids = [name for name in os.listdir(procfs_root) if _PID_DIR.match(name)]
+    except OSError:
+        return []
+        
+    resolver = DeviceNodeResolver(procfs_root, sysfs_root)
+    processes = []
+    
+    for pid in pids:
+        cmdline = _read_text(os.path.join(procfs_root, pid, 'cmdline'))
+        if not cmdline:
+            continue
+        arguments = cmdline.split('\0')
+        if not arguments[0].endswith(TRANSCODER_EXECUTABLE):
+            continue
+            
+        session_id = None
+        for argument in arguments[1:]:
+            match = _SESSION_PATTERN.search(argument)
+            if match:
+                session_id = match.group(1)
+                break
+                
+        # GPUs this transcoder has open: NVIDIA nodes first (NVENC/NVDEC), then DRM nodes (VAAPI/QSV)
+        nvidia_devices = []
+        drm_devices = []
+        fd_dir = os.path.join(procfs_root, pid, 'fd')
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            fds = []
+        for fd in fds:
+            try:
+                target = os.readlink(os.path.join(fd_dir, fd))
+            except OSError:
+                continue
+            if not target.startswith('/dev/'):
+                continue
+            pci_address = resolver.resolve(target)
+            if pci_address is None:
+                continue
+            devices = nvidia_devices if target.startswith('/dev/nvidia') else drm_devices
+            if pci_address not in devices:
+                devices.append(pci_address)
+                
+        devices = nvidia_devices + [device for device in sorted(drm_devices) if device not in nvidia_devices]
+        processes.append({
+            'pid': int(pid),
+            'session_id': session_id,
+            'devices': devices,
+            'device': devices[0] if devices else None
+        })
+        
+    return processes
+
+def _get_roots(procfs_root, sysfs_root):
+    """Fill in procfs/sysfs roots that were not given from [gpu_monitoring] in config.conf"""
+    if procfs_root is None or sysfs_root is None:
+        try:
+            from config import get_gpu_monitoring_settings
+            monitoring_settings = get_gpu_monitoring_settings()
+        except Exception:
+            monitoring_settings = {}
+        procfs_root = procfs_root or monitoring_settings.get('procfs_root') or '/proc'
+        sysfs_root = sysfs_root or monitoring_settings.get('sysfs_root') or '/sys'
+    return procfs_root, sysfs_root
+
+def _scan_transcoder_processes(roots, wanted_sessions, max_age):
+    """Get transcoder processes, reusing the last scan for max_age seconds unless the wanted sessions changed"""
+    global _last_scan
+    
+    with _scan_lock:
+        now = time.monotonic()
+        if _last_scan is not None:
+            scanned_at, scanned_roots, scanned_sessions, processes = _last_scan
+            if (scanned_roots == roots and scanned_sessions == wanted_sessions
+                    and now - scanned_at < max_age):
+                return processes
+                
+        processes = find_transcoder_processes(*roots)
+        _last_scan = (now, roots, wanted_sessions, processes)
+        return processes
+
+def get_sessions_per_device(device_ids, transcode_session_ids=None, procfs_root=None, sysfs_root=None,
+                            max_age=SCAN_MAX_AGE):
+    """Count transcodes per Plex device id from running transcoder processes
+    
+    When transcode_session_ids (from /status/sessions) is given, only processes
+    belonging to those sessions are counted, and each session is counted once.
+    /proc is rescanned at most every max_age seconds, or sooner when the set of
+    transcode sessions changes. Roots default to [gpu_monitoring] in config.conf.
+    Returns None when no transcoder process could be attributed to one of the
+    devices, so callers can fall back to estimates (e.g. Plex running on another
+    host, or file descriptors unreadable without root or across a container).
+    """
+    wanted_sessions = frozenset(transcode_session_ids) if transcode_session_ids is not None else None
+    processes = _scan_transcoder_processes(_get_roots(procfs_root, sysfs_root), wanted_sessions, max_age)
+    if not processes:
+        return None
+        
+    device_by_pci = {}
+    for device_id in device_ids:
+        pci_address = pci_address_from_device_id(device_id)
+        if pci_address:
+            device_by_pci[pci_address] = device_id
+            
+    counts = {device_id: 0 for device_id in device_ids}
+    counted_sessions = set()
+    attributed = False
+    
+    for process in processes:
+        device_id = device_by_pci.get(process['device'])
+        if device_id is None:
+            continue
+        attributed = True
+        session_id = process['session_id']
+        if wanted_sessions is not None and session_id not in wanted_sessions:
+            continue
+        if session_id is not None:
+            if session_id in counted_sessions:
+                continue
+            counted_sessions.add(session_id)
+        counts[device_id] += 1
+        
+    # Processes were visible but none mapped to a device - zero counts would be a guess
+    if not attributed:
+        return None
+    return counts
+
+def main():
+    import argparse
+    import json
+    
+    parser = argparse.ArgumentParser(description='Show Plex Transcoder processes and the GPUs they use')
+    parser.add_argument('--procfs-root', default='/proc', help='procfs root (for fixture trees)')
+    parser.add_argument('--sysfs-root', default='/sys', help='sysfs root (for fixture trees)')
+    args = parser.parse_args()
+    
+    print(json.dumps(find_transcoder_processes(args.procfs_root, args.sysfs_root), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Plex View Cache
+Serves Plex-backed dashboard views from memory, refreshed by one background poller with stale-while-revalidate
+"""
+
+import threading
+import time
+
+POLL_TICK = 0.25  # seconds between poller checks for due views
+IDLE_AFTER = 60  # seconds without a read before a view stops being refreshed
+FIRST_LOAD_WAIT = 5  # seconds a request waits for a view that has never been loaded
+
+class CachedView:
+    """One cached view: its fetch function, refresh schedule, latest value and refresh state"""
+
+    def __init__(self, name, fetch, refresh_interval, default=None):
+        self.name = name
+        self.fetch = fetch
+        self.refresh_interval = refresh_interval
+        self.default = default
+        self.value = None
+        self.has_value = False
+        self.fetched_at = 0.0
+        self.last_read = 0.0
+        self.refreshing = None  # threading.Event while a refresh is in flight
+        self.generation = 0  # bumped by invalidate() so in-flight fetches that predate a write are dropped
+        self.version = 0  # bumped whenever a refresh publishes a different value
+        self.refreshes = 0
+        self.errors = 0
+        self.last_duration = None
+
+class PlexViewCache:
+    """Keeps Plex request volume independent of how many dashboards are open
+    
+    Reads never wait on Plex once a view has a value: a stale value is returned
+    immediately while a single background refresh runs. The poller refreshes
+    every view that has been read recently on its own interval.
+    """
+
+    def __init__(self):
+        self.views = {}
+        self.lock = threading.Lock()
+        self.poller = None
+        self.running = False
+        
+    def register(self, name, fetch, refresh_interval, default=None):
+        """Register a view; default is served if the first load does not finish in time"""
+        self.views[name] = CachedView(name, fetch, refresh_interval, default)
+        
+    def start(self):
+        """Start the background poller"""
+        if self.running:
+            return True
+            
+        self.running = True
+        self.poller = threading.Thread(target=self._poll_loop, daemon=True)
+        self.poller.start()
+        return True
+        
+    def stop(self):
+        self.running = False
+        
+    def _refresh(self, view, done, generation):
+        """Fetch a view and publish it; on error the previous value keeps being served"""
+        started = time.monotonic()
+        try:
+            value = view.fetch()
+            with self.lock:
+                if view.generation == generation:
+                    if not view.has_value or value != view.value:
+                        view.version += 1
+                    view.value = value
+                    view.has_value = True
+                    view.fetched_at = time.monotonic()
+                    view.refreshes += 1
+        except Exception:
+            with self.lock:
+                view.errors += 1
+                if view.generation == generation:
+                    # Retry on the normal schedule instead of hammering a failing server
+                    view.fetched_at = time.monotonic()
+        finally:
+            with self.lock:
+                view.last_duration = time.monotonic() - started
+                if view.refreshing is done:
+                    view.refreshing = None
+            done.set()
+            
+    def _start_refresh(self, view):
+        """Start a background refresh unless one is already in flight (caller holds the lock)"""
+        if view.refreshing is None:
+            view.refreshing = threading.Event()
+            threading.Thread(target=self._refresh, args=(view, view.refreshing, view.generation),
+                             daemon=True).start()
+        return view.refreshing
+        
+    def _poll_loop(self):
+        while self.running:
+            now = time.monotonic()
+            with self.lock:
+                for view in self.views.values():
+                    due = now - view.fetched_at >= view.refresh_interval
+                    active = now - view.last_read < IDLE_AFTER
+                    if due and active:
+                        self._start_refresh(view)
+            time.sleep(POLL_TICK)
+            
+    def get(self, name):
+        """Get a view's latest value, loading it (bounded wait) only if it has never been loaded"""
+        return self.get_versioned(name)[0]
+        
+    def get_versioned(self, name):
+        """Get (value, version) for a view; the version changes only when the value does (0 = default)"""
+        view = self.views[name]
+        with self.lock:
+            now = time.monotonic()
+            view.last_read = now
+            if view.has_value:
+                if now - view.fetched_at >= view.refresh_interval:
+                    self._start_refresh(view)  # Stale - serve it and revalidate in the background
+                return view.value, view.version
+            pending = self._start_refresh(view)
+            
+        if self.poller is None:
+            self.start()
+        pending.wait(FIRST_LOAD_WAIT)
+        with self.lock:
+            if view.has_value:
+                return view.value, view.version
+            return view.default, 0
+            
+    def invalidate(self, name):
+        """Drop a view after a write (e.g. a device switch) so the next read waits for fresh data"""
+        view = self.views[name]
+        with self.lock:
+            view.generation += 1
+            view.has_value = False
+            view.fetched_at = 0.0
+            view.refreshing = None  # Detach any in-flight fetch that may predate the write
+            
+    def get_stats(self):
+        """Get per-view age, refresh counts and last refresh duration"""
+        now = time.monotonic()
+        with self.lock:
+            return {
+                name: {
+                    'age_seconds': round(now - view.fetched_at, 2) if view.has_value else None,
+                    'refresh_interval': view.refresh_interval,
+                    'refreshing': view.refreshing is not None,
+                    'refreshes': view.refreshes,
+                    'version': view.version,
+                    'errors': view.errors,
+                    'last_duration_seconds': round(view.last_duration, 3) if view.last_duration is not None else None
+                }
+                for name, view in self.views.items()
+            }
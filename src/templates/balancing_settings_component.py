@@ -564,6 +564,8 @@ def get_balancing_settings_javascript():
         function getMethodDescription(method) {
             if (method === 'preferred-order') {
                 return 'Transcoding sessions start and "fill up" the GPUs in the specified order one after another. A GPU is considered "full" if any limits are reached.';
+            } else if (method === 'weighted-capacity') {
+                return 'New transcoding sessions start on the GPU with the most free encoder, decoder and render capacity, scaled by the capacity weight of each GPU. A GPU is skipped if any limits are reached.';
             } else {
                 return 'Every new transcoding process starts on a different GPU. It will stop using a specific GPU if any limits are reached.';
             }
@@ -608,6 +610,7 @@ def get_balancing_settings_javascript():
             // Get current threshold values
             const prefOrder = currentSettings.preferred_order || {};
             const splitSessions = currentSettings.split_sessions || {};
+            const weightedCapacity = currentSettings.weighted_capacity || {};
             
             // Get auto-balancing enabled state
             const systemSettings = currentSettings.system || {};
@@ -649,6 +652,7 @@ def get_balancing_settings_javascript():
                             <select id="method-select" onchange="toggleMethodSettings()">
                                 <option value="preferred-order" ${currentMethod === 'preferred-order' ? 'selected' : ''}>Preferred GPU order</option>
                                 <option value="split-sessions" ${currentMethod === 'split-sessions' ? 'selected' : ''}>Split sessions</option>
+                                <option value="weighted-capacity" ${currentMethod === 'weighted-capacity' ? 'selected' : ''}>Weighted capacity</option>
                             </select>
                         </div>
                         
@@ -699,6 +703,30 @@ def get_balancing_settings_javascript():
                             </div>
                         </div>
                         
+                        <div id="weighted-capacity-settings" class="method-settings ${currentMethod !== 'weighted-capacity' ? 'hidden' : ''}">
+                            <h3>Max Session Numbers</h3>
+                            <div class="device-session-list">
+                                ${generateDeviceSessionInputs('weighted')}
+                            </div>
+                            
+                            <h3>Capacity Weights</h3>
+                            <div class="device-session-list">
+                                ${generateDeviceCapacityInputs()}
+                            </div>
+                            
+                            <h3>Load Average Limits</h3>
+                            <div class="threshold-inputs">
+                                <div class="threshold-input-group">
+                                    <label>Percentage</label>
+                                    <input id="weighted-limit-percentage" type="number" min="20" max="95" value="${weightedCapacity.load_limit_percentage || 85}">
+                                </div>
+                                <div class="threshold-input-group">
+                                    <label>Sampling timeframe (s)</label>
+                                    <input id="weighted-limit-seconds" type="number" min="0" max="600" value="${weightedCapacity.load_limit_seconds || 30}">
+                                </div>
+                            </div>
+                        </div>
+                        
                         <button class="save-restart-btn" onclick="saveAndRestart()">
                             SAVE & RESTART
                         </button>
@@ -733,6 +761,32 @@ def get_balancing_settings_javascript():
             return html;
         }
         
+        function generateDeviceCapacityInputs() {
+            let html = '';
+            const capacityWeights = currentSettings.capacity_weights || {};
+            
+            // Create reverse mapping from device_id to gpu key
+            const deviceToGpuKey = {};
+            Object.keys(gpuDevicesMapping).forEach(gpuKey => {
+                const deviceId = gpuDevicesMapping[gpuKey];
+                deviceToGpuKey[deviceId] = gpuKey;
+            });
+            
+            gpuDevices.forEach((device, index) => {
+                const deviceName = device.name || device.id || `Device ${index + 1}`;
+                const gpuKey = deviceToGpuKey[device.id] || `gpu${index + 1}`;
+                const capacityValue = capacityWeights[`${gpuKey}_capacity`] || 1;
+                
+                html += `
+                    <div class="device-session-item">
+                        <div class="device-name">${deviceName}</div>
+                        <input id="capacity-weighted-${index}" type="number" min="0.1" max="10" step="0.1" value="${capacityValue}">
+                    </div>
+                `;
+            });
+            return html;
+        }
+        
         function generateDeviceSessionInputs(mode) {
             let html = '';
             const maxSessions = currentSettings.max_sessions || {};
@@ -901,17 +955,15 @@ def get_balancing_settings_javascript():
         
         function toggleMethodSettings() {
             const methodSelect = document.getElementById('method-select');
-            const preferredSettings = document.getElementById('preferred-order-settings');
-            const splitSettings = document.getElementById('split-sessions-settings');
             const methodDescription = document.getElementById('method-description');
             
-            if (methodSelect.value === 'preferred-order') {
-                preferredSettings.classList.remove('hidden');
-                splitSettings.classList.add('hidden');
-            } else {
-                preferredSettings.classList.add('hidden');
-                splitSettings.classList.remove('hidden');
-            }
+            // Show only the settings panel of the selected method
+            ['preferred-order', 'split-sessions', 'weighted-capacity'].forEach(method => {
+                const methodSettings = document.getElementById(`${method}-settings`);
+                if (methodSettings) {
+                    methodSettings.classList.toggle('hidden', methodSelect.value !== method);
+                }
+            });
             
             // Update method description
             if (methodDescription) {
@@ -1010,6 +1062,12 @@ def get_balancing_settings_javascript():
                     load_threshold_seconds: parseInt(document.getElementById('preferred-threshold-seconds').value),
                     priorities: priorities
                 };
+            } else if (method === 'weighted-capacity') {
+                settingsData.weighted_capacity = {
+                    load_limit_percentage: parseInt(document.getElementById('weighted-limit-percentage').value),
+                    load_limit_seconds: parseInt(document.getElementById('weighted-limit-seconds').value),
+                    priorities: priorities
+                };
             } else {
                 // Split sessions settings
                 settingsData.split_sessions = {
@@ -1033,6 +1091,8 @@ def get_balancing_settings_javascript():
                 
                 const inputId = method === 'preferred-order' ? 
                     `sessions-preferred-${index}` : 
+                    method === 'weighted-capacity' ? 
+                    `sessions-weighted-${index}` : 
                     `sessions-split-${index}`;
                     
                 const input = document.getElementById(inputId);
@@ -1041,6 +1101,18 @@ def get_balancing_settings_javascript():
                 }
             });
             
+            // Collect capacity weights (only shown for the weighted-capacity method)
+            if (method === 'weighted-capacity') {
+                settingsData.capacity_weights = {};
+                gpuDevices.forEach((device, index) => {
+                    const gpuKey = deviceToGpuKey[device.id] || `gpu${index + 1}`;
+                    const input = document.getElementById(`capacity-weighted-${index}`);
+                    if (input) {
+                        settingsData.capacity_weights[`${gpuKey}_capacity`] = parseFloat(input.value) || 1;
+                    }
+                });
+            }
+            
             // Collect rate limiting settings
             const toggleSwitches = document.querySelectorAll('.toggle-switch');
             const rateLimitingToggle = toggleSwitches[1]; // Second toggle is rate limiting
@@ -564,32 +564,217 @@ def get_base_javascript():
             showToast(title, message, 'success', details, 6000);
         }
         
-        function trackActiveDeviceChanges() {
-            // Get current active device
-            fetch('/api/gpu-devices')
-                .then(response => response.json())
-                .then(data => {
-                    if (data.status === 'success' && data.active_device) {
-                        const currentActiveDevice = data.active_device;
-                        
-                        // Check if active device changed
-                        if (lastActiveDevice && lastActiveDevice !== currentActiveDevice) {
-                            // Find device name
-                            const device = data.devices.find(d => d.id === currentActiveDevice);
-                            const deviceName = device ? device.name : currentActiveDevice;
-                            
-                            // Show toast notification
-                            showGPUSwitchToast(deviceName, currentActiveDevice, 'Auto-Balancer', 'Load balancing triggered');
+        function noteActiveDevice(currentActiveDevice, deviceName, triggerType) {
+            // Toast when the active device changed since the last check
+            if (lastActiveDevice && lastActiveDevice !== currentActiveDevice) {
+                const reason = triggerType === 'Manual' ? 'User initiated switch' : 'Load balancing triggered';
+                showGPUSwitchToast(deviceName, currentActiveDevice, triggerType, reason);
+            }
+            
+            lastActiveDevice = currentActiveDevice;
+        }
+        
+        // Live updates arrive over one Server-Sent Events stream; adaptive polling is the fallback.
+        // Both stop while the tab is hidden, so forgotten background tabs generate no load.
+        const POLL_BASE_INTERVAL = 1000;  // ms between polls while values are changing
+        const POLL_IDLE_INTERVAL = 5000;  // ms ceiling once nothing has changed for a while
+        const POLL_IDLE_AFTER = 10;  // unchanged polls before polling slows down
+        const POLL_MAX_BACKOFF = 30000;  // ms ceiling for the error backoff
+        const STREAM_RETRY_BASE = 2000;  // ms before the first stream reconnect
+        const STREAM_RETRY_MAX = 60000;  // ms ceiling for the stream reconnect backoff
+        
+        let eventStream = null;
+        let streamRetryDelay = STREAM_RETRY_BASE;
+        let streamRetryTimer = null;
+        let polling = false;
+        let pollTimer = null;
+        let unchangedPolls = 0;
+        let pollErrors = 0;
+        
+        // Last-seen section versions; /api/dashboard-state only returns sections that changed
+        let dashboardStateVersions = {};
+        let dashboardStateSignatures = {};
+        let lastPlexState = {status: null, sessions: null};
+        
+        function stateSignature(payload) {
+            // Snapshot versions and timestamps move on every sample even when nothing visible does
+            return JSON.stringify(payload, (key, value) => key === 'timestamp' || key === 'version' ? undefined : value);
+        }
+        
+        function refreshDashboardState() {
+            // Resolves to whether any displayed value changed; rejects on network errors and timeouts
+            const params = new URLSearchParams(dashboardStateVersions);
+            
+            return fetchWithTimeout('/api/dashboard-state?' + params.toString())
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(`HTTP ${response.status}`);
+                    }
+                    return response.json();
+                })
+                .then(state => {
+                    // Connection restored if it was lost
+                    if (connectionLost) {
+                        hideConnectionLostModal();
+                    }
+                    
+                    const sections = state.sections;
+                    let changed = false;
+                    Object.entries(sections).forEach(([section, payload]) => {
+                        const signature = stateSignature(payload);
+                        if (dashboardStateSignatures[section] !== signature) {
+                            dashboardStateSignatures[section] = signature;
+                            changed = true;
                         }
-                        
-                        lastActiveDevice = currentActiveDevice;
+                    });
+                    
+                    if (sections.metrics) {
+                        updateGPUDevicesWithMetrics(sections.metrics);
+                    }
+                    if (sections.devices && sections.devices.active_device) {
+                        const activeDevice = sections.devices.active_device;
+                        const device = sections.devices.devices.find(d => d.id === activeDevice);
+                        updateActiveDeviceStatus(activeDevice);
+                        noteActiveDevice(activeDevice, device ? device.name : activeDevice, 'Auto-Balancer');
                     }
+                    if (sections.history) {
+                        updateHistoricalDataContainers(sections.history);
+                    }
+                    if (sections.status || sections.sessions) {
+                        // Unchanged Plex sections are not resent, so render from the last copy of each
+                        lastPlexState.status = sections.status || lastPlexState.status;
+                        lastPlexState.sessions = sections.sessions || lastPlexState.sessions;
+                        if (lastPlexState.status && lastPlexState.sessions) {
+                            updatePlexSessions(lastPlexState.status, lastPlexState.sessions);
+                        }
+                    }
+                    
+                    dashboardStateVersions = state.versions;
+                    updateLastRefresh();
+                    return changed;
                 })
                 .catch(error => {
-                    // Silently handle errors for background tracking
-                    console.debug('Error tracking active device changes:', error);
+                    if (error.name === 'AbortError' || error.message.includes('Failed to fetch')) {
+                        handleAPIError(error, 'refreshDashboardState');
+                    } else {
+                        console.error('Error refreshing dashboard state:', error);
+                    }
+                    throw error;
                 });
         }
+        
+        function nextPollDelay(changed, failed) {
+            if (failed) {
+                // Exponential backoff while the server is unreachable or slow
+                pollErrors += 1;
+                return Math.min(POLL_BASE_INTERVAL * Math.pow(2, pollErrors), POLL_MAX_BACKOFF);
+            }
+            pollErrors = 0;
+            
+            unchangedPolls = changed ? 0 : unchangedPolls + 1;
+            if (unchangedPolls < POLL_IDLE_AFTER) {
+                return POLL_BASE_INTERVAL;
+            }
+            // Stretch towards the idle interval while nothing on screen changes
+            return Math.min(POLL_BASE_INTERVAL * Math.pow(1.5, unchangedPolls - POLL_IDLE_AFTER + 1), POLL_IDLE_INTERVAL);
+        }
+        
+        function schedulePoll(delay) {
+            clearTimeout(pollTimer);
+            pollTimer = null;
+            if (polling && !document.hidden) {
+                pollTimer = setTimeout(pollDashboardState, delay);
+            }
+        }
+        
+        function pollDashboardState() {
+            pollTimer = null;
+            refreshDashboardState()
+                .then(changed => schedulePoll(nextPollDelay(changed, false)))
+                .catch(() => schedulePoll(nextPollDelay(false, true)));
+        }
+        
+        function startPolling() {
+            if (polling) return;
+            
+            // One aggregated request per tick instead of one per panel
+            polling = true;
+            dashboardStateVersions = {};
+            unchangedPolls = 0;
+            pollErrors = 0;
+            schedulePoll(0);
+        }
+        
+        function stopPolling() {
+            polling = false;
+            clearTimeout(pollTimer);
+            pollTimer = null;
+        }
+        
+        function connectEventStream() {
+            clearTimeout(streamRetryTimer);
+            streamRetryTimer = null;
+            if (document.hidden || eventStream) return;
+            
+            if (!window.EventSource) {
+                startPolling();
+                return;
+            }
+            
+            eventStream = new EventSource('/api/stream');
+            const onStreamEvent = (type, handler) => {
+                eventStream.addEventListener(type, event => handler(JSON.parse(event.data)));
+            };
+            
+            eventStream.onopen = () => {
+                stopPolling();
+                streamRetryDelay = STREAM_RETRY_BASE;
+                if (connectionLost) {
+                    hideConnectionLostModal();
+                }
+            };
+            
+            onStreamEvent('metrics', data => {
+                updateGPUDevicesWithMetrics(data);
+                updateLastRefresh();
+            });
+            onStreamEvent('history', data => updateHistoricalDataContainers(data));
+            onStreamEvent('plex', data => updatePlexSessions(data.status, data.sessions));
+            onStreamEvent('active-device', data => {
+                updateActiveDeviceStatus(data.active_device);
+                noteActiveDevice(data.active_device, data.device_name, data.trigger);
+            });
+            
+            eventStream.onerror = () => {
+                // Keep the page updating by polling (with its own backoff) and reconnect
+                // the stream with exponential backoff instead of the browser's fixed retry
+                closeEventStream();
+                startPolling();
+                streamRetryTimer = setTimeout(connectEventStream, streamRetryDelay);
+                streamRetryDelay = Math.min(streamRetryDelay * 2, STREAM_RETRY_MAX);
+            };
+        }
+        
+        function closeEventStream() {
+            if (eventStream) {
+                eventStream.close();
+                eventStream = null;
+            }
+        }
+        
+        document.addEventListener('visibilitychange', () => {
+            if (document.hidden) {
+                // Release the server-side stream and stop polling; nothing is shown while hidden
+                clearTimeout(streamRetryTimer);
+                streamRetryTimer = null;
+                closeEventStream();
+                stopPolling();
+            } else {
+                // The stream replays the latest state on connect, so the page catches up at once
+                streamRetryDelay = STREAM_RETRY_BASE;
+                connectEventStream();
+            }
+        });
     '''
 
 def get_connection_modal_html():
@@ -427,6 +427,103 @@ def get_gpu_styles():
 def get_gpu_javascript():
     """Return the GPU component JavaScript"""
     return '''
+        // Stable per-card element references and last-written values, so each tick
+        // patches only what changed instead of querying and rewriting the whole grid
+        const gpuCardRefs = new WeakMap();  // card element -> {elements, infoValues, signature, active}
+        const patchedValues = new WeakMap();  // element -> {property: last value written}
+        let gpuCardsById = null;  // device id -> card element, rebuilt when the grid is re-rendered
+        let historicalCellsById = null;  // device id -> {cells: {'metric|timeframe': cell}, signature}
+        
+        function indexGPUDeviceCards() {
+            gpuCardsById = new Map();
+            historicalCellsById = new Map();
+            const container = document.getElementById('gpu-devices-container');
+            
+            container.querySelectorAll('.gpu-device-card').forEach(card => {
+                const deviceId = card.getAttribute('data-device-id');
+                if (deviceId) gpuCardsById.set(deviceId, card);
+            });
+            container.querySelectorAll('.gpu-historical-container').forEach(historical => {
+                const deviceId = historical.getAttribute('data-device-id');
+                if (!deviceId) return;
+                
+                const cells = {};
+                historical.querySelectorAll('.matrix-cell').forEach(cell => {
+                    cells[cell.getAttribute('data-metric') + '|' + cell.getAttribute('data-timeframe')] = cell;
+                });
+                historicalCellsById.set(deviceId, {cells: cells, signature: null});
+            });
+        }
+        
+        function getGPUCards() {
+            // Re-index if the grid was rebuilt since the last tick
+            const first = gpuCardsById && gpuCardsById.values().next().value;
+            if (!gpuCardsById || (first && !first.isConnected)) {
+                indexGPUDeviceCards();
+            }
+            return gpuCardsById;
+        }
+        
+        function getCardRefs(card) {
+            let refs = gpuCardRefs.get(card);
+            if (!refs) {
+                refs = {elements: new Map(), infoValues: new Map(), signature: null, active: null};
+                card.querySelectorAll('.info-row').forEach(row => {
+                    const labelEl = row.querySelector('.info-label');
+                    const valueEl = row.querySelector('.info-value');
+                    if (labelEl && valueEl) {
+                        refs.infoValues.set(labelEl.textContent.replace(/:$/, ''), valueEl);
+                    }
+                });
+                gpuCardRefs.set(card, refs);
+            }
+            return refs;
+        }
+        
+        function cardElement(card, selector) {
+            const elements = getCardRefs(card).elements;
+            if (!elements.has(selector)) {
+                elements.set(selector, card.querySelector(selector));
+            }
+            return elements.get(selector);
+        }
+        
+        function cardInfoValue(card, label) {
+            return getCardRefs(card).infoValues.get(label) || null;
+        }
+        
+        // Patch helpers write to the DOM only when the value differs from the last write
+        function patchText(el, text) {
+            text = String(text);
+            if (el && el.textContent !== text) {
+                el.textContent = text;
+            }
+        }
+        
+        function patchStyle(el, property, value) {
+            if (!el) return;
+            let values = patchedValues.get(el);
+            if (!values) {
+                values = {};
+                patchedValues.set(el, values);
+            }
+            if (values[property] !== value) {
+                values[property] = value;
+                el.style[property] = value;
+            }
+        }
+        
+        function patchClassName(el, className) {
+            if (el && el.className !== className) {
+                el.className = className;
+            }
+        }
+        
+        function metricsSignature(deviceMetrics) {
+            // Timestamps change every sample even when nothing visible does
+            return JSON.stringify(deviceMetrics, (key, value) => key === 'timestamp' ? undefined : value);
+        }
+        
         function loadGPUDevices() {
             Promise.all([
                 fetchWithTimeout('/api/gpu-devices'),
@@ -478,6 +575,7 @@ def get_gpu_javascript():
                     });
                     
                     container.innerHTML = html;
+                    indexGPUDeviceCards();
                 })
                 .catch(error => {
                     handleAPIError(error, 'loadGPUDevices');
@@ -580,16 +678,16 @@ def get_gpu_javascript():
         
         function updateGPUDevicesWithMetrics(allMetricsData) {
             // Update only the metrics in existing GPU device containers
-            const container = document.getElementById('gpu-devices-container');
-            const deviceCards = container.querySelectorAll('.gpu-device-card');
-            
-            deviceCards.forEach(card => {
-                const deviceId = card.getAttribute('data-device-id');
-                if (!deviceId) return;
-                
+            getGPUCards().forEach((card, deviceId) => {
                 const deviceMetrics = allMetricsData.devices?.[deviceId];
                 if (!deviceMetrics) return;
                 
+                // Skip cards whose metrics are unchanged since they were last rendered
+                const refs = getCardRefs(card);
+                const signature = metricsSignature(deviceMetrics);
+                if (refs.signature === signature) return;
+                refs.signature = signature;
+                
                 // Use specific update functions based on device type
                 if (deviceMetrics.device_type === 'intel') {
                     updateIntelGPUMetrics(card, deviceMetrics);
@@ -600,48 +698,32 @@ def get_gpu_javascript():
                 }
             });
             
-            // Note: Historical data is updated separately by refreshHistoricalData()
+            // Note: Historical data is updated separately by updateHistoricalDataContainers()
         }
         
         function updateGenericGPUMetrics(card, deviceMetrics) {
             // Update utilization bar
-            const barFill = card.querySelector('.large-bar-fill');
-            const barText = card.querySelector('.large-bar-text');
-            if (barFill && barText) {
-                const utilization = deviceMetrics.utilization_percent || 0;
-                barFill.style.width = utilization + '%';
-                barText.textContent = utilization.toFixed(1) + '% Load';
-            }
+            const utilization = deviceMetrics.utilization_percent || 0;
+            patchStyle(cardElement(card, '.large-bar-fill'), 'width', utilization + '%');
+            patchText(cardElement(card, '.large-bar-text'), utilization.toFixed(1) + '% Load');
             
             // Update info values
-            const updateInfoValue = (label, value, unit = '') => {
-                const rows = card.querySelectorAll('.info-row');
-                rows.forEach(row => {
-                    const labelEl = row.querySelector('.info-label');
-                    const valueEl = row.querySelector('.info-value');
-                    if (labelEl && valueEl && labelEl.textContent === label + ':') {
-                        valueEl.textContent = value + unit;
-                    }
-                });
-            };
-            
-            updateInfoValue('Temperature', (deviceMetrics.temperature_celsius || 0).toFixed(1), '°C');
-            updateInfoValue('Power', (deviceMetrics.power_watts || 0).toFixed(1), 'W');
-            updateInfoValue('Processes', deviceMetrics.process_count || 0);
+            patchText(cardInfoValue(card, 'Temperature'), (deviceMetrics.temperature_celsius || 0).toFixed(1) + '°C');
+            patchText(cardInfoValue(card, 'Power'), (deviceMetrics.power_watts || 0).toFixed(1) + 'W');
+            patchText(cardInfoValue(card, 'Processes'), deviceMetrics.process_count || 0);
         }
         
         function updateActiveDeviceStatus(currentActiveDevice) {
             // Update all GPU cards to reflect the current active device
-            const container = document.getElementById('gpu-devices-container');
-            const deviceCards = container.querySelectorAll('.gpu-device-card');
-            
-            deviceCards.forEach(card => {
-                const deviceId = card.getAttribute('data-device-id');
-                if (!deviceId) return;
-                
-                const switchBtn = card.querySelector('.gpu-switch-btn');
+            getGPUCards().forEach((card, deviceId) => {
+                const refs = getCardRefs(card);
+                const switchBtn = cardElement(card, '.gpu-switch-btn');
                 const isActive = deviceId === currentActiveDevice;
                 
+                // Leave cards alone unless their active state changed (or a switch is in progress)
+                if (refs.active === isActive && !(switchBtn && switchBtn.textContent === 'SWITCHING...')) return;
+                refs.active = isActive;
+                
                 // Update button state and text
                 if (switchBtn) {
                     if (isActive) {
@@ -764,63 +846,35 @@ def get_gpu_javascript():
             `;
         }
         
-        function refreshHistoricalData() {
-            // Use the same host as the dashboard but port 8081 for historical data
-            const collectorUrl = `http://${window.location.hostname}:8081/api/historical-data`;
-            
-            fetch(collectorUrl)
-                .then(response => {
-                    if (!response.ok) {
-                        throw new Error(`HTTP ${response.status}`);
-                    }
-                    return response.json();
-                })
-                .then(historicalData => {
-                    updateHistoricalDataContainers(historicalData);
-                })
-                .catch(error => {
-                    // Silently handle historical data errors since it's not critical
-                    // and data might not be available yet after startup
-                    console.log('Historical data not available yet:', error.message);
-                });
-        }
-        
         function updateHistoricalDataContainers(historicalData) {
-            const containers = document.querySelectorAll('.gpu-historical-container');
+            getGPUCards();
             
-            containers.forEach(container => {
-                const deviceId = container.getAttribute('data-device-id');
-                if (!deviceId || !historicalData[deviceId]) return;
-                
+            historicalCellsById.forEach((historical, deviceId) => {
                 const deviceHistoricalData = historicalData[deviceId];
+                if (!deviceHistoricalData) return;
+                
+                // Skip devices whose load averages are unchanged
+                const signature = JSON.stringify(deviceHistoricalData);
+                if (historical.signature === signature) return;
+                historical.signature = signature;
                 
                 // Update each matrix cell
-                const cells = container.querySelectorAll('.matrix-cell');
-                cells.forEach(cell => {
-                    const metric = cell.getAttribute('data-metric');
-                    const timeframe = cell.getAttribute('data-timeframe');
-                    
-                    if (!metric || !timeframe) return;
+                Object.entries(historical.cells).forEach(([key, cell]) => {
+                    const [metric, timeframe] = key.split('|');
                     
                     const timeframeData = deviceHistoricalData[timeframe];
                     if (!timeframeData || timeframeData[metric] === undefined) {
-                        cell.textContent = '-';
-                        cell.className = 'matrix-cell no-data';
+                        patchText(cell, '-');
+                        patchClassName(cell, 'matrix-cell no-data');
                         return;
                     }
                     
                     const value = timeframeData[metric];
-                    cell.textContent = value.toFixed(1);
+                    patchText(cell, value.toFixed(1));
                     
                     // Apply color coding based on value
-                    cell.className = 'matrix-cell';
-                    if (value < 30) {
-                        cell.classList.add('low');
-                    } else if (value < 70) {
-                        cell.classList.add('medium');
-                    } else {
-                        cell.classList.add('high');
-                    }
+                    const level = value < 30 ? 'low' : (value < 70 ? 'medium' : 'high');
+                    patchClassName(cell, 'matrix-cell ' + level);
                 });
             });
         }
@@ -173,56 +173,32 @@ def get_intel_gpu_javascript():
         
         function updateIntelGPUMetrics(card, deviceMetrics) {
             // Update utilization bar
-            const barFill = card.querySelector('.large-bar-fill');
-            const barText = card.querySelector('.large-bar-text');
-            if (barFill && barText) {
-                const utilization = deviceMetrics.utilization_percent || 0;
-                barFill.style.width = utilization + '%';
-                barText.textContent = utilization.toFixed(1) + '%';
-            }
-            
-            // Update info values
-            const updateInfoValue = (label, value, unit = '') => {
-                const rows = card.querySelectorAll('.info-row');
-                rows.forEach(row => {
-                    const labelEl = row.querySelector('.info-label');
-                    const valueEl = row.querySelector('.info-value');
-                    if (labelEl && valueEl && labelEl.textContent === label + ':') {
-                        valueEl.textContent = value + unit;
-                    }
-                });
-            };
+            const utilization = deviceMetrics.utilization_percent || 0;
+            patchStyle(cardElement(card, '.large-bar-fill'), 'width', utilization + '%');
+            patchText(cardElement(card, '.large-bar-text'), utilization.toFixed(1) + '%');
             
             // Update frequency
             if (deviceMetrics.vendor_specific?.frequency_mhz) {
-                updateInfoValue('Frequency', deviceMetrics.vendor_specific.frequency_mhz.toFixed(0), ' MHz');
+                patchText(cardInfoValue(card, 'Frequency'), deviceMetrics.vendor_specific.frequency_mhz.toFixed(0) + ' MHz');
             }
             
-            updateInfoValue('Power', (deviceMetrics.power_watts || 0).toFixed(1), 'W');
+            patchText(cardInfoValue(card, 'Power'), (deviceMetrics.power_watts || 0).toFixed(1) + 'W');
             
             // Update process count with color
             const processCount = deviceMetrics.process_count || 0;
-            const rows = card.querySelectorAll('.info-row');
-            rows.forEach(row => {
-                const labelEl = row.querySelector('.info-label');
-                const valueEl = row.querySelector('.info-value');
-                if (labelEl && valueEl && labelEl.textContent === 'Processes:') {
-                    valueEl.textContent = processCount;
-                    valueEl.style.color = processCount > 0 ? '#00ff41' : '#a0a0a0';
-                }
-            });
+            const processesEl = cardInfoValue(card, 'Processes');
+            patchText(processesEl, processCount);
+            patchStyle(processesEl, 'color', processCount > 0 ? '#00ff41' : '#a0a0a0');
             
             // Update Intel engine bars
             if (deviceMetrics.vendor_specific?.engines) {
                 const engines = deviceMetrics.vendor_specific.engines;
                 
                 const updateEngineBar = (className, percent) => {
-                    const engineBar = card.querySelector('.engine-bar-fill.' + className);
-                    const engineValue = engineBar?.parentElement.querySelector('.engine-value');
-                    if (engineBar && engineValue) {
-                        engineBar.style.width = percent + '%';
-                        engineValue.textContent = percent.toFixed(1) + '%';
-                    }
+                    const engineBar = cardElement(card, '.engine-bar-fill.' + className);
+                    const engineValue = cardElement(card, '.engine-bar-fill.' + className + ' + .engine-value');
+                    patchStyle(engineBar, 'width', percent + '%');
+                    patchText(engineValue, percent.toFixed(1) + '%');
                 };
                 
                 updateEngineBar('render', engines.render_3d_percent || 0);
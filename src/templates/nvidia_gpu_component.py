@@ -231,19 +231,13 @@ def get_nvidia_gpu_javascript():
         
         function updateNvidiaGPUMetrics(card, deviceMetrics) {
             // Update utilization bar
-            const barFill = card.querySelector('.large-bar-fill');
-            const barText = card.querySelector('.large-bar-text');
-            if (barFill && barText) {
-                const utilization = deviceMetrics.utilization_percent || 0;
-                barFill.style.width = utilization + '%';
-                barText.textContent = utilization.toFixed(1) + '%';
-            }
+            const utilization = deviceMetrics.utilization_percent || 0;
+            patchStyle(cardElement(card, '.large-bar-fill'), 'width', utilization + '%');
+            patchText(cardElement(card, '.large-bar-text'), utilization.toFixed(1) + '%');
             
             // Update memory bar
-            const memoryBarFill = card.querySelector('.memory-bar-fill');
-            const memoryBarTextLeft = card.querySelector('.memory-bar-text-left');
-            const memoryBarTextRight = card.querySelector('.memory-bar-text-right');
-            if (memoryBarFill && memoryBarTextLeft && memoryBarTextRight) {
+            const memoryBarFill = cardElement(card, '.memory-bar-fill');
+            if (memoryBarFill) {
                 const memoryUsedPercent = deviceMetrics.memory_used_percent || 0;
                 const memoryFreeMB = deviceMetrics.memory_free_mb || 0;
                 const memoryTotalMB = memoryUsedPercent > 0 && memoryUsedPercent < 100 ? 
@@ -251,19 +245,17 @@ def get_nvidia_gpu_javascript():
                     Math.round(memoryFreeMB);
                 const memoryUsedMB = memoryUsedPercent > 0 && memoryUsedPercent < 100 ? 
                     Math.round(memoryTotalMB - memoryFreeMB) : 0;
-                memoryBarFill.style.width = memoryUsedPercent + '%';
-                memoryBarTextLeft.textContent = `${memoryUsedMB} MByte used`;
-                memoryBarTextRight.textContent = `${memoryTotalMB} MByte total`;
+                patchStyle(memoryBarFill, 'width', memoryUsedPercent + '%');
+                patchText(cardElement(card, '.memory-bar-text-left'), `${memoryUsedMB} MByte used`);
+                patchText(cardElement(card, '.memory-bar-text-right'), `${memoryTotalMB} MByte total`);
             }
             
             // Update utilization breakdown bars
             const updateUtilBar = (className, percent) => {
-                const utilBar = card.querySelector('.nvidia-util-bar-fill.' + className);
-                const utilValue = utilBar?.parentElement.querySelector('.nvidia-util-value');
-                if (utilBar && utilValue) {
-                    utilBar.style.width = percent + '%';
-                    utilValue.textContent = percent.toFixed(0) + '%';
-                }
+                const utilBar = cardElement(card, '.nvidia-util-bar-fill.' + className);
+                const utilValue = cardElement(card, '.nvidia-util-bar-fill.' + className + ' + .nvidia-util-value');
+                patchStyle(utilBar, 'width', percent + '%');
+                patchText(utilValue, percent.toFixed(0) + '%');
             };
             
             updateUtilBar('gpu', deviceMetrics.utilization_percent || 0);
@@ -272,29 +264,12 @@ def get_nvidia_gpu_javascript():
             updateUtilBar('decoder', deviceMetrics.vendor_specific?.decoder_utilization_percent || 0);
             
             // Update info values
-            const updateInfoValue = (label, value, unit = '') => {
-                const rows = card.querySelectorAll('.info-row');
-                rows.forEach(row => {
-                    const labelEl = row.querySelector('.info-label');
-                    const valueEl = row.querySelector('.info-value');
-                    if (labelEl && valueEl && labelEl.textContent === label + ':') {
-                        valueEl.textContent = value + unit;
-                    }
-                });
-            };
-            
-            updateInfoValue('Temperature', (deviceMetrics.temperature_celsius || 0).toFixed(1), '°C');
-            updateInfoValue('Power', (deviceMetrics.power_watts || 0).toFixed(1), 'W');
+            patchText(cardInfoValue(card, 'Temperature'), (deviceMetrics.temperature_celsius || 0).toFixed(1) + '°C');
+            patchText(cardInfoValue(card, 'Power'), (deviceMetrics.power_watts || 0).toFixed(1) + 'W');
             
             const processCount = deviceMetrics.process_count || 0;
-            const rows = card.querySelectorAll('.info-row');
-            rows.forEach(row => {
-                const labelEl = row.querySelector('.info-label');
-                const valueEl = row.querySelector('.info-value');
-                if (labelEl && valueEl && labelEl.textContent === 'Processes:') {
-                    valueEl.textContent = processCount;
-                    valueEl.style.color = processCount > 0 ? '#00ff41' : '#a0a0a0';
-                }
-            });
+            const processesEl = cardInfoValue(card, 'Processes');
+            patchText(processesEl, processCount);
+            patchStyle(processesEl, 'color', processCount > 0 ? '#00ff41' : '#a0a0a0');
         }
     '''
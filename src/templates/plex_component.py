@@ -475,69 +475,73 @@ def get_plex_javascript():
                         hideConnectionLostModal();
                     }
                     
-                    const plex = statusData.plex;
-                    const statusColor = plex.status === 'online' ? '#00ff41' : '#ff4757';
-                    
-                    // Update status and sessions count elements
-                    const statusElement = document.getElementById('plex-status');
-                    const sessionsElement = document.getElementById('plex-sessions');
-                    
-                    if (statusElement) {
-                        statusElement.textContent = plex.status.toUpperCase();
-                        statusElement.style.color = statusColor;
-                    }
-                    
-                    if (sessionsElement) {
-                        sessionsElement.textContent = plex.sessions;
-                        sessionsElement.style.color = plex.sessions > 0 ? '#00ff41' : '#a0a0a0';
-                    }
-                    
-                    // Update active sessions list
-                    const sessionsContainer = document.getElementById('sessions-container');
-                    if (sessionsContainer && sessionsData.status === 'success') {
-                        let sessionsHtml = '';
-                        
-                        if (sessionsData.sessions && sessionsData.sessions.length > 0) {
-                            sessionsHtml = '<div class="sessions-list">';
-                            sessionsData.sessions.forEach(session => {
-                                const videoIconClass = session.video_transcoding ? 'video-transcoding' : '';
-                                const audioIconClass = session.audio_transcoding ? 'audio-transcoding' : '';
-                                
-                                sessionsHtml += `
-                                    <div class="session-item">
-                                        <div class="session-info">
-                                            <div class="session-user">${session.user}</div>
-                                            <div class="session-title">${session.title}</div>
-                                        </div>
-                                        <div class="session-device">
-                                            <div class="session-device-name">${session.device}</div>
-                                        </div>
-                                        <div class="session-indicators">
-                                            <span class="transcode-icon ${videoIconClass}" title="Video ${session.video_transcoding ? 'Transcoding' : 'Direct Play'}">🎬</span>
-                                            <span class="transcode-icon ${audioIconClass}" title="Audio ${session.audio_transcoding ? 'Transcoding' : 'Direct Play'}">🔊</span>
-                                        </div>
-                                    </div>
-                                `;
-                            });
-                            sessionsHtml += '</div>';
-                        } else {
-                            sessionsHtml = '<div class="no-sessions">No active sessions</div>';
-                        }
-                        
-                        sessionsContainer.innerHTML = sessionsHtml;
-                        
-                        // Update sessions count in header
-                        const sessionHeader = sessionsContainer.parentElement.querySelector('h3');
-                        if (sessionHeader) {
-                            sessionHeader.textContent = `Active Sessions (${sessionsData.count})`;
-                        }
-                    }
+                    updatePlexSessions(statusData, sessionsData);
                 })
                 .catch(error => {
                     // Silently handle errors for periodic refresh to avoid spam
                     console.log('Plex sessions refresh error:', error.message);
                 });
         }
+        
+        function updatePlexSessions(statusData, sessionsData) {
+            const plex = statusData.plex;
+            const statusColor = plex.status === 'online' ? '#00ff41' : '#ff4757';
+            
+            // Update status and sessions count elements
+            const statusElement = document.getElementById('plex-status');
+            const sessionsElement = document.getElementById('plex-sessions');
+            
+            if (statusElement) {
+                statusElement.textContent = plex.status.toUpperCase();
+                statusElement.style.color = statusColor;
+            }
+            
+            if (sessionsElement) {
+                sessionsElement.textContent = plex.sessions;
+                sessionsElement.style.color = plex.sessions > 0 ? '#00ff41' : '#a0a0a0';
+            }
+            
+            // Update active sessions list
+            const sessionsContainer = document.getElementById('sessions-container');
+            if (sessionsContainer && sessionsData.status === 'success') {
+                let sessionsHtml = '';
+                
+                if (sessionsData.sessions && sessionsData.sessions.length > 0) {
+                    sessionsHtml = '<div class="sessions-list">';
+                    sessionsData.sessions.forEach(session => {
+                        const videoIconClass = session.video_transcoding ? 'video-transcoding' : '';
+                        const audioIconClass = session.audio_transcoding ? 'audio-transcoding' : '';
+                        
+                        sessionsHtml += `
+                            <div class="session-item">
+                                <div class="session-info">
+                                    <div class="session-user">${session.user}</div>
+                                    <div class="session-title">${session.title}</div>
+                                </div>
+                                <div class="session-device">
+                                    <div class="session-device-name">${session.device}</div>
+                                </div>
+                                <div class="session-indicators">
+                                    <span class="transcode-icon ${videoIconClass}" title="Video ${session.video_transcoding ? 'Transcoding' : 'Direct Play'}">🎬</span>
+                                    <span class="transcode-icon ${audioIconClass}" title="Audio ${session.audio_transcoding ? 'Transcoding' : 'Direct Play'}">🔊</span>
+                                </div>
+                            </div>
+                        `;
+                    });
+                    sessionsHtml += '</div>';
+                } else {
+                    sessionsHtml = '<div class="no-sessions">No active sessions</div>';
+                }
+                
+                sessionsContainer.innerHTML = sessionsHtml;
+                
+                // Update sessions count in header
+                const sessionHeader = sessionsContainer.parentElement.querySelector('h3');
+                if (sessionHeader) {
+                    sessionHeader.textContent = `Active Sessions (${sessionsData.count})`;
+                }
+            }
+        }
     '''
 
 def get_plex_html():
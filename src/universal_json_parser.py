@@ -5,17 +5,27 @@ Converts malformed JSON streams (like intel_gpu_top output) into proper JSON for
 Handles linebreaks, spaces, and multiple JSON objects in a single stream
 """
 
+import codecs
 import json
 import sys
 import re
+import time
 from datetime import datetime
 
+CHUNK_SIZE = 65536  # bytes requested per read; read1 returns whatever is already available
+
+# Characters that can change parser state; everything else is skipped by the regex engine
+_STRUCTURAL_CHARS = re.compile(r'[{}"\\]')
+_TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+
 class UniversalJSONParser:
     def __init__(self):
         self.buffer = ""
         self.brace_count = 0
         self.in_string = False
         self.escape_next = False
+        self.scan_pos = 0  # chunked mode: buffer offset scanned so far
+        self.decoder = json.JSONDecoder()
         
     def reset(self):
         """Reset parser state"""
@@ -23,9 +33,89 @@ class UniversalJSONParser:
         self.brace_count = 0
         self.in_string = False
         self.escape_next = False
+        self.scan_pos = 0
+        
+    def feed(self, data):
+        """Add a chunk of text and return the list of JSON objects it completed
+        
+        A complete object is decoded straight out of the buffer with raw_decode.
+        Only objects that are split across chunks (or need trailing-comma cleanup)
+        fall back to a regex scan of quotes and braces, so Python-level work is
+        per object or per structural character rather than per byte.
+        """
+        buffer = self.buffer + data if self.buffer else data
+        objects = []
+        depth = self.brace_count
+        in_string = self.in_string
+        object_start = 0 if depth else None
+        pos = self.scan_pos
+        skip_until = pos + 1 if self.escape_next else 0  # position after an escaped character
+        
+        while True:
+            if depth == 0:
+                start = buffer.find('{', pos)
+                if start < 0:
+                    break
+                try:
+                    json_obj, pos = self.decoder.raw_decode(buffer, start)
+                    objects.append(json_obj)
+                    continue
+                except json.JSONDecodeError:
+                    # Incomplete or malformed - track it brace by brace
+                    object_start = start
+                    depth = 1
+                    pos = start + 1
+                    
+            match = _STRUCTURAL_CHARS.search(buffer, pos)
+            if match is None:
+                break
+            char_pos = match.start()
+            pos = char_pos + 1
+            if char_pos < skip_until:
+                continue
+            char = buffer[char_pos]
+            
+            if in_string:
+                if char == '"':
+                    in_string = False
+                elif char == '\\':
+                    skip_until = char_pos + 2
+            elif char == '"':
+                in_string = True
+            elif char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    json_obj = self.decode_object(buffer, object_start, pos)
+                    if json_obj is not None:
+                        objects.append(json_obj)
+                    object_start = None
+                    
+        # Keep only the unfinished object; separators between objects are dropped
+        if object_start is not None:
+            self.buffer = buffer[object_start:]
+            self.scan_pos = len(buffer) - object_start
+        else:
+            self.buffer = ""
+            self.scan_pos = 0
+        self.brace_count = depth
+        self.in_string = in_string
+        self.escape_next = skip_until > len(buffer)
+        return objects
+        
+    def decode_object(self, buffer, start, end):
+        """Decode buffer[start:end] in place, falling back to trailing-comma cleanup"""
+        try:
+            json_obj, decoded_end = self.decoder.raw_decode(buffer, start)
+            if decoded_end == end:
+                return json_obj
+        except json.JSONDecodeError:
+            pass
+        return self.clean_and_parse_json(buffer[start:end])
     
     def add_char(self, char):
-        """Add a character to the buffer and return complete JSON objects"""
+        """Add a character to the buffer and return complete JSON objects (legacy per-character API)"""
         # Skip standalone commas and whitespace when not inside a JSON object
         if self.brace_count == 0 and char in ',\n\r\t ':
             return None
@@ -62,7 +152,7 @@ class UniversalJSONParser:
         """Clean and parse a JSON string"""
         try:
             # Remove trailing commas before closing braces/brackets
-            json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
+            json_str = _TRAILING_COMMA.sub(r'\1', json_str)
             
             # Parse the JSON
             parsed = json.loads(json_str)
@@ -72,16 +162,35 @@ class UniversalJSONParser:
             print(f"Problematic JSON: {json_str[:200]}...", file=sys.stderr)
             return None
     
-    def process_stream(self, input_stream, output_format='pretty'):
-        """Process a stream of characters and yield complete JSON objects"""
-        try:
+    def read_chunks(self, input_stream, chunk_size=CHUNK_SIZE):
+        """Yield text chunks as soon as they are available (never waits for a full chunk)"""
+        binary_stream = getattr(input_stream, 'buffer', input_stream)
+        
+        if hasattr(binary_stream, 'read1'):
+            decoder = codecs.getincrementaldecoder('utf-8')('replace')
             while True:
-                char = input_stream.read(1)
-                if not char:
+                data = binary_stream.read1(chunk_size)
+                if not data:
+                    tail = decoder.decode(b'', True)
+                    if tail:
+                        yield tail
                     break
+                text = decoder.decode(data)
+                if text:
+                    yield text
+        else:
+            # Plain text streams (e.g. StringIO) - read() does not block on these
+            while True:
+                text = input_stream.read(chunk_size)
+                if not text:
+                    break
+                yield text
                 
-                json_obj = self.add_char(char)
-                if json_obj is not None:
+    def process_stream(self, input_stream, output_format='pretty', chunk_size=CHUNK_SIZE):
+        """Process a stream in chunks and yield complete JSON objects"""
+        try:
+            for chunk in self.read_chunks(input_stream, chunk_size):
+                for json_obj in self.feed(chunk):
                     yield json_obj
         except KeyboardInterrupt:
             print("\nStream processing stopped by user", file=sys.stderr)
@@ -99,6 +208,86 @@ class UniversalJSONParser:
         else:
             return json.dumps(json_obj)
 
+def generate_intel_gpu_top_output(samples=1000, clients=2, trailing_comma_every=0):
+    """Generate text shaped like 'intel_gpu_top -J' output for benchmarking"""
+    engines = ('Render/3D/0', 'Blitter/0', 'Video/0', 'Video/1', 'VideoEnhance/0')
+    objects = []
+    
+    for sample in range(samples):
+        busy = (sample * 7) % 100
+        engine_lines = ',\n'.join(
+            f'\t\t"{engine}": {{\n\t\t\t"busy": {busy / (index + 1):.6f},\n\t\t\t"sema": 0.000000,\n'
+            f'\t\t\t"wait": 0.000000,\n\t\t\t"unit": "%"\n\t\t}}'
+            for index, engine in enumerate(engines)
+        )
+        client_lines = ',\n'.join(
+            f'\t\t"{4000 + client}": {{\n\t\t\t"name": "Plex Transcoder",\n\t\t\t"pid": "{4000 + client}",\n'
+            f'\t\t\t"engine-classes": {{\n\t\t\t\t"Render/3D": {{\n\t\t\t\t\t"busy": "{busy / 3:.6f}",\n'
+            f'\t\t\t\t\t"unit": "%"\n\t\t\t\t}},\n\t\t\t\t"Video": {{\n\t\t\t\t\t"busy": "{busy / 2:.6f}",\n'
+            f'\t\t\t\t\t"unit": "%"\n\t\t\t\t}}\n\t\t\t}}\n\t\t}}'
+            for client in range(clients)
+        )
+        trailing = ',' if trailing_comma_every and sample % trailing_comma_every == 0 else ''
+        objects.append(
+            '{\n'
+            f'\t"period": {{\n\t\t"duration": 1000.{sample % 1000:06d},\n\t\t"unit": "ms"\n\t}},\n'
+            f'\t"frequency": {{\n\t\t"requested": 1300.000000,\n\t\t"actual": {300 + busy * 10:.6f},\n\t\t"unit": "MHz"\n\t}},\n'
+            '\t"interrupts": {\n\t\t"count": 512.000000,\n\t\t"unit": "irq/s"\n\t},\n'
+            f'\t"rc6": {{\n\t\t"value": {100 - busy:.6f},\n\t\t"unit": "%"\n\t}},\n'
+            f'\t"power": {{\n\t\t"GPU": {busy / 10:.6f},\n\t\t"Package": {busy / 5:.6f},\n\t\t"unit": "W"{trailing}\n\t}},\n'
+            '\t"imc-bandwidth": {\n\t\t"reads": 1024.000000,\n\t\t"writes": 256.000000,\n\t\t"unit": "MiB/s"\n\t},\n'
+            f'\t"engines": {{\n{engine_lines}\n\t}},\n'
+            f'\t"clients": {{\n{client_lines}\n\t}}\n'
+            '}'
+        )
+        
+    return '[\n' + ',\n'.join(objects) + '\n]\n'
+
+def run_benchmark(text, repeat=3):
+    """Compare the per-character parser with the chunked parser on the same text"""
+    import contextlib
+    import io
+    
+    def legacy_parse():
+        parser = UniversalJSONParser()
+        stream = io.StringIO(text)
+        objects = []
+        while True:
+            char = stream.read(1)
+            if not char:
+                break
+            json_obj = parser.add_char(char)
+            if json_obj is not None:
+                objects.append(json_obj)
+        return objects
+        
+    def chunked_parse():
+        return list(UniversalJSONParser().process_stream(io.BytesIO(text.encode('utf-8'))))
+        
+    results = {}
+    for name, parse in (('legacy add_char', legacy_parse), ('chunked feed', chunked_parse)):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            with contextlib.redirect_stderr(io.StringIO()):
+                objects = parse()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = (best, objects)
+        
+    megabytes = len(text.encode('utf-8')) / (1024 * 1024)
+    print(f"Input: {megabytes:.2f} MiB", file=sys.stderr)
+    for name, (elapsed, objects) in results.items():
+        print(f"  {name:16s} {elapsed * 1000:9.1f} ms  {megabytes / elapsed:8.2f} MiB/s  {len(objects)} objects",
+              file=sys.stderr)
+              
+    legacy_elapsed, legacy_objects = results['legacy add_char']
+    chunked_elapsed, chunked_objects = results['chunked feed']
+    # The legacy parser glues a leading '[' onto the first object and drops it
+    matches = chunked_objects[-len(legacy_objects):] == legacy_objects if legacy_objects else not chunked_objects
+    print(f"  speedup: {legacy_elapsed / chunked_elapsed:.1f}x, identical objects: {matches}", file=sys.stderr)
+    return matches
+
 def main():
     import argparse
     import subprocess
@@ -118,9 +307,21 @@ def main():
                        help='Extract specific fields from JSON (e.g., frequency.actual power.GPU)')
     parser.add_argument('--count', '-n', type=int,
                        help='Stop after parsing N objects')
+    parser.add_argument('--benchmark', action='store_true',
+                       help='Benchmark chunked vs per-character parsing on --input (recorded intel_gpu_top -J output) or generated samples')
+    parser.add_argument('--samples', type=int, default=1000,
+                       help='Number of generated samples for --benchmark without --input')
     
     args = parser.parse_args()
     
+    if args.benchmark:
+        if args.input and args.input != '-':
+            with open(args.input, 'r') as input_file:
+                text = input_file.read()
+        else:
+            text = generate_intel_gpu_top_output(args.samples, trailing_comma_every=10)
+        sys.exit(0 if run_benchmark(text) else 1)
+    
     json_parser = UniversalJSONParser()
     input_stream = None
     